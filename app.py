@@ -3,12 +3,63 @@ Flask web application para TrackG - Seguimiento de Ejercicios.
 Servidor web que sirve la interfaz HTML/JS para el seguimiento de ejercicios.
 """
 
-from flask import Flask, render_template, jsonify
+import math
+import os
+import time
+
+from flask import Flask, render_template, jsonify, request, send_file
 from flask_cors import CORS
 
+from exercise_utils import EXERCISE_RULES, load_thresholds
+from history_store import HistoryStore, day_key
+from session_analysis import analyze_session, parse_binary_session, parse_json_session
+from session_store import SessionStore
+from static_assets import AssetManifest
+
 app = Flask(__name__)
 CORS(app)
 
+# Límite de tamaño de las sesiones subidas a /api/analyze (256 MB)
+app.config['MAX_CONTENT_LENGTH'] = 256 * 1024 * 1024
+
+# Umbrales de etapa ajustados con threshold_tuner.py (opcional)
+if os.environ.get('TRACKG_THRESHOLDS'):
+    load_thresholds(os.environ['TRACKG_THRESHOLDS'])
+
+# Sesiones en vivo: máximo de sesiones en memoria y segundos de inactividad
+live_sessions = SessionStore(
+    max_sessions=int(os.environ.get('TRACKG_MAX_SESSIONS', 10000)),
+    idle_timeout=float(os.environ.get('TRACKG_SESSION_TIMEOUT', 300))
+)
+
+# Historial de entrenamientos (la base se abre en la primera consulta)
+history = HistoryStore(os.environ.get('TRACKG_HISTORY_DB', 'trackg_history.db'))
+
+# Tamaño de página máximo de las consultas de historial
+MAX_HISTORY_PAGE = 500
+
+# Recursos autoalojados (ver static_assets.py): con TRACKG_LOCAL_ASSETS=1 la
+# página carga MediaPipe desde el build de dist/ en lugar de la CDN
+ASSETS_URL = '/assets'
+ASSET_MAX_AGE = 365 * 24 * 3600
+assets = None
+if os.environ.get('TRACKG_LOCAL_ASSETS'):
+    assets = AssetManifest.load(os.environ.get('TRACKG_ASSETS_DIR', os.path.join(app.root_path, 'dist')))
+    if assets is None:
+        app.logger.warning("TRACKG_LOCAL_ASSETS sin build (python static_assets.py build); se usa la CDN")
+
+
+@app.context_processor
+def asset_helpers():
+    """asset_url() y las URLs de los archivos de MediaPipe Pose para las plantillas."""
+    def asset_url(logical: str, fallback: str = None) -> str:
+        if assets is not None and logical in assets:
+            return f"{ASSETS_URL}/{assets.file(logical)}"
+        return fallback
+    
+    pose_urls = assets.urls('mediapipe/pose/', ASSETS_URL) if assets is not None else {}
+    return {'asset_url': asset_url, 'pose_asset_urls': pose_urls}
+
 
 @app.route('/')
 def index():
@@ -16,23 +67,241 @@ def index():
     return render_template('index.html')
 
 
+@app.route(f'{ASSETS_URL}/<path:filename>')
+def serve_asset(filename):
+    """
+    Sirve un recurso del build con nombre con hash.
+    
+    El contenido de cada nombre no cambia, así que se cachea un año como
+    immutable. Se elige la variante precomprimida según Accept-Encoding
+    (brotli, gzip), con ETag por variante (304 con If-None-Match). Las
+    peticiones con Range (modelos y WASM grandes) reciben la versión sin
+    comprimir con 206.
+    """
+    if assets is None:
+        return jsonify({'error': "Recursos locales desactivados"}), 404
+    ranged = 'Range' in request.headers
+    resolved = assets.resolve(filename, request.headers.get('Accept-Encoding', ''), allow_encoded=not ranged)
+    if resolved is None:
+        return jsonify({'error': f"Recurso desconocido: {filename}"}), 404
+    path, entry, encoding = resolved
+    etag = entry['etag'] if encoding is None else f"{entry['etag']}-{encoding}"
+    response = send_file(path, mimetype=entry['content_type'], conditional=True, etag=etag,
+                         max_age=ASSET_MAX_AGE, download_name=os.path.basename(entry['file']))
+    response.headers['Cache-Control'] = f'public, max-age={ASSET_MAX_AGE}, immutable'
+    response.headers['Vary'] = 'Accept-Encoding'
+    if encoding is not None:
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
 @app.route('/api/exercises')
 def get_exercises():
     """API endpoint que devuelve la lista de ejercicios disponibles."""
-    exercises = {
-        "1": "Bicep Curl",
-        "2": "Shoulder Press",
-        "3": "Lateral Raise",
-        "4": "Front Raise",
-        "5": "Hammer Curl",
-        "6": "Tricep Extension"
-    }
+    exercises = {str(key): name for key, name in enumerate(EXERCISE_RULES.names, 1)}
     return jsonify(exercises)
 
 
+def _json_object(silent: bool = False) -> dict:
+    """
+    Cuerpo JSON de la petición actual, que debe ser un objeto.
+
+    Args:
+        silent: Tratar un cuerpo ausente o no JSON como un objeto vacío
+
+    Raises:
+        ValueError: Si el cuerpo es JSON pero no un objeto (lista, número...)
+    """
+    payload = request.get_json(silent=silent)
+    if payload is None and silent:
+        return {}
+    if not isinstance(payload, dict):
+        raise ValueError("El cuerpo JSON debe ser un objeto")
+    return payload
+
+
+def _rep_times(values: list) -> list:
+    """
+    Instantes de repetición de una petición, en segundos desde epoch.
+
+    Raises:
+        ValueError: Si algún instante no es un número finito o queda fuera
+                    del rango de fechas locales de la plataforma
+    """
+    try:
+        times = [float(t) for t in values]
+        for t in times:
+            if not math.isfinite(t):
+                raise ValueError
+            # localtime lanza OverflowError u OSError fuera de rango
+            day_key(t)
+    except (TypeError, ValueError, OverflowError, OSError):
+        raise ValueError("rep_times debe contener instantes válidos (segundos desde epoch)") from None
+    return times
+
+
+@app.route('/api/analyze', methods=['POST'])
+def analyze():
+    """
+    Analiza una sesión completa de landmarks con las reglas del servidor.
+
+    Acepta JSON ({"exercise", "landmarks", "timestamps"?, "fps"?}) o un cuerpo
+    binario (application/octet-stream): una grabación de landmark_recording.py
+    o float32 crudo (N, 33, channels) con ?exercise=...&channels=3&fps=30.
+    Devuelve repeticiones, duración de cada repetición y cambios de feedback.
+    """
+    try:
+        if request.is_json:
+            payload = _json_object()
+            exercise_name = payload.get('exercise', "Bicep Curl")
+            landmarks, timestamps = parse_json_session(payload, payload.get('fps', 30.0))
+        else:
+            exercise_name = request.args.get('exercise', "Bicep Curl")
+            landmarks, timestamps = parse_binary_session(
+                request.get_data(cache=False),
+                channels=request.args.get('channels', 3, type=int),
+                fps=request.args.get('fps', 30.0, type=float)
+            )
+        return jsonify(analyze_session(landmarks, timestamps, exercise_name))
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+
+
+
+def _read_session_batch():
+    """
+    Lee un lote de frames de la petición actual (JSON o binario).
+
+    Sin tiempos explícitos, el último frame del lote se asume capturado ahora
+    y los anteriores espaciados según fps.
+    """
+    if request.is_json:
+        payload = _json_object()
+        has_timestamps = payload.get('timestamps') is not None
+        landmarks, timestamps = parse_json_session(payload, payload.get('fps', 30.0))
+    else:
+        payload = {}
+        has_timestamps = False
+        landmarks, timestamps = parse_binary_session(
+            request.get_data(cache=False),
+            channels=request.args.get('channels', 3, type=int),
+            fps=request.args.get('fps', 30.0, type=float)
+        )
+    if not has_timestamps and len(timestamps):
+        timestamps = timestamps + (time.time() - timestamps[-1])
+    return payload, landmarks, timestamps
+
+
+@app.route('/api/sessions', methods=['POST'])
+def create_session():
+    """Crea una sesión en vivo con estado de ejercicio en el servidor."""
+    try:
+        session = live_sessions.create(_json_object(silent=True).get('exercise', "Bicep Curl"))
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+    return jsonify(session.to_dict()), 201
+
+
+@app.route('/api/sessions/<session_id>', methods=['GET'])
+def get_session(session_id):
+    """Devuelve el estado actual de una sesión en vivo."""
+    session = live_sessions.get(session_id)
+    if session is None:
+        return jsonify({'error': "Sesión no encontrada o expirada"}), 404
+    return jsonify(session.to_dict())
+
+
+@app.route('/api/sessions/<session_id>', methods=['DELETE'])
+def delete_session(session_id):
+    """Cierra una sesión en vivo."""
+    if not live_sessions.delete(session_id):
+        return jsonify({'error': "Sesión no encontrada o expirada"}), 404
+    return '', 204
+
+
+@app.route('/api/sessions/<session_id>/frames', methods=['POST'])
+def ingest_session_frames(session_id):
+    """
+    Procesa un lote de frames de una sesión en vivo.
+
+    Acepta el mismo formato que /api/analyze; en JSON, el campo opcional
+    "exercise" cambia el ejercicio de la sesión antes de procesar el lote.
+    """
+    session = live_sessions.get(session_id)
+    if session is None:
+        return jsonify({'error': "Sesión no encontrada o expirada"}), 404
+    try:
+        payload, landmarks, timestamps = _read_session_batch()
+        with session.lock:
+            if 'exercise' in payload:
+                session.set_exercise(payload['exercise'])
+            return jsonify(session.ingest(landmarks, timestamps))
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+
+
+@app.route('/api/history/<user_id>/records')
+def get_personal_records(user_id):
+    """Récords personales de un usuario (?exercise= para filtrar)."""
+    return jsonify({
+        'user_id': user_id,
+        'records': history.personal_records(user_id, request.args.get('exercise'))
+    })
+
+
+@app.route('/api/history/<user_id>/volume')
+def get_volume_trend(user_id):
+    """
+    Tendencia de volumen de un usuario por día o semana, paginada.
+
+    Parámetros: period=day|week, exercise, start, end (AAAA-MM-DD o
+    AAAA-Wss), limit (máximo MAX_HISTORY_PAGE) y offset.
+    """
+    limit = request.args.get('limit', 50, type=int)
+    offset = request.args.get('offset', 0, type=int)
+    if not 1 <= limit <= MAX_HISTORY_PAGE or offset < 0:
+        return jsonify({'error': f"limit debe estar entre 1 y {MAX_HISTORY_PAGE} y offset no ser negativo"}), 400
+    try:
+        page = history.volume(
+            user_id,
+            period=request.args.get('period', 'day'),
+            exercise=request.args.get('exercise'),
+            start=request.args.get('start'),
+            end=request.args.get('end'),
+            limit=limit,
+            offset=offset
+        )
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+    return jsonify(dict(page, user_id=user_id))
+
+
+@app.route('/api/history/<user_id>/sets', methods=['POST'])
+def record_history_set(user_id):
+    """
+    Guarda una serie en el historial.
+
+    JSON: {"exercise", "rep_times": [...], "rep_durations"?: [...]}.
+    """
+    try:
+        payload = _json_object(silent=True)
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+    exercise_name = payload.get('exercise')
+    rep_times = payload.get('rep_times')
+    if not isinstance(exercise_name, str) or exercise_name not in EXERCISE_RULES.names:
+        return jsonify({'error': f"Ejercicio desconocido: {exercise_name}"}), 400
+    if not isinstance(rep_times, list) or not rep_times:
+        return jsonify({'error': "rep_times debe ser una lista no vacía"}), 400
+    try:
+        set_id = history.record_set(user_id, exercise_name, _rep_times(rep_times),
+                                    payload.get('rep_durations'))
+    except (TypeError, ValueError, OverflowError) as exc:
+        return jsonify({'error': str(exc)}), 400
+    return jsonify({'set_id': set_id}), 201
+
+
 if __name__ == '__main__':
-    import os
-    
     print("=== TrackG - Aplicación Web de Seguimiento de Ejercicios ===")
     print("\nAbriendo servidor web en http://localhost:5000")
     print("Presiona Ctrl+C para detener el servidor\n")
@@ -0,0 +1,336 @@
+"""
+Procesamiento por lotes de videos grabados para TrackG.
+Distribuye los videos entre un pool de procesos (un Pose de MediaPipe por
+worker), guarda los landmarks por frame y los resultados de repeticiones, y
+cachea los landmarks por hash del contenido para no volver a ejecutar MediaPipe.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from exercise_utils import EXERCISE_RULES, NUM_POSE_LANDMARKS
+from session_analysis import analyze_session
+
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.webm')
+
+MIN_DETECTION_CONFIDENCE = 0.5
+MIN_TRACKING_CONFIDENCE = 0.5
+
+# Pose de MediaPipe propio de cada proceso worker (se crea al primer uso)
+_worker_pose = None
+_worker_model_complexity = 1
+
+
+def _init_worker(model_complexity: int) -> None:
+    """Inicializador del pool: guarda la configuración del modelo del worker."""
+    global _worker_model_complexity
+    _worker_model_complexity = model_complexity
+
+
+def _get_worker_pose():
+    """Devuelve el Pose del worker, creándolo solo si hace falta inferencia."""
+    global _worker_pose
+    if _worker_pose is None:
+        import mediapipe as mp
+        _worker_pose = mp.solutions.pose.Pose(
+            model_complexity=_worker_model_complexity,
+            min_detection_confidence=MIN_DETECTION_CONFIDENCE,
+            min_tracking_confidence=MIN_TRACKING_CONFIDENCE
+        )
+    return _worker_pose
+
+
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Calcula el hash SHA-256 del contenido de un archivo.
+
+    Args:
+        path: Ruta del archivo
+        chunk_size: Tamaño de bloque de lectura en bytes
+
+    Returns:
+        Hash hexadecimal
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def model_config(model_complexity: int = 1) -> Dict:
+    """Configuración del modelo y del preprocesado que determina los landmarks extraídos."""
+    return {
+        'model_complexity': model_complexity,
+        'min_detection_confidence': MIN_DETECTION_CONFIDENCE,
+        'min_tracking_confidence': MIN_TRACKING_CONFIDENCE,
+        'mirror': True,
+    }
+
+
+def cache_key(content_hash: str, config: Dict) -> str:
+    """
+    Clave de caché de un video: hash del contenido más hash de la
+    configuración del modelo, para no reutilizar landmarks extraídos con
+    otra complejidad u otros umbrales.
+    """
+    config_hash = hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()
+    return f'{content_hash}-{config_hash[:12]}'
+
+
+def output_names(videos: List[str]) -> Dict[str, str]:
+    """
+    Nombre de salida de cada video: su ruta relativa a la carpeta común, sin
+    extensión, para que videos con el mismo nombre en carpetas distintas no
+    se sobrescriban.
+
+    Raises:
+        ValueError: Si dos videos darían el mismo nombre (p. ej. a.mp4 y a.avi)
+    """
+    if not videos:
+        return {}
+    base = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in videos])
+    names: Dict[str, str] = {}
+    owners: Dict[str, str] = {}
+    for path in videos:
+        name = os.path.splitext(os.path.relpath(os.path.abspath(path), base))[0]
+        if name in owners:
+            raise ValueError(f"{owners[name]} y {path} se escribirían en la misma salida ({name})")
+        owners[name] = path
+        names[path] = name
+    return names
+
+
+def collect_videos(inputs: List[str]) -> List[str]:
+    """
+    Expande una lista de archivos y directorios en la lista de videos a procesar.
+
+    Args:
+        inputs: Rutas de videos o directorios que los contienen
+
+    Returns:
+        Rutas de video ordenadas y sin duplicados
+    """
+    videos = []
+    for path in inputs:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(VIDEO_EXTENSIONS):
+                    videos.append(os.path.join(path, name))
+        else:
+            videos.append(path)
+    return sorted(set(videos))
+
+
+def extract_landmarks(video_path: str, pose) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Ejecuta MediaPipe sobre todos los frames de un video.
+
+    Args:
+        video_path: Ruta del video
+        pose: Instancia de mp.solutions.pose.Pose
+
+    Returns:
+        (landmarks, timestamps): array (N, 33, 3) float32 con x, y y visibilidad
+        (NaN en frames sin detección) y array (N,) de tiempos en segundos
+
+    Raises:
+        ValueError: Si el video no se puede abrir o no se decodifica ningún frame
+    """
+    import cv2
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"No se puede abrir el video: {video_path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frames = []
+    timestamps = []
+
+    while cap.isOpened():
+        ret, frame = cap.read()
+        if not ret:
+            break
+
+        # Mismo preprocesado que el modo en vivo: espejo y RGB
+        frame = cv2.flip(frame, 1)
+        image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        image.flags.writeable = False
+        results = pose.process(image)
+
+        row = np.full((NUM_POSE_LANDMARKS, 3), np.nan, dtype=np.float32)
+        if results.pose_landmarks:
+            row[:] = [(lm.x, lm.y, lm.visibility) for lm in results.pose_landmarks.landmark]
+        frames.append(row)
+        timestamps.append(len(timestamps) / fps)
+
+    cap.release()
+
+    if not frames:
+        raise ValueError(f"No se pudo decodificar ningún frame del video: {video_path}")
+    return np.stack(frames), np.asarray(timestamps, dtype=np.float64)
+
+
+def load_cached_landmarks(cache_dir: str, key: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Devuelve (landmarks, timestamps) cacheados para una clave (ver cache_key),
+    o None. Las entradas sin frames (de versiones que cacheaban videos
+    ilegibles) se ignoran para volver a intentarlo.
+    """
+    path = os.path.join(cache_dir, f'{key}.npz')
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        if not len(data['timestamps']):
+            return None
+        return data['landmarks'], data['timestamps']
+
+
+def save_cached_landmarks(cache_dir: str, key: str,
+                          landmarks: np.ndarray, timestamps: np.ndarray) -> None:
+    """Guarda landmarks en la caché de forma atómica (una sesión sin frames no se guarda)."""
+    if not len(timestamps):
+        return
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f'{key}.npz')
+    tmp_path = f'{path}.{os.getpid()}.tmp.npz'
+    np.savez_compressed(tmp_path, landmarks=landmarks, timestamps=timestamps)
+    os.replace(tmp_path, path)
+
+
+def score_session(landmarks: np.ndarray, timestamps: np.ndarray, exercise_name: str) -> Dict:
+    """
+    Aplica las reglas del ejercicio a una sesión de landmarks.
+
+    Args:
+        landmarks: Array (N, 33, 2+) con NaN en frames sin detección
+        timestamps: Array (N,) de tiempos en segundos
+        exercise_name: Nombre del ejercicio
+
+    Returns:
+        Diccionario con repeticiones, tiempos y línea de tiempo del feedback
+        (ver session_analysis.analyze_session)
+    """
+    return analyze_session(landmarks, timestamps, exercise_name)
+
+
+def process_video(video_path: str, exercise_name: str, output_dir: str, cache_dir: str,
+                  model_complexity: int = 1, output_name: Optional[str] = None) -> Dict:
+    """
+    Procesa un video completo: landmarks (desde caché o MediaPipe) y reglas.
+
+    Args:
+        video_path: Ruta del video
+        exercise_name: Nombre del ejercicio a evaluar
+        output_dir: Directorio donde escribir <nombre>.npz y <nombre>.json
+        cache_dir: Directorio de la caché de landmarks
+        model_complexity: Complejidad del modelo (forma parte de la clave de caché)
+        output_name: Nombre de salida, que puede incluir subcarpetas (por
+                     defecto, el del video sin extensión; ver output_names)
+
+    Returns:
+        Resumen del resultado (incluye 'cached' y rutas de salida)
+
+    Raises:
+        ValueError: Si el video no se puede abrir o decodificar (ver extract_landmarks)
+    """
+    content_hash = file_hash(video_path)
+    key = cache_key(content_hash, model_config(model_complexity))
+    cached = load_cached_landmarks(cache_dir, key)
+    if cached is None:
+        landmarks, timestamps = extract_landmarks(video_path, _get_worker_pose())
+        save_cached_landmarks(cache_dir, key, landmarks, timestamps)
+    else:
+        landmarks, timestamps = cached
+
+    result = score_session(landmarks, timestamps, exercise_name)
+    result.update({'video': video_path, 'sha256': content_hash, 'cached': cached is not None})
+
+    if output_name is None:
+        output_name = os.path.splitext(os.path.basename(video_path))[0]
+    stem = os.path.join(output_dir, output_name)
+    os.makedirs(os.path.dirname(stem), exist_ok=True)
+    np.savez_compressed(f'{stem}.npz', landmarks=landmarks, timestamps=timestamps)
+    with open(f'{stem}.json', 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+    return result
+
+
+def run_batch(videos: List[str], exercise_name: str, output_dir: str, cache_dir: str,
+              workers: Optional[int] = None, model_complexity: int = 1) -> List[Dict]:
+    """
+    Procesa una lista de videos en paralelo.
+
+    Args:
+        videos: Rutas de los videos
+        exercise_name: Nombre del ejercicio a evaluar
+        output_dir: Directorio de resultados
+        cache_dir: Directorio de la caché de landmarks
+        workers: Número de procesos (por defecto, núcleos disponibles)
+        model_complexity: Complejidad del modelo de MediaPipe (0, 1 o 2)
+
+    Returns:
+        Resúmenes de cada video, en el orden de entrada
+    """
+    if exercise_name not in EXERCISE_RULES:
+        raise ValueError(f"Ejercicio desconocido: {exercise_name}")
+    names = output_names(videos)
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(model_complexity,)) as pool:
+        futures = {
+            pool.submit(process_video, path, exercise_name, output_dir, cache_dir,
+                        model_complexity, names[path]): path
+            for path in videos
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                results[path] = future.result()
+            except Exception as exc:
+                results[path] = {'video': path, 'error': str(exc)}
+            summary = results[path]
+            if 'error' in summary:
+                print(f"  ✗ {path}: {summary['error']}")
+            else:
+                origin = "caché" if summary['cached'] else "MediaPipe"
+                print(f"  ✓ {path}: {summary['reps']} repeticiones ({origin})")
+
+    return [results[path] for path in videos]
+
+
+def main():
+    """
+    Punto de entrada de línea de comandos para el procesamiento por lotes.
+    """
+    parser = argparse.ArgumentParser(description="TrackG - Procesamiento por lotes de videos")
+    parser.add_argument('inputs', nargs='+', help="Videos o directorios con videos")
+    parser.add_argument('--exercise', default="Bicep Curl", choices=EXERCISE_RULES.names)
+    parser.add_argument('--output', default='resultados', help="Directorio de resultados")
+    parser.add_argument('--cache', default='.landmark_cache', help="Directorio de caché de landmarks")
+    parser.add_argument('--workers', type=int, default=None, help="Número de procesos")
+    parser.add_argument('--model-complexity', type=int, default=1, choices=(0, 1, 2))
+    args = parser.parse_args()
+
+    videos = collect_videos(args.inputs)
+    print(f"=== TrackG - Procesando {len(videos)} videos ===")
+    try:
+        results = run_batch(videos, args.exercise, args.output, args.cache,
+                            workers=args.workers, model_complexity=args.model_complexity)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    failed = sum(1 for r in results if 'error' in r)
+    print(f"\nCompletado: {len(results) - failed} correctos, {failed} con errores")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+Microbenchmarks del camino crítico por frame de TrackG.
+No necesita cámara ni modelo de MediaPipe: usa flujos sintéticos de landmarks
+y frames en blanco, mide la distribución de latencia por llamada y los
+frames por segundo, guarda los resultados en JSON y compara contra una línea
+base para detectar regresiones.
+
+Uso:
+    python benchmark.py --output benchmark_results.json
+    python benchmark.py --compare benchmark_baseline.json --threshold 0.15
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import time
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from exercise_utils import (
+    NUM_POSE_LANDMARKS,
+    LANDMARK_INDICES,
+    calculate_angle,
+    process_bicep_curl,
+    process_shoulder_press,
+    process_lateral_raise,
+    process_front_raise,
+    process_hammer_curl,
+    process_tricep_extension
+)
+from session_analysis import analyze_session
+
+
+PROCESS_FUNCTIONS = {
+    'process_bicep_curl': process_bicep_curl,
+    'process_shoulder_press': process_shoulder_press,
+    'process_lateral_raise': process_lateral_raise,
+    'process_front_raise': process_front_raise,
+    'process_hammer_curl': process_hammer_curl,
+    'process_tricep_extension': process_tricep_extension,
+}
+
+FRAME_SIZES = {'480p': (480, 640), '1080p': (1080, 1920)}
+
+
+def synthetic_landmark_stream(frames: int, fps: float = 30.0, seed: int = 0,
+                              noise: float = 0.002, rep_period: float = 3.0) -> np.ndarray:
+    """
+    Genera una sesión sintética de landmarks con ambos brazos en movimiento.
+
+    Args:
+        frames: Número de frames
+        fps: Frecuencia de muestreo
+        seed: Semilla del ruido
+        noise: Desviación típica del temblor gaussiano (coordenadas normalizadas)
+        rep_period: Segundos por repetición
+
+    Returns:
+        Array (frames, 33, 3) con x, y y visibilidad
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(frames) / fps
+    phase = 0.5 - 0.5 * np.cos(2 * np.pi * t / rep_period)
+
+    landmarks = np.empty((frames, NUM_POSE_LANDMARKS, 3))
+    landmarks[:, :, 0] = 0.5
+    landmarks[:, :, 1] = 0.5
+    landmarks[:, :, 2] = 0.99
+    for side, x in (('left', 0.35), ('right', 0.65)):
+        direction = -1 if side == 'left' else 1
+        landmarks[:, LANDMARK_INDICES[f'{side}_shoulder'], :2] = (x, 0.30)
+        landmarks[:, LANDMARK_INDICES[f'{side}_elbow'], :2] = (x, 0.50)
+        landmarks[:, LANDMARK_INDICES[f'{side}_hip'], :2] = (x, 0.80)
+        landmarks[:, LANDMARK_INDICES[f'{side}_knee'], :2] = (x, 0.92)
+        landmarks[:, LANDMARK_INDICES[f'{side}_ankle'], :2] = (x, 1.00)
+        # La muñeca describe un arco alrededor del codo (curl)
+        wrist = LANDMARK_INDICES[f'{side}_wrist']
+        landmarks[:, wrist, 0] = x + direction * 0.2 * np.sin(np.pi * 0.95 * phase)
+        landmarks[:, wrist, 1] = 0.50 + 0.2 * np.cos(np.pi * 0.95 * phase)
+    landmarks[:, :, :2] += rng.normal(0, noise, (frames, NUM_POSE_LANDMARKS, 2))
+    return landmarks
+
+
+def as_mediapipe_landmarks(landmarks: np.ndarray) -> List[List[SimpleNamespace]]:
+    """Convierte un array (N, 33, 3) en listas de objetos con x, y y visibilidad."""
+    return [
+        [SimpleNamespace(x=x, y=y, z=0.0, visibility=v) for x, y, v in frame]
+        for frame in landmarks.tolist()
+    ]
+
+
+def measure(func: Callable[[int], None], calls: int, samples: int, warmup: int = 1) -> Dict:
+    """
+    Mide la latencia por llamada de func.
+
+    func(i) se invoca `calls` veces por muestra; cada muestra produce una
+    latencia media por llamada, lo que evita que el coste del reloj domine en
+    funciones de microsegundos.
+
+    Returns:
+        Estadísticas en microsegundos y llamadas por segundo
+    """
+    index = 0
+    for _ in range(warmup * calls):
+        func(index)
+        index += 1
+
+    per_call = np.empty(samples)
+    for sample in range(samples):
+        start = time.perf_counter_ns()
+        for _ in range(calls):
+            func(index)
+            index += 1
+        per_call[sample] = (time.perf_counter_ns() - start) / calls / 1000.0
+
+    mean_us = float(per_call.mean())
+    return {
+        'samples': samples,
+        'calls_per_sample': calls,
+        'mean_us': mean_us,
+        'p50_us': float(np.percentile(per_call, 50)),
+        'p95_us': float(np.percentile(per_call, 95)),
+        'p99_us': float(np.percentile(per_call, 99)),
+        'min_us': float(per_call.min()),
+        'per_second': 1e6 / mean_us if mean_us > 0 else math.inf,
+    }
+
+
+def run_benchmarks(samples: int = 50, calls: int = 200, frames: int = 600,
+                   only: Optional[str] = None) -> Dict[str, Dict]:
+    """
+    Ejecuta todos los benchmarks.
+
+    Args:
+        samples: Número de muestras por benchmark
+        calls: Llamadas por muestra para las funciones rápidas
+        frames: Longitud del flujo sintético de landmarks
+        only: Subcadena para filtrar benchmarks por nombre
+
+    Returns:
+        Diccionario nombre -> estadísticas
+    """
+    from exercise_tracker import ExerciseTracker
+
+    landmarks = synthetic_landmark_stream(frames)
+    mp_frames = as_mediapipe_landmarks(landmarks)
+    tracker = ExerciseTracker(load_model=False)
+    points_stream = [tracker.get_landmarks(frame) for frame in mp_frames]
+    point_tuples = [
+        (p['left_shoulder'], p['left_elbow'], p['left_wrist']) for p in points_stream
+    ]
+
+    benchmarks = {
+        'calculate_angle': (lambda i: calculate_angle(*point_tuples[i % frames]), calls),
+        'get_landmarks': (lambda i: tracker.get_landmarks(mp_frames[i % frames]), calls),
+    }
+
+    for name, process in PROCESS_FUNCTIONS.items():
+        stage = {'value': None}
+
+        def run_process(i, process=process, stage=stage):
+            _, _, stage['value'] = process(points_stream[i % frames], stage['value'])
+
+        benchmarks[name] = (run_process, calls)
+
+    for exercise_name in tracker.exercises.values():
+        def run_exercise(i, exercise_name=exercise_name):
+            tracker.exercise_name = exercise_name
+            tracker.process_exercise(mp_frames[i % frames], timestamp=i / 30.0)
+
+        benchmarks[f'process_exercise[{exercise_name}]'] = (run_exercise, calls)
+
+    for label, (height, width) in FRAME_SIZES.items():
+        blank = np.zeros((height, width, 3), dtype=np.uint8)
+        tracker.form_feedback = "Brazo extendido - ¡Bien!"
+        tracker.rep_duration = 2.5
+
+        def run_draw_ui(i, blank=blank):
+            tracker.exercise_counter = i // 90
+            tracker.draw_ui(blank.copy())
+
+        benchmarks[f'draw_ui[{label}]'] = (run_draw_ui, max(1, calls // 20))
+
+    # Sesión completa con las reglas vectorizadas (ver evaluate_batch)
+    session_timestamps = np.arange(frames) / 30.0
+    benchmarks['analyze_session'] = (
+        lambda i: analyze_session(landmarks, session_timestamps, "Bicep Curl"), 1)
+
+    results = {}
+    for name, (func, name_calls) in benchmarks.items():
+        if only and only not in name:
+            continue
+        results[name] = measure(func, name_calls, samples)
+    return results
+
+
+def environment_info() -> Dict:
+    """Versiones y plataforma, para interpretar los resultados guardados."""
+    info = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'numpy': np.__version__,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    try:
+        import cv2
+        info['opencv'] = cv2.__version__
+    except ImportError:
+        pass
+    return info
+
+
+def compare_results(current: Dict[str, Dict], baseline: Dict[str, Dict],
+                    threshold: float = 0.15) -> List[Dict]:
+    """
+    Compara la mediana de latencia contra una línea base.
+
+    Args:
+        current: Resultados actuales
+        baseline: Resultados de la línea base
+        threshold: Aumento relativo de p50 a partir del cual hay regresión
+
+    Returns:
+        Lista de comparaciones por benchmark común, con 'regression' marcado
+    """
+    comparisons = []
+    for name, stats in current.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]['p50_us']
+        after = stats['p50_us']
+        change = (after - before) / before if before > 0 else 0.0
+        comparisons.append({
+            'name': name,
+            'baseline_p50_us': before,
+            'current_p50_us': after,
+            'change': change,
+            'regression': change > threshold,
+        })
+    return comparisons
+
+
+def print_results(results: Dict[str, Dict]) -> None:
+    """Imprime una tabla de resultados."""
+    print(f"{'benchmark':<40} {'p50 µs':>10} {'p95 µs':>10} {'p99 µs':>10} {'llamadas/s':>12}")
+    for name, stats in results.items():
+        print(f"{name:<40} {stats['p50_us']:>10.2f} {stats['p95_us']:>10.2f} "
+              f"{stats['p99_us']:>10.2f} {stats['per_second']:>12.0f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Punto de entrada de línea de comandos.
+
+    Returns:
+        Código de salida: 1 si la comparación detecta regresiones
+    """
+    parser = argparse.ArgumentParser(description="TrackG - Microbenchmarks del camino crítico")
+    parser.add_argument('--output', default='benchmark_results.json', help="Archivo JSON de resultados")
+    parser.add_argument('--compare', metavar='BASELINE', help="Comparar contra un JSON guardado")
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help="Aumento relativo de p50 considerado regresión (0.15 = 15%%)")
+    parser.add_argument('--samples', type=int, default=50)
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--only', help="Ejecutar solo benchmarks cuyo nombre contenga este texto")
+    parser.add_argument('--overwrite-baseline', action='store_true',
+                        help="Permitir que --output sea el mismo archivo que --compare "
+                             "(la línea base se lee antes de sobrescribirla)")
+    args = parser.parse_args(argv)
+
+    # La línea base se carga antes de ejecutar nada: si --output apunta al mismo
+    # archivo, escribir primero compararía la ejecución consigo misma
+    baseline = None
+    if args.compare:
+        if (os.path.abspath(args.compare) == os.path.abspath(args.output)
+                and not args.overwrite_baseline):
+            parser.error("--output y --compare son el mismo archivo; usa otro --output "
+                         "o --overwrite-baseline para reemplazar la línea base")
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+
+    results = run_benchmarks(samples=args.samples, calls=args.calls, only=args.only)
+    print_results(results)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'environment': environment_info(), 'results': results}, f, indent=2)
+    print(f"\nResultados guardados en {args.output}")
+
+    if baseline is not None:
+        comparisons = compare_results(results, baseline, args.threshold)
+        print(f"\nComparación con {args.compare} (umbral {args.threshold:.0%}):")
+        for item in comparisons:
+            flag = "REGRESIÓN" if item['regression'] else "ok"
+            print(f"  {item['name']:<40} {item['baseline_p50_us']:>9.2f} → "
+                  f"{item['current_p50_us']:>9.2f} µs ({item['change']:+.1%}) {flag}")
+        if any(item['regression'] for item in comparisons):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,33 @@
-import cv2
-import mediapipe as mp
-import numpy as np
 import time
-from typing import Dict, Tuple, Optional
-from exercise_utils import (
-    calculate_angle,
-    process_bicep_curl,
-    process_shoulder_press,
-    process_lateral_raise,
-    process_front_raise,
-    process_hammer_curl,
-    process_tricep_extension
-)
+
+# Inicio de la fase 'imports' del informe de arranque (ver StartupReport)
+_IMPORT_START = time.perf_counter()
+
+import argparse
+import math
+import numpy as np
+import sys
+import threading
+from functools import partial
+from typing import Optional
+from exercise_utils import EXERCISE_RULES
+from frame_buffers import FrameBuffers
+from landmark_filter import LandmarkFilter
+from lazy_import import lazy_import
+from overlay_cache import CachedLayer, LayerCanvas
+from perf_stats import StageTimer, StartupReport, draw_perf_hud
+from pose_backends import (POSE_BACKENDS, POSE_LANDMARKER_VARIANTS, MediaPipePoseBackend, PoseBackend,
+                           SyntheticCapture, SyntheticPoseBackend, TasksPoseBackend)
+from pose_frame import PoseFrame
+from rep_analytics import RepAnalytics, Sparkline
+from rep_events import RepEvent, build_event_writer
+from roi_tracker import RoiTracker
+
+# OpenCV y MediaPipe se importan en el primer uso: MediaPipe, en el hilo de
+# carga del modelo mientras se abre la cámara (ver lazy_import.py y pose_backends.py)
+cv2 = lazy_import('cv2')
+
+_IMPORT_END = time.perf_counter()
 
 
 class ExerciseTracker:
@@ -20,14 +36,76 @@ class ExerciseTracker:
     Detecta y cuenta repeticiones, mide ángulos y proporciona retroalimentación.
     """
     
-    def __init__(self):
-        # Inicializar MediaPipe
-        self.mp_pose = mp.solutions.pose
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.pose = self.mp_pose.Pose(
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
+    def __init__(self, load_model: bool = True, model_complexity: int = 1,
+                 input_scale: float = 1.0, filter_landmarks: bool = False,
+                 track_roi: bool = False, background_load: bool = False,
+                 pose_backend: Optional[PoseBackend] = None):
+        """
+        Args:
+            load_model: Si es False no se carga MediaPipe (p. ej. para reproducir
+                        grabaciones o procesar landmarks ya extraídos)
+            pose_backend: Backend de pose a usar en lugar de MediaPipe
+                          (ver pose_backends.py)
+            background_load: Importar y preparar el modelo en un hilo, de modo
+                             que la cámara y la vista previa arrancan sin esperarlo
+            model_complexity: Complejidad del modelo de MediaPipe (0 = ligero)
+            input_scale: Escala de la imagen que recibe el modelo (p. ej. 0.5)
+            filter_landmarks: Suavizar landmarks con el filtro One-Euro
+            track_roi: Inferir solo sobre el recorte alrededor del atleta
+        """
+        # Desglose del arranque por fases
+        self.startup = StartupReport(origin=_IMPORT_START)
+        self.startup.add('imports', _IMPORT_START, _IMPORT_END)
+        
+        # Backend de pose (self.pose es None hasta que el modelo está listo)
+        self.pose_backend = pose_backend
+        self.pose = None
+        self._model_thread = None
+        self._model_error = None
+        if load_model:
+            if background_load:
+                self._model_thread = threading.Thread(
+                    target=self._load_model, args=(model_complexity,),
+                    name='trackg-model', daemon=True)
+                self._model_thread.start()
+            else:
+                self._load_model(model_complexity)
+        self.input_scale = input_scale
+        self.roi_tracker = RoiTracker() if track_roi else None
+        
+        # Capas de interfaz cacheadas (ver overlay_cache.py)
+        canvas = LayerCanvas()
+        self.overlay_layers = {
+            'header': CachedLayer(canvas),
+            'footer': CachedLayer(canvas),
+            'instructions': CachedLayer(canvas),
+            'analytics': CachedLayer(canvas),
+        }
+        
+        # Buffers reutilizados de captura, conversión y escalado (ver frame_buffers.py)
+        self.frame_buffers = FrameBuffers()
+        
+        # Filtro One-Euro entre MediaPipe y la lógica del ejercicio (ver landmark_filter.py)
+        self.landmark_filter = LandmarkFilter() if filter_landmarks else None
+        
+        # Planificador opcional de inferencia con salto de frames (ver inference_scheduler.py)
+        self.scheduler = None
+        
+        # Serie reciente del ángulo y métricas por repetición (ver rep_analytics.py)
+        self.analytics = RepAnalytics()
+        self.sparkline = Sparkline(self.analytics.angles.capacity)
+        
+        # Escritor opcional de eventos de repetición (ver rep_events.py)
+        self.events = None
+        self._rep_min_angle = math.inf
+        self._rep_max_angle = -math.inf
+        
+        # Grabación opcional de landmarks (ver landmark_recording.py)
+        self.recorder = None
+        
+        # Tiempos por etapa del frame y panel de rendimiento (tecla P)
+        self.perf = StageTimer()
+        self.show_perf_hud = False
         
         # Variables de seguimiento
         self.exercise_name = "Bicep Curl"
@@ -37,94 +115,213 @@ class ExerciseTracker:
         self.rep_duration = 0
         self.form_feedback = ""
         
-        # Ejercicios disponibles
-        self.exercises = {
-            "1": "Bicep Curl",
-            "2": "Shoulder Press",
-            "3": "Lateral Raise",
-            "4": "Front Raise",
-            "5": "Hammer Curl",
-            "6": "Tricep Extension"
-        }
+        # Ejercicios disponibles (tecla -> nombre), en el orden de EXERCISE_SPECS
+        self.exercises = {str(key): name for key, name in enumerate(EXERCISE_RULES.names, 1)}
     
 
-    def get_landmarks(self, landmarks) -> Dict[str, Tuple[float, float]]:
+    def _create_pose(self, model_complexity: int) -> PoseBackend:
+        """Crea el backend de pose (MediaPipe si no se indicó otro) y construye el modelo."""
+        backend = self.pose_backend
+        if backend is None:
+            with self.startup.phase('model.import'):
+                backend = MediaPipePoseBackend(model_complexity)
+        with self.startup.phase('model.build'):
+            backend.load()
+        return backend
+    
+    def _load_model(self, model_complexity: int) -> None:
+        """
+        Construye el modelo y lo calienta con una inferencia sobre un frame
+        negro, para que el primer frame real no pague la inicialización.
+        En segundo plano, un error se guarda y se relanza en wait_for_model().
+        """
+        try:
+            with self.startup.phase('model'):
+                pose = self._create_pose(model_complexity)
+                with self.startup.phase('model.warmup'):
+                    pose.process(np.zeros((256, 256, 3), dtype=np.uint8))
+            self.pose = pose
+        except Exception as e:
+            if self._model_thread is None:
+                raise
+            self._model_error = e
+    
+    @property
+    def model_ready(self) -> bool:
+        """
+        True cuando el modelo está listo para inferir.
+        
+        Raises:
+            La excepción de la carga en segundo plano, si falló
+        """
+        if self._model_error is not None:
+            raise self._model_error
+        return self.pose is not None
+    
+    def wait_for_model(self, timeout: Optional[float] = None) -> bool:
+        """
+        Espera a que termine la carga en segundo plano del modelo.
+        
+        Returns:
+            model_ready tras la espera
+        """
+        if self._model_thread is not None:
+            self._model_thread.join(timeout)
+        return self.model_ready
+    
+    def close_model(self) -> None:
+        """Libera el modelo (esperando a la carga si sigue en curso)."""
+        if self._model_thread is not None:
+            self._model_thread.join()
+        if self.pose is not None:
+            self.pose.close()
+    
+    def reset_session(self, start_time: Optional[float] = None) -> None:
         """
-        Extrae las coordenadas de los landmarks relevantes.
+        Reinicia el estado del ejercicio, el filtro de landmarks y las
+        métricas de repetición, p. ej. antes de reproducir otra grabación con
+        el mismo tracker.
         
         Args:
-            landmarks: Landmarks de MediaPipe
+            start_time: Instante desde el que se mide la primera repetición
+                        (por defecto, time.time())
+        """
+        self.exercise_counter = 0
+        self.exercise_stage = None
+        self.rep_duration = 0
+        self.form_feedback = ""
+        self.last_rep_time = time.time() if start_time is None else start_time
+        self._rep_min_angle, self._rep_max_angle = math.inf, -math.inf
+        if self.landmark_filter is not None:
+            self.landmark_filter.reset()
+        self.analytics.reset()
+    
+    def get_landmarks(self, landmarks) -> PoseFrame:
+        """
+        Extrae las coordenadas y la visibilidad de los landmarks relevantes.
+        
+        Args:
+            landmarks: Landmarks de MediaPipe, array (33, 2+) o PoseFrame
         
         Returns:
-            Diccionario con coordenadas de puntos clave
-        """
-        return {
-            'left_shoulder': (landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value].x,
-                            landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value].y),
-            'right_shoulder': (landmarks[self.mp_pose.PoseLandmark.RIGHT_SHOULDER.value].x,
-                             landmarks[self.mp_pose.PoseLandmark.RIGHT_SHOULDER.value].y),
-            'left_elbow': (landmarks[self.mp_pose.PoseLandmark.LEFT_ELBOW.value].x,
-                          landmarks[self.mp_pose.PoseLandmark.LEFT_ELBOW.value].y),
-            'right_elbow': (landmarks[self.mp_pose.PoseLandmark.RIGHT_ELBOW.value].x,
-                           landmarks[self.mp_pose.PoseLandmark.RIGHT_ELBOW.value].y),
-            'left_wrist': (landmarks[self.mp_pose.PoseLandmark.LEFT_WRIST.value].x,
-                          landmarks[self.mp_pose.PoseLandmark.LEFT_WRIST.value].y),
-            'right_wrist': (landmarks[self.mp_pose.PoseLandmark.RIGHT_WRIST.value].x,
-                           landmarks[self.mp_pose.PoseLandmark.RIGHT_WRIST.value].y),
-            'left_hip': (landmarks[self.mp_pose.PoseLandmark.LEFT_HIP.value].x,
-                        landmarks[self.mp_pose.PoseLandmark.LEFT_HIP.value].y),
-            'right_hip': (landmarks[self.mp_pose.PoseLandmark.RIGHT_HIP.value].x,
-                         landmarks[self.mp_pose.PoseLandmark.RIGHT_HIP.value].y),
-        }
+            PoseFrame con los puntos clave
+        """
+        if isinstance(landmarks, PoseFrame):
+            return landmarks
+        if isinstance(landmarks, np.ndarray):
+            return PoseFrame.from_array(landmarks)
+        return PoseFrame.from_landmarks(landmarks)
     
-    def process_exercise(self, landmarks) -> None:
+    def process_exercise(self, landmarks, timestamp: Optional[float] = None) -> None:
         """
         Procesa el ejercicio seleccionado actualmente.
         
         Args:
-            landmarks: Landmarks de MediaPipe
+            landmarks: Landmarks de MediaPipe, array (33, 2+) o PoseFrame
+            timestamp: Instante del frame en segundos (por defecto, time.time())
         """
         points = self.get_landmarks(landmarks)
+        current_time = time.time() if timestamp is None else timestamp
+        if self.landmark_filter is not None:
+            points = self.landmark_filter.apply(points, current_time, self.exercise_name)
         
         rep_completed = False
         feedback = ""
         new_stage = self.exercise_stage
+        angles = None
         
-        # Procesar según el ejercicio seleccionado
-        if self.exercise_name == "Bicep Curl":
-            rep_completed, feedback, new_stage = process_bicep_curl(points, self.exercise_stage)
-        elif self.exercise_name == "Shoulder Press":
-            rep_completed, feedback, new_stage = process_shoulder_press(points, self.exercise_stage)
-        elif self.exercise_name == "Lateral Raise":
-            rep_completed, feedback, new_stage = process_lateral_raise(points, self.exercise_stage)
-        elif self.exercise_name == "Front Raise":
-            rep_completed, feedback, new_stage = process_front_raise(points, self.exercise_stage)
-        elif self.exercise_name == "Hammer Curl":
-            rep_completed, feedback, new_stage = process_hammer_curl(points, self.exercise_stage)
-        elif self.exercise_name == "Tricep Extension":
-            rep_completed, feedback, new_stage = process_tricep_extension(points, self.exercise_stage)
+        # Procesar según el ejercicio seleccionado (tabla de despacho compilada)
+        if self.exercise_name in EXERCISE_RULES:
+            angles = points.angles()
+            rep_completed, feedback, new_stage = EXERCISE_RULES.evaluate(
+                self.exercise_name, angles, self.exercise_stage)
         
+        previous_stage, previous_feedback = self.exercise_stage, self.form_feedback
         self.form_feedback = feedback
         self.exercise_stage = new_stage
         
         # Actualizar contador si se completó una repetición
         if rep_completed:
-            current_time = time.time()
             self.rep_duration = current_time - self.last_rep_time
             self.last_rep_time = current_time
             self.exercise_counter += 1
+        
+        if angles is not None:
+            angle = angles[EXERCISE_RULES.specs[self.exercise_name].joint]
+            if self.analytics.exercise_name != self.exercise_name:
+                self.analytics.set_exercise(self.exercise_name)
+            self.analytics.update(current_time, angle, new_stage, rep_completed)
+            if self.events is not None:
+                self._emit_events(angle, current_time, rep_completed, previous_stage, previous_feedback)
     
-    def draw_ui(self, frame: np.ndarray) -> np.ndarray:
+    def _emit_events(self, angle: float, timestamp: float, rep_completed: bool,
+                     previous_stage: Optional[str], previous_feedback: str) -> None:
         """
-        Dibuja la interfaz de usuario en el frame.
+        Emite los eventos del frame (ver rep_events.py) y acumula el rango del
+        ángulo de la repetición en curso.
+        """
+        self._rep_min_angle = min(self._rep_min_angle, angle)
+        self._rep_max_angle = max(self._rep_max_angle, angle)
+        event = partial(RepEvent, timestamp=timestamp, exercise=self.exercise_name,
+                        rep_index=self.exercise_counter, stage=self.exercise_stage,
+                        feedback=self.form_feedback, angle=angle)
+        if self.exercise_stage != previous_stage:
+            self.events.emit(event('stage'))
+        if self.form_feedback != previous_feedback:
+            self.events.emit(event('feedback'))
+        if rep_completed:
+            self.events.emit(event('rep', duration=self.rep_duration,
+                                   min_angle=self._rep_min_angle, max_angle=self._rep_max_angle))
+            self._rep_min_angle = self._rep_max_angle = angle
+    
+    def infer(self, image: np.ndarray):
+        """
+        Ejecuta el backend de pose sobre una imagen RGB, reducida según input_scale.
         
         Args:
-            frame: Frame de video
+            image: Frame RGB a resolución completa
         
         Returns:
-            Frame con UI dibujada
+            Resultados del backend (landmarks normalizados, válidos para el frame completo)
         """
-        height, width = frame.shape[:2]
+        if self.input_scale != 1.0:
+            image = self.frame_buffers.resize(image, self.input_scale)
+        return self.pose.process(image)
+    
+    def _infer_async(self, frame: np.ndarray, now: float) -> Optional[tuple]:
+        """
+        Envía un frame BGR a un backend asíncrono (p. ej. TasksPoseBackend) y
+        recoge el resultado más reciente que haya terminado.
+        
+        Args:
+            frame: Frame BGR a resolución completa
+            now: Instante del frame en segundos
+        
+        Returns:
+            (instante del frame del resultado, pose_landmarks, PoseFrame o None),
+            o None si no hay un resultado nuevo
+        """
+        source, offset = frame, (0, 0)
+        if self.roi_tracker is not None:
+            source, offset = self.roi_tracker.crop(frame)
+        image = self.frame_buffers.to_rgb(source)
+        if self.input_scale != 1.0:
+            image = self.frame_buffers.resize(image, self.input_scale)
+        timestamp_ms = int(now * 1000)
+        self.pose.submit(image, timestamp_ms, context=(offset, source.shape, frame.shape))
+        polled = self.pose.poll(timestamp_ms)
+        if polled is None:
+            return None
+        result_ms, results, (offset, crop_shape, frame_shape) = polled
+        if self.roi_tracker is not None:
+            self.roi_tracker.track(results, offset, crop_shape, frame_shape)
+        skeleton = results.pose_landmarks
+        landmarks = self.get_landmarks(skeleton.landmark) if skeleton else None
+        return result_ms / 1000.0, skeleton, landmarks
+    
+    def _draw_header(self, frame: np.ndarray) -> None:
+        """Panel superior: ejercicio, repeticiones y tiempo entre repeticiones."""
+        width = frame.shape[1]
         
         # Panel de información superior
         cv2.rectangle(frame, (0, 0), (width, 100), (245, 117, 16), -1)
@@ -141,93 +338,475 @@ class ExerciseTracker:
         if self.rep_duration > 0:
             cv2.putText(frame, f'Tiempo: {self.rep_duration:.1f}s',
                        (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+    
+    def _draw_footer(self, frame: np.ndarray) -> None:
+        """Panel inferior con el feedback de forma."""
+        height, width = frame.shape[:2]
         
         # Feedback de forma
         feedback_color = (0, 255, 0) if "Bien" in self.form_feedback or "Perfecto" in self.form_feedback or "Excelente" in self.form_feedback else (0, 165, 255)
         cv2.rectangle(frame, (0, height - 60), (width, height), (50, 50, 50), -1)
         cv2.putText(frame, self.form_feedback,
                    (10, height - 20), cv2.FONT_HERSHEY_SIMPLEX, 0.8, feedback_color, 2)
-        
-        # Instrucciones
-        cv2.putText(frame, 'Presiona 1-6 para cambiar ejercicio | Q para salir',
+    
+    def _draw_instructions(self, frame: np.ndarray) -> None:
+        """Instrucciones de teclado sobre el video."""
+        height = frame.shape[0]
+        cv2.putText(frame, 'Presiona 1-6 para cambiar ejercicio | P rendimiento | Q para salir',
                    (10, height - 80), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+    
+    def _analytics_box(self, frame: np.ndarray) -> tuple:
+        """Rectángulo (x0, y0, x1, y1) del panel de analítica, bajo el panel superior."""
+        width = frame.shape[1]
+        return width - 190, 110, width - 10, 210
+    
+    def _draw_analytics(self, frame: np.ndarray) -> None:
+        """Panel de analítica: fondo de la gráfica y métricas de la última repetición."""
+        x0, y0, x1, y1 = self._analytics_box(frame)
+        cv2.rectangle(frame, (x0, y0), (x1, y1), (40, 40, 40), -1)
+        rep = self.analytics.last_rep()
+        if rep is None:
+            lines = ('Tempo C/E: --', 'ROM: --  TUT: --')
+        else:
+            lines = (f"Tempo C/E: {rep['concentric']:.1f}s / {rep['eccentric']:.1f}s",
+                     f"ROM: {rep['rom']:.0f}  TUT: {rep['tut']:.1f}s")
+        for i, line in enumerate(lines):
+            cv2.putText(frame, line, (x0 + 8, y1 - 26 + i * 18),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.45, (255, 255, 255), 1)
+    
+    def draw_ui(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Dibuja la interfaz de usuario en el frame.
+        
+        Los paneles y textos se rasterizan solo cuando cambia el estado que
+        muestran o el tamaño del frame, y solo dentro de la franja de filas de
+        cada capa (ver overlay_cache.py); en el resto de frames se copian.
+        
+        Args:
+            frame: Frame de video
+        
+        Returns:
+            Frame con UI dibujada
+        """
+        shape = frame.shape
+        height = shape[0]
+        _, analytics_top, _, analytics_bottom = self._analytics_box(frame)
+        layers = self.overlay_layers
+        layers['header'].update(
+            (shape, self.exercise_name, self.exercise_counter, self.rep_duration),
+            shape, self._draw_header, rows=(0, 101))
+        layers['footer'].update((shape, self.form_feedback), shape, self._draw_footer,
+                                rows=(height - 60, height))
+        layers['instructions'].update(shape, shape, self._draw_instructions,
+                                      rows=(height - 100, height - 60))
+        layers['analytics'].update((shape, self.analytics.revision), shape, self._draw_analytics,
+                                   rows=(analytics_top, analytics_bottom + 1))
+        for layer in layers.values():
+            layer.compose(frame)
+        
+        # La gráfica del ángulo cambia en cada frame: se dibuja directamente
+        x0, y0, x1, _ = self._analytics_box(frame)
+        self.sparkline.draw(frame, self.analytics.angles, (x0 + 8, y0 + 8, x1 - 8, y0 + 52))
+        
+        # Panel de rendimiento por etapa
+        if self.show_perf_hud:
+            draw_perf_hud(frame, self.perf)
         
         return frame
     
-    def run(self):
+    def handle_key(self, key: int) -> bool:
         """
-        Ejecuta la aplicación de seguimiento de ejercicios.
-        """
-        cap = cv2.VideoCapture(0)
+        Procesa una tecla pulsada en la ventana de video.
+        
+        Args:
+            key: Código de tecla devuelto por cv2.waitKey (& 0xFF)
         
+        Returns:
+            True si se debe salir de la aplicación
+        """
+        if key == ord('q'):
+            return True
+        elif key == ord('p'):
+            self.show_perf_hud = not self.show_perf_hud
+        elif chr(key) in self.exercises:
+            self.exercise_name = self.exercises[chr(key)]
+            self.exercise_counter = 0
+            self.exercise_stage = None
+            self.form_feedback = ""
+            self._rep_min_angle, self._rep_max_angle = math.inf, -math.inf
+            print(f"\nEjercicio cambiado a: {self.exercise_name}")
+        return False
+    
+    def print_menu(self) -> None:
+        """
+        Muestra en consola los ejercicios disponibles y los controles.
+        """
         print("=== Aplicación de Seguimiento de Ejercicios ===")
         print("\nEjercicios disponibles:")
         for key, exercise in self.exercises.items():
             print(f"  {key}: {exercise}")
-        print("\nPresiona Q para salir\n")
+        print("\nPresiona P para ver el rendimiento por etapa")
+        print("Presiona Q para salir\n")
+    
+    def run(self, source=0):
+        """
+        Ejecuta la aplicación de seguimiento de ejercicios.
         
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                print("No se puede acceder a la cámara")
-                break
-            
-            # Voltear el frame horizontalmente para efecto espejo
-            frame = cv2.flip(frame, 1)
-            
-            # Convertir BGR a RGB
-            image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            image.flags.writeable = False
-            
-            # Procesar con MediaPipe
-            results = self.pose.process(image)
-            
-            # Convertir de nuevo a BGR
-            image.flags.writeable = True
-            image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+        Args:
+            source: Índice de cámara, ruta de video u objeto de captura
+        """
+        startup = self.startup
+        with startup.phase('camera'):
+            cap = source if hasattr(source, 'read') else cv2.VideoCapture(source)
+        
+        # La cámara se libera aunque falle la carga del modelo o el bucle
+        try:
+            self.print_menu()
             
-            # Procesar landmarks si se detectan
-            if results.pose_landmarks:
-                # Dibujar landmarks
-                self.mp_drawing.draw_landmarks(
-                    image,
-                    results.pose_landmarks,
-                    self.mp_pose.POSE_CONNECTIONS,
-                    self.mp_drawing.DrawingSpec(color=(245, 117, 66), thickness=2, circle_radius=2),
-                    self.mp_drawing.DrawingSpec(color=(245, 66, 230), thickness=2, circle_radius=2)
-                )
+            perf = self.perf
+            buffers = self.frame_buffers
+            skeleton = None
+            loading = not self.model_ready
+            if loading:
+                # Vista previa sin inferencia mientras el modelo carga en segundo plano
+                self.form_feedback = "Cargando modelo..."
+            while cap.isOpened():
+                perf.start_frame()
+                ret, frame = buffers.read(cap)
+                if not ret:
+                    print("No se puede acceder a la cámara")
+                    break
+                perf.lap('cap.read')
                 
-                # Procesar ejercicio
-                self.process_exercise(results.pose_landmarks.landmark)
-            
-            # Dibujar UI
-            image = self.draw_ui(image)
-            
-            # Mostrar frame
-            cv2.imshow('TrackG - Seguimiento de Ejercicios', image)
-            
-            # Manejo de teclas
-            key = cv2.waitKey(10) & 0xFF
-            if key == ord('q'):
-                break
-            elif chr(key) in self.exercises:
-                self.exercise_name = self.exercises[chr(key)]
-                self.exercise_counter = 0
-                self.exercise_stage = None
-                self.form_feedback = ""
-                print(f"\nEjercicio cambiado a: {self.exercise_name}")
-        
-        cap.release()
-        cv2.destroyAllWindows()
-        self.pose.close()
+                # Voltear el frame horizontalmente para efecto espejo
+                frame = buffers.mirror(frame)
+                now = time.time()
+                
+                if loading and self.model_ready:
+                    loading = False
+                    self.form_feedback = ""
+                
+                # Inferencia asíncrona sin resultado nuevo en este frame
+                pending = False
+                if loading:
+                    landmarks = None
+                    perf.skip()
+                elif getattr(self.pose, 'asynchronous', False):
+                    # Se envía el frame y se procesa el último resultado listo, con su
+                    # propio instante (el del frame del que salió)
+                    polled = self._infer_async(frame, now)
+                    perf.lap('cvtColor+detect_async')
+                    if polled is None:
+                        landmarks, pending = None, True
+                    else:
+                        now, skeleton, landmarks = polled
+                        if 'first_inference' not in startup.phases:
+                            startup.mark('first_inference')
+                            print(f"Arranque:\n{startup.format()}", file=sys.stderr)
+                        if self.recorder is not None:
+                            self.recorder.write(now, skeleton.landmark if skeleton else None)
+                            perf.lap('record')
+                elif self.scheduler is None or self.scheduler.should_infer():
+                    # Convertir BGR a RGB (solo la ROI si hay seguimiento, ver roi_tracker.py)
+                    source, offset = frame, (0, 0)
+                    if self.roi_tracker is not None:
+                        source, offset = self.roi_tracker.crop(frame)
+                    image = buffers.to_rgb(source)
+                    perf.lap('flip+cvtColor')
+                    
+                    # Procesar con MediaPipe
+                    inference_start = time.perf_counter()
+                    results = self.infer(image)
+                    if self.roi_tracker is not None:
+                        # Landmarks al frame completo y ROI del siguiente frame
+                        self.roi_tracker.track(results, offset, source.shape, frame.shape)
+                    perf.lap('pose.process')
+                    
+                    skeleton = results.pose_landmarks
+                    landmarks = self.get_landmarks(skeleton.landmark) if skeleton else None
+                    if 'first_inference' not in startup.phases:
+                        startup.mark('first_inference')
+                        print(f"Arranque:\n{startup.format()}", file=sys.stderr)
+                    if self.scheduler is not None:
+                        self.scheduler.observe(landmarks, now,
+                                               (time.perf_counter() - inference_start) * 1000.0)
+                    
+                    if self.recorder is not None:
+                        self.recorder.write(now, skeleton.landmark if skeleton else None)
+                        perf.lap('record')
+                else:
+                    # Frame saltado: landmarks extrapolados y último esqueleto detectado
+                    landmarks = self.scheduler.predict(now)
+                    perf.lap('flip+predict')
+                
+                # La interfaz se dibuja sobre el frame BGR, sin reconvertir la imagen RGB
+                image = frame
+                
+                # Procesar landmarks si se detectan
+                if landmarks is not None:
+                    # Dibujar landmarks
+                    if skeleton is not None:
+                        self.pose.draw(image, skeleton)
+                        perf.lap('draw_landmarks')
+                    
+                    # Procesar ejercicio
+                    self.process_exercise(landmarks, timestamp=now)
+                    perf.lap('process_exercise')
+                elif pending:
+                    # Último esqueleto mientras llega el siguiente resultado
+                    if skeleton is not None:
+                        self.pose.draw(image, skeleton)
+                        perf.lap('draw_landmarks')
+                elif self.landmark_filter is not None:
+                    self.landmark_filter.reset()
+                
+                # Dibujar UI
+                image = self.draw_ui(image)
+                perf.lap('draw_ui')
+                
+                # Mostrar frame
+                cv2.imshow('TrackG - Seguimiento de Ejercicios', image)
+                startup.mark('first_frame')
+                
+                # Manejo de teclas
+                key = cv2.waitKey(10) & 0xFF
+                perf.lap('imshow+waitKey')
+                perf.end_frame()
+                if self.handle_key(key):
+                    break
+        finally:
+            cap.release()
+            cv2.destroyAllWindows()
+            self.close_model()
+            if self.recorder is not None:
+                self.recorder.close()
+            if self.events is not None:
+                self.events.close()
+        if self.scheduler is not None:
+            print(f"Inferencia en {self.scheduler.inference_ratio:.0%} de los frames")
+    
+    def run_pipelined(self, source=0):
+        """
+        Ejecuta la aplicación con captura, inferencia y renderizado en hilos
+        separados (ver frame_pipeline.py).
+        
+        Args:
+            source: Índice de cámara, ruta de video u objeto de captura
+        """
+        from frame_pipeline import run_pipeline
+        
+        self.print_menu()
+        try:
+            self.wait_for_model()
+            run_pipeline(self, source)
+        finally:
+            self.close_model()
+            if self.recorder is not None:
+                self.recorder.close()
+            if self.events is not None:
+                self.events.close()
+    
+    def run_headless(self, source=0, max_frames: Optional[int] = None) -> int:
+        """
+        Ejecuta el seguimiento sin ventana (sin imshow ni waitKey), p. ej. en
+        servidores sin pantalla. El resultado se consume a través de los
+        eventos (self.events) o de la grabación. Termina al agotarse la
+        fuente, tras max_frames o con Ctrl+C.
+        
+        Usa el recorte de ROI y el planificador de inferencia igual que run().
+        Un backend asíncrono solo se usa sin esperar al modelo con una cámara;
+        con videos cada frame espera a su resultado.
+        
+        Args:
+            source: Índice de cámara, ruta de video u objeto de captura (p. ej.
+                    pose_backends.SyntheticCapture)
+            max_frames: Número máximo de frames a procesar
+        
+        Returns:
+            Número de frames procesados
+        """
+        with self.startup.phase('camera'):
+            cap = source if hasattr(source, 'read') else cv2.VideoCapture(source)
+        buffers = self.frame_buffers
+        # En videos (y fuentes simuladas) los tiempos salen de la posición, no del
+        # reloj, sumada a la hora de inicio: los eventos llevan siempre instantes
+        # de época, como en directo, y el historial los agrupa por su fecha real
+        from_file = not isinstance(source, int)
+        origin = time.time()
+        self.last_rep_time = origin
+        
+        frames = 0
+        try:
+            # La cámara ya está abierta mientras termina de cargar el modelo
+            self.wait_for_model()
+            # Con un backend asíncrono, los videos usan process(), que espera al
+            # resultado de cada frame: así no se descarta ninguno
+            asynchronous = getattr(self.pose, 'asynchronous', False) and not from_file
+            while cap.isOpened() and (max_frames is None or frames < max_frames):
+                ret, frame = buffers.read(cap)
+                if not ret:
+                    break
+                frame = buffers.mirror(frame)
+                now = origin + cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0 if from_file else time.time()
+                frames += 1
+
+                if asynchronous:
+                    # Cámara en directo: no se espera al modelo (ver run())
+                    polled = self._infer_async(frame, now)
+                    if polled is None:
+                        continue
+                    now, skeleton, landmarks = polled
+                elif self.scheduler is None or self.scheduler.should_infer():
+                    source, offset = frame, (0, 0)
+                    if self.roi_tracker is not None:
+                        source, offset = self.roi_tracker.crop(frame)
+                    inference_start = time.perf_counter()
+                    results = self.infer(buffers.to_rgb(source))
+                    if self.roi_tracker is not None:
+                        self.roi_tracker.track(results, offset, source.shape, frame.shape)
+                    skeleton = results.pose_landmarks
+                    landmarks = self.get_landmarks(skeleton.landmark) if skeleton else None
+                    if self.scheduler is not None:
+                        self.scheduler.observe(landmarks, now,
+                                               (time.perf_counter() - inference_start) * 1000.0)
+                else:
+                    # Frame saltado: landmarks extrapolados, sin grabar
+                    landmarks = self.scheduler.predict(now)
+                    if landmarks is not None:
+                        self.process_exercise(landmarks, timestamp=now)
+                    continue
+
+                if self.recorder is not None:
+                    self.recorder.write(now, skeleton.landmark if skeleton else None)
+                if landmarks is not None:
+                    self.process_exercise(landmarks, timestamp=now)
+                elif self.landmark_filter is not None:
+                    self.landmark_filter.reset()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            cap.release()
+            self.close_model()
+            if self.recorder is not None:
+                self.recorder.close()
+            if self.events is not None:
+                self.events.close()
+        return frames
 
 
 def main():
     """
     Función principal para ejecutar la aplicación.
     """
-    tracker = ExerciseTracker()
-    tracker.run()
+    parser = argparse.ArgumentParser(description="TrackG - Seguimiento de Ejercicios")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="Captura, inferencia y renderizado en hilos separados")
+    parser.add_argument('--record', metavar='ARCHIVO',
+                        help="Grabar los landmarks de la sesión (ver landmark_recording.py)")
+    parser.add_argument('--perf-dump', metavar='ARCHIVO',
+                        help="Volcar periódicamente los tiempos por etapa a JSON")
+    parser.add_argument('--perf-interval', type=float, default=10.0,
+                        help="Segundos entre volcados de --perf-dump")
+    parser.add_argument('--model-complexity', type=int, default=1, choices=(0, 1, 2),
+                        help="Complejidad del modelo de MediaPipe (0 = ligero)")
+    parser.add_argument('--input-scale', type=float, default=1.0,
+                        help="Escala de la imagen de entrada del modelo (p. ej. 0.5)")
+    parser.add_argument('--filter', action='store_true',
+                        help="Suavizar landmarks con el filtro One-Euro")
+    parser.add_argument('--roi', action='store_true',
+                        help="Convertir e inferir solo la región alrededor del atleta")
+    parser.add_argument('--infer-every', type=int, default=1, metavar='N',
+                        help="Ejecutar MediaPipe en 1 de cada N frames")
+    parser.add_argument('--adaptive', action='store_true',
+                        help="Saltar frames según la velocidad de los landmarks (descansos)")
+    parser.add_argument('--max-skip', type=int, default=6,
+                        help="Máximo de frames seguidos sin inferencia en modo adaptativo")
+    parser.add_argument('--budget-ms', type=float,
+                        help="Presupuesto medio de inferencia por frame en ms")
+    parser.add_argument('--headless', action='store_true',
+                        help="Sin ventana: solo eventos y grabación (servidores sin pantalla)")
+    parser.add_argument('--source', default='0',
+                        help="Índice de cámara, ruta de video o 'synthetic' (frames negros, "
+                             "sin cámara) (por defecto, 0)")
+    parser.add_argument('--backend', default='mediapipe', choices=tuple(POSE_BACKENDS),
+                        help="Backend de pose: MediaPipe, MediaPipe Tasks en LIVE_STREAM "
+                             "(asíncrono) o movimiento sintético del ejercicio")
+    parser.add_argument('--task-model', metavar='ARCHIVO',
+                        help="Con --backend tasks, ruta del .task (por defecto, "
+                             "MODEL_DIR/pose_landmarker_{lite,full,heavy}.task según --model-complexity)")
+    parser.add_argument('--model-dir', default='models',
+                        help="Carpeta de los modelos .task (por defecto, models)")
+    parser.add_argument('--max-frames', type=int,
+                        help="Con --headless, terminar tras N frames")
+    parser.add_argument('--exercise', choices=EXERCISE_RULES.names,
+                        help="Ejercicio inicial")
+    parser.add_argument('--events-jsonl', metavar='ARCHIVO',
+                        help="Añadir los eventos de repetición a un archivo JSONL")
+    parser.add_argument('--events-sqlite', metavar='ARCHIVO',
+                        help="Guardar los eventos de repetición en una base SQLite")
+    parser.add_argument('--events-stdout', action='store_true',
+                        help="Imprimir los eventos de repetición como JSON por línea")
+    parser.add_argument('--history-db', metavar='ARCHIVO',
+                        help="Guardar sesiones, series y repeticiones en el historial SQLite")
+    parser.add_argument('--user', default='local',
+                        help="Usuario del historial (por defecto, local)")
+    parser.add_argument('--thresholds', metavar='ARCHIVO',
+                        help="Cargar umbrales de etapa ajustados con threshold_tuner.py")
+    args = parser.parse_args()
+    
+    uses_scheduler = args.infer_every > 1 or args.adaptive or args.budget_ms
+    if uses_scheduler and args.backend == 'tasks':
+        parser.error("--infer-every, --adaptive y --budget-ms no se usan con --backend tasks "
+                     "(la inferencia asíncrona ya no bloquea el bucle)")
+    if uses_scheduler and args.pipeline:
+        parser.error("--infer-every, --adaptive y --budget-ms no se usan con --pipeline "
+                     "(la inferencia corre en su propio hilo sobre el frame más reciente)")
+    if args.max_frames is not None and not args.headless:
+        parser.error("--max-frames solo se usa con --headless")
+    
+    if args.thresholds:
+        from exercise_utils import load_thresholds
+        load_thresholds(args.thresholds)
+    pose_backend = None
+    if args.backend == 'synthetic':
+        pose_backend = SyntheticPoseBackend(args.exercise or "Bicep Curl")
+    elif args.backend == 'tasks':
+        pose_backend = TasksPoseBackend(POSE_LANDMARKER_VARIANTS[args.model_complexity],
+                                        model_path=args.task_model, model_dir=args.model_dir)
+    tracker = ExerciseTracker(model_complexity=args.model_complexity,
+                              input_scale=args.input_scale,
+                              filter_landmarks=args.filter,
+                              track_roi=args.roi,
+                              background_load=True,
+                              pose_backend=pose_backend)
+    if uses_scheduler:
+        from inference_scheduler import InferenceScheduler
+        tracker.scheduler = InferenceScheduler(every_n=args.infer_every, adaptive=args.adaptive,
+                                               max_skip=args.max_skip, budget_ms=args.budget_ms)
+    tracker.perf.dump_path = args.perf_dump
+    tracker.perf.dump_interval = args.perf_interval
+    if args.record:
+        from landmark_recording import LandmarkRecorder
+        tracker.recorder = LandmarkRecorder(args.record)
+    if args.exercise:
+        tracker.exercise_name = args.exercise
+    history_sinks = []
+    if args.history_db:
+        from history_store import HistorySink, HistoryStore
+        history_sinks.append(HistorySink(HistoryStore(args.history_db), args.user))
+    tracker.events = build_event_writer(args.events_jsonl, args.events_sqlite, args.events_stdout,
+                                        extra_sinks=history_sinks)
+    source = int(args.source) if args.source.isdigit() else args.source
+    if source == 'synthetic':
+        source = SyntheticCapture()
+    if args.headless:
+        frames = tracker.run_headless(source, max_frames=args.max_frames)
+        print(f"{frames} frames, {tracker.exercise_counter} repeticiones de {tracker.exercise_name}",
+              file=sys.stderr)
+    elif args.pipeline:
+        tracker.run_pipelined(source)
+    else:
+        tracker.run(source)
 
 
 if __name__ == "__main__":
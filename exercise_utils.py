@@ -1,33 +1,456 @@
 """
 Utilidades y funciones auxiliares para el rastreador de ejercicios.
+NumPy se importa en el primer cálculo por lotes (ver lazy_import.py): el
+motor de reglas y el ángulo de un solo frame solo usan math.
 """
 
-import numpy as np
-from typing import Dict, Tuple
+from __future__ import annotations
 
+import math
+import operator
+from functools import lru_cache
+from typing import Callable, Dict, Mapping, NamedTuple, Optional, Tuple
 
-def calculate_angle(a: Tuple, b: Tuple, c: Tuple) -> float:
+from lazy_import import lazy_import
+
+np = lazy_import('numpy')
+
+
+# Índices de MediaPipe Pose (33 landmarks) usados por el rastreador
+LANDMARK_INDICES: Dict[str, int] = {
+    'left_shoulder': 11,
+    'right_shoulder': 12,
+    'left_elbow': 13,
+    'right_elbow': 14,
+    'left_wrist': 15,
+    'right_wrist': 16,
+    'left_hip': 23,
+    'right_hip': 24,
+    'left_knee': 25,
+    'right_knee': 26,
+    'left_ankle': 27,
+    'right_ankle': 28,
+}
+
+NUM_POSE_LANDMARKS = 33
+
+# Articulaciones (a, vértice, c) de la matriz de ángulos, en orden de columna
+JOINT_TRIPLETS: Dict[str, Tuple[str, str, str]] = {
+    'left_elbow': ('left_shoulder', 'left_elbow', 'left_wrist'),
+    'right_elbow': ('right_shoulder', 'right_elbow', 'right_wrist'),
+    'left_shoulder': ('left_hip', 'left_shoulder', 'left_elbow'),
+    'right_shoulder': ('right_hip', 'right_shoulder', 'right_elbow'),
+    'left_shoulder_wrist': ('left_hip', 'left_shoulder', 'left_wrist'),
+    'right_shoulder_wrist': ('right_hip', 'right_shoulder', 'right_wrist'),
+    'left_hip': ('left_shoulder', 'left_hip', 'left_knee'),
+    'right_hip': ('right_shoulder', 'right_hip', 'right_knee'),
+    'left_knee': ('left_hip', 'left_knee', 'left_ankle'),
+    'right_knee': ('right_hip', 'right_knee', 'right_ankle'),
+}
+
+JOINT_NAMES: Tuple[str, ...] = tuple(JOINT_TRIPLETS)
+
+
+@lru_cache(maxsize=None)
+def _joint_index_array() -> np.ndarray:
+    """Índices (n_joints, 3) sobre los 33 landmarks, calculados una sola vez."""
+    return np.array(
+        [[LANDMARK_INDICES[name] for name in triplet] for triplet in JOINT_TRIPLETS.values()],
+        dtype=np.intp
+    )
+
+
+def __getattr__(name: str):
+    # JOINT_INDEX_ARRAY se construye al pedirlo, para no importar NumPy al cargar el módulo
+    if name == 'JOINT_INDEX_ARRAY':
+        return _joint_index_array()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def calculate_angles(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
     """
-    Calcula el ángulo entre tres puntos.
+    Calcula ángulos en lote entre tríos de puntos.
     
     Args:
-        a, b, c: Tuplas de coordenadas (x, y)
+        a, b, c: Arrays (..., 2) con coordenadas (x, y); b es el vértice
     
     Returns:
-        Ángulo en grados
+        Array (...) con ángulos en grados en el rango [0, 180]
     """
-    a = np.array(a)
-    b = np.array(b)
-    c = np.array(c)
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    c = np.asarray(c, dtype=np.float64)
     
-    radians = np.arctan2(c[1] - b[1], c[0] - b[0]) - \
-              np.arctan2(a[1] - b[1], a[0] - b[0])
+    radians = np.arctan2(c[..., 1] - b[..., 1], c[..., 0] - b[..., 0]) - \
+              np.arctan2(a[..., 1] - b[..., 1], a[..., 0] - b[..., 0])
     angle = np.abs(radians * 180.0 / np.pi)
     
-    if angle > 180.0:
-        angle = 360 - angle
+    return np.where(angle > 180.0, 360 - angle, angle)
+
+
+def calculate_joint_angles(landmarks: np.ndarray) -> np.ndarray:
+    """
+    Calcula la matriz completa de ángulos articulares en una sola pasada.
+    
+    Args:
+        landmarks: Array (N, 33, 2+) o (33, 2+) con coordenadas normalizadas;
+                   columnas extra (z, visibilidad) se ignoran
+    
+    Returns:
+        Array (N, len(JOINT_NAMES)) o (len(JOINT_NAMES),) con ángulos en grados,
+        columnas en el orden de JOINT_NAMES
+    """
+    landmarks = np.asarray(landmarks, dtype=np.float64)[..., :2]
+    points = landmarks[..., _joint_index_array(), :]
+    return calculate_angles(points[..., 0, :], points[..., 1, :], points[..., 2, :])
+
+
+def calculate_angle(a: Tuple, b: Tuple, c: Tuple) -> float:
+    """
+    Calcula el ángulo entre tres puntos.
+    
+    Args:
+        a, b, c: Tuplas de coordenadas (x, y)
     
-    return angle
+    Returns:
+        Ángulo en grados
+    """
+    # Misma fórmula que calculate_angles, sin NumPy para un solo ángulo
+    radians = math.atan2(c[1] - b[1], c[0] - b[0]) - math.atan2(a[1] - b[1], a[0] - b[0])
+    angle = abs(radians * 180.0 / math.pi)
+    return 360 - angle if angle > 180.0 else angle
+
+
+class StageRule(NamedTuple):
+    """
+    Banda de ángulo de un ejercicio. Las reglas se evalúan en orden y gana la
+    primera cuya comparación se cumple; op=None actúa como caso por defecto.
+    """
+    op: Optional[str]
+    threshold: float
+    feedback: str
+    stage: Optional[str] = None           # Nueva etapa (None = sin cambio)
+    completes_from: Optional[str] = None  # Etapa previa que completa una repetición
+
+
+class ExerciseSpec(NamedTuple):
+    """Especificación declarativa de un ejercicio."""
+    name: str
+    joint: str  # Clave de JOINT_TRIPLETS
+    rules: Tuple[StageRule, ...]
+
+    def stage_rule_indices(self) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Índices de las reglas de la posición inicial (la que completa la
+        repetición) y de la contracción (la etapa de completes_from).
+
+        Returns:
+            (inicial, contracción); None si el ejercicio no cuenta repeticiones
+        """
+        start = next((i for i, rule in enumerate(self.rules) if rule.completes_from is not None), None)
+        if start is None:
+            return None, None
+        peak_stage = self.rules[start].completes_from
+        peak = next((i for i, rule in enumerate(self.rules)
+                     if rule.stage == peak_stage and rule.op is not None), None)
+        return start, peak
+
+    def with_thresholds(self, thresholds: Mapping[str, float]) -> 'ExerciseSpec':
+        """
+        Copia con otros umbrales para las reglas que fijan etapa.
+
+        Args:
+            thresholds: Umbral por nombre de etapa (p. ej. {'down': 155, 'up': 45})
+        """
+        stages = {rule.stage for rule in self.rules if rule.stage is not None}
+        unknown = set(thresholds) - stages
+        if unknown:
+            raise ValueError(f"{self.name}: etapas desconocidas {sorted(unknown)}")
+        return self._replace(rules=tuple(
+            rule._replace(threshold=float(thresholds[rule.stage])) if rule.stage in thresholds else rule
+            for rule in self.rules))
+
+
+EXERCISE_SPECS: Tuple[ExerciseSpec, ...] = (
+    ExerciseSpec("Bicep Curl", 'left_elbow', (
+        StageRule('>', 160, "Brazo extendido - ¡Bien!", "down", "up"),
+        StageRule('<', 40, "Flexión completa - ¡Perfecto!", "up"),
+        StageRule('<=', 90, "En movimiento..."),
+        StageRule(None, 0, "Mantén el codo estable"),
+    )),
+    ExerciseSpec("Shoulder Press", 'left_elbow', (
+        StageRule('<', 90, "Posición inicial - ¡Listo!", "down", "up"),
+        StageRule('>', 160, "Brazos extendidos - ¡Excelente!", "up"),
+        StageRule(None, 0, "Presionando..."),
+    )),
+    ExerciseSpec("Lateral Raise", 'left_shoulder', (
+        StageRule('<', 30, "Brazos abajo - ¡Bien!", "down", "up"),
+        StageRule('>', 80, "Brazos a la altura del hombro - ¡Perfecto!", "up"),
+        StageRule(None, 0, "Elevando..."),
+    )),
+    ExerciseSpec("Front Raise", 'left_shoulder_wrist', (
+        StageRule('<', 30, "Brazos abajo - ¡Listo!", "down", "up"),
+        StageRule('>', 80, "Brazos al frente - ¡Excelente!", "up"),
+        StageRule(None, 0, "Elevando al frente..."),
+    )),
+    ExerciseSpec("Hammer Curl", 'left_elbow', (
+        StageRule('>', 160, "Brazo extendido - ¡Bien!", "down", "up"),
+        StageRule('<', 45, "Flexión completa - ¡Perfecto!", "up"),
+        StageRule(None, 0, "Contrayendo..."),
+    )),
+    ExerciseSpec("Tricep Extension", 'left_elbow', (
+        StageRule('<', 60, "Brazo flexionado - ¡Bien!", "flexed", "extended"),
+        StageRule('>', 160, "Extensión completa - ¡Excelente!", "extended"),
+        StageRule(None, 0, "Extendiendo..."),
+    )),
+)
+
+_COMPARATORS = {'>': operator.gt, '<': operator.lt, '>=': operator.ge, '<=': operator.le}
+
+
+class FrameAngles(dict):
+    """
+    Ángulos articulares de un frame, calculados bajo demanda.
+
+    Cada articulación se calcula una sola vez por frame aunque la consulten
+    varias especificaciones.
+    """
+
+    def __init__(self, points: Mapping[str, Tuple[float, float]]):
+        super().__init__()
+        self.points = points
+
+    def __missing__(self, joint: str) -> float:
+        a, b, c = JOINT_TRIPLETS[joint]
+        angle = self[joint] = calculate_angle(self.points[a], self.points[b], self.points[c])
+        return angle
+
+
+def compile_rules(rules: Tuple[StageRule, ...]) -> Callable[[float, Optional[str]], Tuple[bool, str, Optional[str]]]:
+    """
+    Compila las reglas de un ejercicio en una función (angle, stage) -> resultado.
+
+    Args:
+        rules: Reglas en orden de evaluación
+
+    Returns:
+        Función que devuelve (rep_completed, feedback, new_stage)
+    """
+    compiled = tuple(
+        (_COMPARATORS[rule.op] if rule.op is not None else None, rule.threshold,
+         rule.feedback, rule.stage, rule.completes_from)
+        for rule in rules
+    )
+
+    def evaluate(angle: float, current_stage: Optional[str]) -> Tuple[bool, str, Optional[str]]:
+        for compare, threshold, feedback, stage, completes_from in compiled:
+            if compare is None or compare(angle, threshold):
+                rep_completed = completes_from is not None and current_stage == completes_from
+                return rep_completed, feedback, current_stage if stage is None else stage
+        return False, "", current_stage
+
+    return evaluate
+
+
+# Códigos de los arrays de evaluate_batch: sin etapa (None) y sin valor
+NO_STAGE = -1
+_UNSET = -2
+
+
+class BatchEvaluation(NamedTuple):
+    """
+    Resultado de evaluar las reglas de un ejercicio sobre una serie completa.
+
+    rules: Índice de la regla que se cumplió en cada frame (-1 = ninguna)
+    stages: Etapa tras cada frame, como índice en stage_names (-1 = None)
+    rep_indices: Frames que completan una repetición
+    rep_durations: Tiempo desde la repetición anterior (si hay timestamps)
+    """
+    spec: ExerciseSpec
+    rules: np.ndarray
+    stages: np.ndarray
+    stage_names: Tuple[str, ...]
+    rep_indices: np.ndarray
+    rep_durations: Optional[np.ndarray] = None
+
+    def stage_labels(self) -> list:
+        """Etapas por frame como cadenas (None = sin etapa)."""
+        names = self.stage_names + (None,)
+        return [names[code] for code in self.stages.tolist()]
+
+    def feedback_labels(self) -> list:
+        """Feedback por frame, como lo devuelve evaluate()."""
+        feedback = tuple(rule.feedback for rule in self.spec.rules) + ("",)
+        return [feedback[index] for index in self.rules.tolist()]
+
+    @property
+    def final_stage(self) -> Optional[str]:
+        """Etapa tras el último frame (None si la serie está vacía o sin etapa)."""
+        if not len(self.stages) or self.stages[-1] == NO_STAGE:
+            return None
+        return self.stage_names[self.stages[-1]]
+
+    @property
+    def final_feedback(self) -> str:
+        """Feedback del último frame ("" si la serie está vacía o ninguna regla se cumplió)."""
+        if not len(self.rules) or self.rules[-1] < 0:
+            return ""
+        return self.spec.rules[self.rules[-1]].feedback
+
+
+def evaluate_batch(spec: ExerciseSpec, angles: np.ndarray, current_stage: Optional[str] = None,
+                   timestamps: Optional[np.ndarray] = None,
+                   start_time: Optional[float] = None) -> BatchEvaluation:
+    """
+    Evalúa las reglas de un ejercicio sobre toda una serie de ángulos en una
+    pasada vectorizada, con el mismo resultado que llamar a evaluate() frame a
+    frame encadenando la etapa.
+
+    La regla de cada frame es la primera que se cumple (np.select); la etapa
+    es la de la última regla con etapa hasta ese frame (relleno hacia
+    delante), y un frame completa una repetición si su regla tiene
+    completes_from igual a la etapa del frame anterior.
+
+    Args:
+        spec: Especificación del ejercicio
+        angles: Array (N,) con el ángulo de spec.joint, o (N, n_joints) en el
+                orden de JOINT_NAMES (p. ej. calculate_joint_angles)
+        current_stage: Etapa antes del primer frame
+        timestamps: Array (N,) de tiempos, para las duraciones de las repeticiones
+        start_time: Referencia de la primera duración (por defecto, timestamps[0])
+
+    Returns:
+        BatchEvaluation
+    """
+    angles = np.asarray(angles, dtype=np.float64)
+    if angles.ndim == 2:
+        angles = angles[:, JOINT_NAMES.index(spec.joint)]
+    rules = spec.rules
+    stage_names = tuple(dict.fromkeys(
+        stage for rule in rules for stage in (rule.stage, rule.completes_from) if stage is not None))
+    if current_stage is not None and current_stage not in stage_names:
+        stage_names += (current_stage,)
+    codes = {name: code for code, name in enumerate(stage_names)}
+    initial = codes[current_stage] if current_stage is not None else NO_STAGE
+
+    # Primera regla que se cumple en cada frame (-1 si ninguna)
+    conditions = [np.ones(len(angles), dtype=bool) if rule.op is None
+                  else _COMPARATORS[rule.op](angles, rule.threshold) for rule in rules]
+    rule_index = np.select(conditions, np.arange(len(rules), dtype=np.int8), np.int8(-1))
+
+    # Tablas por regla; la posición -1 corresponde a "ninguna regla"
+    rule_stage = np.array([codes[rule.stage] if rule.stage is not None else _UNSET
+                           for rule in rules] + [_UNSET], dtype=np.int8)
+    rule_completes = np.array([codes[rule.completes_from] if rule.completes_from is not None else _UNSET
+                               for rule in rules] + [_UNSET], dtype=np.int8)
+
+    # Etapa de cada frame: la de la última regla con etapa hasta ese frame
+    new_stage = rule_stage[rule_index]
+    last_set = np.where(new_stage != _UNSET, np.arange(len(angles)), -1)
+    np.maximum.accumulate(last_set, out=last_set)
+    stages = np.where(last_set >= 0, new_stage[last_set], np.int8(initial)).astype(np.int8)
+
+    previous = np.empty_like(stages)
+    previous[:1] = initial
+    previous[1:] = stages[:-1]
+    rep_indices = np.flatnonzero(rule_completes[rule_index] == previous)
+
+    rep_durations = None
+    if timestamps is not None:
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        rep_times = timestamps[rep_indices]
+        if start_time is None:
+            start_time = timestamps[0] if len(timestamps) else 0.0
+        rep_durations = np.diff(rep_times, prepend=start_time)
+
+    return BatchEvaluation(spec, rule_index, stages, stage_names, rep_indices, rep_durations)
+
+
+class ExerciseRules:
+    """
+    Tabla de despacho compilada a partir de especificaciones de ejercicio.
+
+    El coste por frame es una búsqueda en diccionario más la evaluación de las
+    reglas del ejercicio activo, independientemente del número de ejercicios.
+    """
+
+    def __init__(self, specs: Tuple[ExerciseSpec, ...] = EXERCISE_SPECS):
+        self.specs = {spec.name: spec for spec in specs}
+        self._table = {spec.name: (spec.joint, compile_rules(spec.rules)) for spec in specs}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._table
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        """Nombres de los ejercicios en orden de definición."""
+        return tuple(self.specs)
+
+    def evaluate(self, name: str, angles: Mapping[str, float],
+                 current_stage: Optional[str]) -> Tuple[bool, str, Optional[str]]:
+        """
+        Evalúa un ejercicio sobre los ángulos de un frame.
+
+        Args:
+            name: Nombre del ejercicio
+            angles: Ángulos por articulación (p. ej. FrameAngles)
+            current_stage: Etapa actual del ejercicio
+
+        Returns:
+            (rep_completed, feedback, new_stage)
+        """
+        joint, evaluate_rules = self._table[name]
+        return evaluate_rules(angles[joint], current_stage)
+
+    def evaluate_batch(self, name: str, angles: np.ndarray, current_stage: Optional[str] = None,
+                       timestamps: Optional[np.ndarray] = None,
+                       start_time: Optional[float] = None) -> BatchEvaluation:
+        """Evalúa un ejercicio sobre una serie completa (ver evaluate_batch)."""
+        return evaluate_batch(self.specs[name], angles, current_stage, timestamps, start_time)
+
+    def set_thresholds(self, name: str, thresholds: Mapping[str, float]) -> None:
+        """
+        Sustituye los umbrales de las reglas que fijan etapa de un ejercicio
+        (p. ej. los calculados por threshold_tuner.py).
+
+        Args:
+            name: Nombre del ejercicio
+            thresholds: Umbral por nombre de etapa
+        """
+        spec = self.specs[name].with_thresholds(thresholds)
+        self.specs[name] = spec
+        self._table[name] = (spec.joint, compile_rules(spec.rules))
+
+    def process(self, name: str, points: Mapping[str, Tuple[float, float]],
+                current_stage: Optional[str]) -> Tuple[bool, str, Optional[str]]:
+        """Como evaluate(), pero a partir de las coordenadas de los puntos clave."""
+        return self.evaluate(name, FrameAngles(points), current_stage)
+
+
+EXERCISE_RULES = ExerciseRules()
+
+
+def load_thresholds(path: str, rules: ExerciseRules = EXERCISE_RULES) -> Tuple[str, ...]:
+    """
+    Carga los umbrales de un JSON de threshold_tuner.py
+    ({"exercises": {nombre: {"thresholds": {etapa: umbral}, ...}}}).
+
+    Args:
+        path: Ruta del JSON
+        rules: Tabla a actualizar (por defecto, la global)
+
+    Returns:
+        Ejercicios actualizados
+    """
+    import json
+
+    with open(path, encoding='utf-8') as f:
+        exercises = json.load(f).get('exercises', {})
+    for name, entry in exercises.items():
+        if name not in rules:
+            raise ValueError(f"Ejercicio desconocido en {path}: {name}")
+        rules.set_thresholds(name, entry['thresholds'])
+    return tuple(exercises)
 
 
 def process_bicep_curl(points: Dict[str, Tuple[float, float]], current_stage: str) -> Tuple[bool, str, str]:
@@ -41,31 +464,7 @@ def process_bicep_curl(points: Dict[str, Tuple[float, float]], current_stage: st
     Returns:
         (rep_completed, feedback, new_stage)
     """
-    angle = calculate_angle(
-        points['left_shoulder'],
-        points['left_elbow'],
-        points['left_wrist']
-    )
-    
-    feedback = ""
-    rep_completed = False
-    new_stage = current_stage
-    
-    # Detectar fase del ejercicio
-    if angle > 160:
-        feedback = "Brazo extendido - ¡Bien!"
-        if current_stage == "up":
-            rep_completed = True
-        new_stage = "down"
-    elif angle < 40:
-        feedback = "Flexión completa - ¡Perfecto!"
-        new_stage = "up"
-    elif 40 <= angle <= 90:
-        feedback = "En movimiento..."
-    else:
-        feedback = "Mantén el codo estable"
-    
-    return rep_completed, feedback, new_stage
+    return EXERCISE_RULES.process("Bicep Curl", points, current_stage)
 
 
 def process_shoulder_press(points: Dict[str, Tuple[float, float]], current_stage: str) -> Tuple[bool, str, str]:
@@ -79,28 +478,7 @@ def process_shoulder_press(points: Dict[str, Tuple[float, float]], current_stage
     Returns:
         (rep_completed, feedback, new_stage)
     """
-    elbow_angle = calculate_angle(
-        points['left_shoulder'],
-        points['left_elbow'],
-        points['left_wrist']
-    )
-    
-    feedback = ""
-    rep_completed = False
-    new_stage = current_stage
-    
-    if elbow_angle < 90:
-        feedback = "Posición inicial - ¡Listo!"
-        if current_stage == "up":
-            rep_completed = True
-        new_stage = "down"
-    elif elbow_angle > 160:
-        feedback = "Brazos extendidos - ¡Excelente!"
-        new_stage = "up"
-    else:
-        feedback = "Presionando..."
-    
-    return rep_completed, feedback, new_stage
+    return EXERCISE_RULES.process("Shoulder Press", points, current_stage)
 
 
 def process_lateral_raise(points: Dict[str, Tuple[float, float]], current_stage: str) -> Tuple[bool, str, str]:
@@ -114,28 +492,7 @@ def process_lateral_raise(points: Dict[str, Tuple[float, float]], current_stage:
     Returns:
         (rep_completed, feedback, new_stage)
     """
-    angle = calculate_angle(
-        points['left_hip'],
-        points['left_shoulder'],
-        points['left_elbow']
-    )
-    
-    feedback = ""
-    rep_completed = False
-    new_stage = current_stage
-    
-    if angle < 30:
-        feedback = "Brazos abajo - ¡Bien!"
-        if current_stage == "up":
-            rep_completed = True
-        new_stage = "down"
-    elif angle > 80:
-        feedback = "Brazos a la altura del hombro - ¡Perfecto!"
-        new_stage = "up"
-    else:
-        feedback = "Elevando..."
-    
-    return rep_completed, feedback, new_stage
+    return EXERCISE_RULES.process("Lateral Raise", points, current_stage)
 
 
 def process_front_raise(points: Dict[str, Tuple[float, float]], current_stage: str) -> Tuple[bool, str, str]:
@@ -149,28 +506,7 @@ def process_front_raise(points: Dict[str, Tuple[float, float]], current_stage: s
     Returns:
         (rep_completed, feedback, new_stage)
     """
-    shoulder_wrist_angle = calculate_angle(
-        points['left_hip'],
-        points['left_shoulder'],
-        points['left_wrist']
-    )
-    
-    feedback = ""
-    rep_completed = False
-    new_stage = current_stage
-    
-    if shoulder_wrist_angle < 30:
-        feedback = "Brazos abajo - ¡Listo!"
-        if current_stage == "up":
-            rep_completed = True
-        new_stage = "down"
-    elif shoulder_wrist_angle > 80:
-        feedback = "Brazos al frente - ¡Excelente!"
-        new_stage = "up"
-    else:
-        feedback = "Elevando al frente..."
-    
-    return rep_completed, feedback, new_stage
+    return EXERCISE_RULES.process("Front Raise", points, current_stage)
 
 
 def process_hammer_curl(points: Dict[str, Tuple[float, float]], current_stage: str) -> Tuple[bool, str, str]:
@@ -184,28 +520,7 @@ def process_hammer_curl(points: Dict[str, Tuple[float, float]], current_stage: s
     Returns:
         (rep_completed, feedback, new_stage)
     """
-    angle = calculate_angle(
-        points['left_shoulder'],
-        points['left_elbow'],
-        points['left_wrist']
-    )
-    
-    feedback = ""
-    rep_completed = False
-    new_stage = current_stage
-    
-    if angle > 160:
-        feedback = "Brazo extendido - ¡Bien!"
-        if current_stage == "up":
-            rep_completed = True
-        new_stage = "down"
-    elif angle < 45:
-        feedback = "Flexión completa - ¡Perfecto!"
-        new_stage = "up"
-    else:
-        feedback = "Contrayendo..."
-    
-    return rep_completed, feedback, new_stage
+    return EXERCISE_RULES.process("Hammer Curl", points, current_stage)
 
 
 def process_tricep_extension(points: Dict[str, Tuple[float, float]], current_stage: str) -> Tuple[bool, str, str]:
@@ -219,25 +534,4 @@ def process_tricep_extension(points: Dict[str, Tuple[float, float]], current_sta
     Returns:
         (rep_completed, feedback, new_stage)
     """
-    angle = calculate_angle(
-        points['left_shoulder'],
-        points['left_elbow'],
-        points['left_wrist']
-    )
-    
-    feedback = ""
-    rep_completed = False
-    new_stage = current_stage
-    
-    if angle < 60:
-        feedback = "Brazo flexionado - ¡Bien!"
-        if current_stage == "extended":
-            rep_completed = True
-        new_stage = "flexed"
-    elif angle > 160:
-        feedback = "Extensión completa - ¡Excelente!"
-        new_stage = "extended"
-    else:
-        feedback = "Extendiendo..."
-    
-    return rep_completed, feedback, new_stage
+    return EXERCISE_RULES.process("Tricep Extension", points, current_stage)
@@ -0,0 +1,182 @@
+"""
+Evaluación de la precisión del conteo con y sin el filtro de landmarks.
+
+Compara el conteo de repeticiones de ExerciseTracker con el filtro One-Euro
+activado y desactivado:
+
+- Sobre flujos sintéticos con el temblor típico del modelo ligero y entrada
+  reducida (ruido gaussiano más saltos esporádicos de landmarks).
+- Sobre grabaciones .trkg etiquetadas con el número real de repeticiones,
+  capturadas con `exercise_tracker.py --model-complexity 0 --input-scale 0.5
+  --record sesion.trkg`.
+
+Uso:
+    python filter_evaluation.py
+    python filter_evaluation.py --exercise "Bicep Curl" sesion1.trkg:12 sesion2.trkg:10
+"""
+
+import argparse
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from benchmark import synthetic_landmark_stream
+from exercise_tracker import ExerciseTracker
+
+
+# (ruido gaussiano, probabilidad de salto por landmark y frame)
+JITTER_LEVELS: Tuple[Tuple[float, float], ...] = (
+    (0.005, 0.0),
+    (0.01, 0.01),
+    (0.02, 0.03),
+    (0.03, 0.05),
+)
+OUTLIER_SCALE = 0.08
+
+
+def add_jitter(landmarks: np.ndarray, noise: float, outlier_rate: float,
+               outlier_scale: float = OUTLIER_SCALE, seed: int = 0) -> np.ndarray:
+    """
+    Añade temblor a una sesión de landmarks.
+
+    Args:
+        landmarks: Array (N, 33, 3) sin ruido
+        noise: Desviación típica del ruido gaussiano por frame
+        outlier_rate: Probabilidad de que un landmark salte en un frame
+        outlier_scale: Desviación típica de los saltos
+        seed: Semilla
+
+    Returns:
+        Array nuevo con el temblor aplicado a x, y
+    """
+    rng = np.random.default_rng(seed)
+    jittered = landmarks.copy()
+    xy = jittered[:, :, :2]
+    xy += rng.normal(0, noise, xy.shape)
+    outliers = rng.random(xy.shape[:2]) < outlier_rate
+    xy += outliers[..., None] * rng.normal(0, outlier_scale, xy.shape)
+    return jittered
+
+
+def count_reps(landmarks: np.ndarray, timestamps: np.ndarray, exercise_name: str,
+               filter_landmarks: bool) -> Dict:
+    """
+    Reproduce una sesión frame a frame por ExerciseTracker.process_exercise.
+
+    Returns:
+        Repeticiones contadas y número de cambios de feedback (parpadeo)
+    """
+    tracker = ExerciseTracker(load_model=False, filter_landmarks=filter_landmarks)
+    tracker.exercise_name = exercise_name
+    feedback_changes = 0
+    for frame, t in zip(landmarks, timestamps.tolist()):
+        if np.isnan(frame[:, :2]).any():
+            if tracker.landmark_filter is not None:
+                tracker.landmark_filter.reset()
+            continue
+        previous = tracker.form_feedback
+        tracker.process_exercise(frame, timestamp=t)
+        feedback_changes += tracker.form_feedback != previous
+    return {'reps': tracker.exercise_counter, 'feedback_changes': feedback_changes}
+
+
+def evaluate_synthetic(exercise_name: str = "Bicep Curl", seconds: float = 60.0,
+                       fps: float = 30.0, rep_period: float = 3.0, seeds: int = 8,
+                       levels: Sequence[Tuple[float, float]] = JITTER_LEVELS) -> List[Dict]:
+    """
+    Mide la precisión sobre flujos sintéticos con distintos niveles de temblor.
+
+    Returns:
+        Una fila por nivel con el error medio y máximo de conteo y el parpadeo
+        del feedback, sin filtro y con filtro
+    """
+    frames = int(seconds * fps)
+    expected = int(seconds // rep_period)
+    clean = synthetic_landmark_stream(frames, fps, noise=0.0, rep_period=rep_period)
+    timestamps = np.arange(frames) / fps
+
+    rows = []
+    for noise, outlier_rate in levels:
+        row = {'noise': noise, 'outlier_rate': outlier_rate, 'expected_reps': expected}
+        for key, use_filter in (('raw', False), ('filtered', True)):
+            errors, flicker = [], []
+            for seed in range(seeds):
+                jittered = add_jitter(clean, noise, outlier_rate, seed=seed)
+                result = count_reps(jittered, timestamps, exercise_name, use_filter)
+                errors.append(abs(result['reps'] - expected))
+                flicker.append(result['feedback_changes'] / expected)
+            row[key] = {
+                'mean_abs_error': float(np.mean(errors)),
+                'max_abs_error': int(np.max(errors)),
+                'exact_sessions': int(np.sum(np.equal(errors, 0))),
+                'feedback_changes_per_rep': float(np.mean(flicker)),
+            }
+        rows.append(row)
+    return rows
+
+
+def evaluate_recordings(labelled: Sequence[Tuple[str, int]], exercise_name: str) -> List[Dict]:
+    """
+    Mide la precisión sobre grabaciones .trkg etiquetadas.
+
+    Args:
+        labelled: Pares (ruta, repeticiones reales)
+        exercise_name: Ejercicio de las grabaciones
+
+    Returns:
+        Una fila por grabación con el conteo sin filtro y con filtro
+    """
+    from landmark_recording import load_recording
+
+    rows = []
+    for path, expected in labelled:
+        records = load_recording(path)
+        row = {'path': path, 'expected_reps': expected}
+        for key, use_filter in (('raw', False), ('filtered', True)):
+            result = count_reps(records['landmarks'], records['timestamp'], exercise_name, use_filter)
+            row[key] = {**result, 'abs_error': abs(result['reps'] - expected)}
+        rows.append(row)
+    return rows
+
+
+def parse_labelled(value: str) -> Tuple[str, int]:
+    """Convierte 'ruta.trkg:12' en ('ruta.trkg', 12)."""
+    path, sep, count = value.rpartition(':')
+    if not sep or not count.isdigit():
+        raise argparse.ArgumentTypeError(f"Se esperaba RUTA:REPETICIONES, no {value!r}")
+    return path, int(count)
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Punto de entrada de línea de comandos.
+    """
+    parser = argparse.ArgumentParser(description="TrackG - Precisión del conteo con filtro de landmarks")
+    parser.add_argument('recordings', nargs='*', type=parse_labelled,
+                        help="Grabaciones etiquetadas RUTA:REPETICIONES")
+    parser.add_argument('--exercise', default="Bicep Curl")
+    parser.add_argument('--seconds', type=float, default=60.0)
+    parser.add_argument('--seeds', type=int, default=8)
+    args = parser.parse_args(argv)
+
+    if args.recordings:
+        for row in evaluate_recordings(args.recordings, args.exercise):
+            print(f"{row['path']}: esperadas {row['expected_reps']} | "
+                  f"sin filtro {row['raw']['reps']} | con filtro {row['filtered']['reps']}")
+        return
+
+    print(f"Flujo sintético: {args.exercise}, {args.seconds:.0f} s, {args.seeds} semillas")
+    print(f"{'ruido':>6} {'saltos':>7} | {'error sin filtro':>17} {'exactas':>8} {'parpadeo':>9} | "
+          f"{'error con filtro':>17} {'exactas':>8} {'parpadeo':>9}")
+    for row in evaluate_synthetic(args.exercise, args.seconds, seeds=args.seeds):
+        cells = []
+        for key in ('raw', 'filtered'):
+            stats = row[key]
+            cells.append(f"{stats['mean_abs_error']:>9.2f} (máx {stats['max_abs_error']}) "
+                         f"{stats['exact_sessions']:>5}/{args.seeds} "
+                         f"{stats['feedback_changes_per_rep']:>9.1f}")
+        print(f"{row['noise']:>6.3f} {row['outlier_rate']:>7.2f} | {cells[0]} | {cells[1]}")
+
+
+if __name__ == "__main__":
+    main()
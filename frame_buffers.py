@@ -0,0 +1,95 @@
+"""
+Buffers de frame preasignados para el bucle de captura de TrackG.
+La captura, el volteo, la conversión a RGB y el redimensionado de entrada
+escriben en arrays reutilizados, y la interfaz se dibuja sobre el frame BGR
+volteado en lugar de reconvertir la imagen RGB. En régimen estable el bucle
+no asigna arrays del tamaño del frame, lo que evita los tirones periódicos
+del asignador y del recolector en los kioscos.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+from lazy_import import lazy_import
+
+cv2 = lazy_import('cv2')
+
+
+class FrameBuffers:
+    """
+    Conjunto de buffers reutilizados entre frames.
+
+    Los buffers se (re)asignan solo cuando cambia la forma del frame; los
+    recortes de tamaño variable (ROI, entrada escalada) usan un prefijo
+    contiguo de un buffer plano que solo crece.
+    """
+
+    def __init__(self):
+        self.capture: Optional[np.ndarray] = None
+        self.frame: Optional[np.ndarray] = None
+        self._rgb = np.empty(0, dtype=np.uint8)
+        self._scaled = np.empty(0, dtype=np.uint8)
+
+    @staticmethod
+    def _view(flat: np.ndarray, shape: Tuple[int, ...]) -> Tuple[np.ndarray, np.ndarray]:
+        """Vista contigua de forma `shape` sobre un buffer plano, ampliándolo si hace falta."""
+        size = int(np.prod(shape))
+        if flat.size < size:
+            flat = np.empty(size, dtype=np.uint8)
+        return flat, flat[:size].reshape(shape)
+
+    def read(self, cap) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Lee un frame en el buffer de captura.
+
+        Args:
+            cap: cv2.VideoCapture (o cualquier objeto con read(image))
+
+        Returns:
+            (ok, frame BGR); el frame se sobrescribe en la siguiente lectura
+        """
+        ret, captured = cap.read(self.capture)
+        if not ret:
+            return False, None
+        self.capture = captured
+        return True, captured
+
+    def mirror(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Voltea horizontalmente (efecto espejo) en el buffer de trabajo, sobre
+        el que después se dibuja la interfaz.
+
+        Returns:
+            Frame BGR volteado, válido hasta la siguiente llamada
+        """
+        if self.frame is None or self.frame.shape != frame.shape:
+            self.frame = np.empty_like(frame)
+        cv2.flip(frame, 1, dst=self.frame)
+        return self.frame
+
+    def to_rgb(self, source: np.ndarray) -> np.ndarray:
+        """
+        Convierte un frame o recorte BGR a RGB en un buffer reutilizado.
+
+        Returns:
+            Imagen RGB de solo lectura, válida hasta la siguiente llamada
+        """
+        self._rgb, rgb = self._view(self._rgb, source.shape)
+        cv2.cvtColor(source, cv2.COLOR_BGR2RGB, dst=rgb)
+        rgb.flags.writeable = False
+        return rgb
+
+    def resize(self, image: np.ndarray, scale: float) -> np.ndarray:
+        """
+        Escala una imagen con INTER_AREA en un buffer reutilizado.
+
+        Returns:
+            Imagen escalada de solo lectura, válida hasta la siguiente llamada
+        """
+        height, width = image.shape[:2]
+        shape = (max(1, round(height * scale)), max(1, round(width * scale))) + image.shape[2:]
+        self._scaled, scaled = self._view(self._scaled, shape)
+        cv2.resize(image, (shape[1], shape[0]), dst=scaled, interpolation=cv2.INTER_AREA)
+        scaled.flags.writeable = False
+        return scaled
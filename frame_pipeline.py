@@ -0,0 +1,229 @@
+"""
+Pipeline desacoplado de captura / inferencia / renderizado para TrackG.
+Cada etapa corre en su propio hilo y se comunica con la siguiente mediante
+colas acotadas en las que el frame más reciente reemplaza al más antiguo, de
+modo que la latencia nunca se acumula aunque la inferencia sea más lenta que
+la cámara.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Optional
+
+import numpy as np
+
+
+class LatestQueue:
+    """
+    Cola acotada con política "gana el último frame".
+
+    Si la cola está llena, put() descarta el elemento más antiguo en lugar de
+    bloquear al productor.
+    """
+
+    def __init__(self, maxsize: int = 1):
+        self._items = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, item: Any) -> None:
+        """Añade un elemento, descartando el más antiguo si no hay espacio."""
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """
+        Extrae el elemento más antiguo disponible.
+
+        Returns:
+            El elemento, o None si se agotó el tiempo o la cola se cerró
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self._closed, timeout):
+                return None
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def close(self) -> None:
+        """Cierra la cola y despierta a los consumidores en espera."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class PipelineStats:
+    """Mide FPS efectivos y latencia extremo a extremo sobre una ventana móvil."""
+
+    def __init__(self, window: int = 120):
+        self._render_times = deque(maxlen=window)
+        self._latencies = deque(maxlen=window)
+        self.frames = 0
+
+    def record(self, capture_time: float, render_time: float) -> None:
+        """Registra un frame mostrado y el instante en que fue capturado."""
+        self._render_times.append(render_time)
+        self._latencies.append(render_time - capture_time)
+        self.frames += 1
+
+    @property
+    def fps(self) -> float:
+        """FPS efectivos en la ventana actual."""
+        if len(self._render_times) < 2:
+            return 0.0
+        elapsed = self._render_times[-1] - self._render_times[0]
+        return (len(self._render_times) - 1) / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def latency_ms(self) -> float:
+        """Latencia media captura→pantalla en milisegundos."""
+        if not self._latencies:
+            return 0.0
+        return float(np.mean(self._latencies)) * 1000.0
+
+    @property
+    def latency_p95_ms(self) -> float:
+        """Percentil 95 de la latencia captura→pantalla en milisegundos."""
+        if not self._latencies:
+            return 0.0
+        return float(np.percentile(self._latencies, 95)) * 1000.0
+
+
+def _capture_stage(cap, out_queue: LatestQueue, stop: threading.Event) -> None:
+    """Lee frames de la cámara y los publica con su instante de captura."""
+    import cv2
+
+    while not stop.is_set():
+        ret, frame = cap.read()
+        if not ret:
+            print("No se puede acceder a la cámara")
+            stop.set()
+            break
+        out_queue.put((cv2.flip(frame, 1), time.perf_counter()))
+    out_queue.close()
+
+
+def _inference_stage(tracker, in_queue: LatestQueue, out_queue: LatestQueue,
+                     stop: threading.Event) -> None:
+    """
+    Ejecuta el backend de pose sobre el frame más reciente disponible y
+    publica el resultado con el tiempo de inferencia en ms.
+    """
+    import cv2
+
+    while not stop.is_set():
+        item = in_queue.get(timeout=0.1)
+        if item is None:
+            continue
+        frame, capture_time = item
+        start = time.perf_counter()
+        roi_tracker = tracker.roi_tracker
+        source, offset = roi_tracker.crop(frame) if roi_tracker is not None else (frame, (0, 0))
+        image = cv2.cvtColor(source, cv2.COLOR_BGR2RGB)
+        image.flags.writeable = False
+        results = tracker.infer(image)
+        if roi_tracker is not None:
+            roi_tracker.track(results, offset, source.shape, frame.shape)
+        out_queue.put((frame, results, capture_time, (time.perf_counter() - start) * 1000.0))
+    out_queue.close()
+
+
+def run_pipeline(tracker, source=0, queue_size: int = 1) -> PipelineStats:
+    """
+    Ejecuta el rastreador con captura, inferencia y renderizado en paralelo.
+
+    La captura y la inferencia corren en hilos de fondo; el renderizado, la
+    lógica del ejercicio y el teclado permanecen en el hilo principal (OpenCV
+    requiere que imshow/waitKey se llamen desde el mismo hilo). Las
+    repeticiones usan el instante de captura de cada frame, no el de su
+    procesamiento, y el panel de rendimiento muestra la inferencia del hilo
+    de fondo junto a las etapas del hilo principal.
+
+    Args:
+        tracker: Instancia de ExerciseTracker
+        source: Índice de cámara, ruta de video u objeto de captura
+        queue_size: Capacidad de cada cola entre etapas
+
+    Returns:
+        Estadísticas de FPS y latencia de la sesión
+    """
+    import cv2
+
+    cap = source if hasattr(source, 'read') else cv2.VideoCapture(source)
+    stop = threading.Event()
+    frames_queue = LatestQueue(queue_size)
+    results_queue = LatestQueue(queue_size)
+    stats = PipelineStats()
+    perf = tracker.perf
+
+    capture_thread = threading.Thread(target=_capture_stage, args=(cap, frames_queue, stop),
+                                      name='trackg-capture', daemon=True)
+    inference_thread = threading.Thread(target=_inference_stage,
+                                        args=(tracker, frames_queue, results_queue, stop),
+                                        name='trackg-inference', daemon=True)
+    capture_thread.start()
+    inference_thread.start()
+
+    try:
+        while not stop.is_set():
+            item = results_queue.get(timeout=0.1)
+            if item is None:
+                # waitKey mantiene viva la ventana mientras no hay frames nuevos
+                if tracker.handle_key(cv2.waitKey(1) & 0xFF):
+                    break
+                continue
+            frame, results, capture_time, infer_ms = item
+            perf.start_frame()
+            perf.add('cvtColor+pose.process', infer_ms)
+            # Instante de captura en el reloj de pared (capture_time es perf_counter)
+            timestamp = time.time() - (time.perf_counter() - capture_time)
+
+            if tracker.recorder is not None:
+                tracker.recorder.write(
+                    timestamp,
+                    results.pose_landmarks.landmark if results.pose_landmarks else None
+                )
+                perf.lap('record')
+
+            # Se dibuja directamente sobre el frame BGR, sin volver a convertir
+            if results.pose_landmarks:
+                tracker.pose.draw(frame, results.pose_landmarks)
+                perf.lap('draw_landmarks')
+                tracker.process_exercise(results.pose_landmarks.landmark, timestamp)
+                perf.lap('process_exercise')
+            elif tracker.landmark_filter is not None:
+                tracker.landmark_filter.reset()
+
+            frame = tracker.draw_ui(frame)
+            width = frame.shape[1]
+            cv2.putText(frame, f'{stats.fps:.0f} FPS | {stats.latency_ms:.0f} ms',
+                        (width - 220, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+            perf.lap('draw_ui')
+            cv2.imshow('TrackG - Seguimiento de Ejercicios', frame)
+            stats.record(capture_time, time.perf_counter())
+
+            quit_requested = tracker.handle_key(cv2.waitKey(1) & 0xFF)
+            perf.lap('imshow+waitKey')
+            perf.end_frame()
+            if quit_requested:
+                break
+    finally:
+        stop.set()
+        frames_queue.close()
+        results_queue.close()
+        # Sin límite de espera: el hilo termina tras la inferencia en curso y
+        # el modelo no debe cerrarse mientras pose.process sigue usándolo
+        inference_thread.join()
+        capture_thread.join(timeout=1.0)
+        cap.release()
+        cv2.destroyAllWindows()
+
+    print(f"\nFPS efectivos: {stats.fps:.1f} | "
+          f"Latencia media: {stats.latency_ms:.1f} ms | p95: {stats.latency_p95_ms:.1f} ms | "
+          f"Frames descartados: {frames_queue.dropped + results_queue.dropped}")
+    return stats
@@ -0,0 +1,322 @@
+"""
+Historial persistente de entrenamientos para TrackG.
+Guarda en SQLite sesiones, series y repeticiones (con la duración de cada
+una), insertadas en bloque por serie, y mantiene en la misma transacción
+resúmenes diarios y semanales por usuario y ejercicio. Los récords
+personales y las tendencias de volumen se consultan sobre esos resúmenes
+indexados (un registro por día o semana), sin recorrer las repeticiones.
+"""
+
+import sqlite3
+import threading
+import time
+from datetime import date
+from typing import Dict, List, Optional, Sequence
+
+from rep_events import EventSink, RepEvent
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    ended_at REAL
+);
+CREATE TABLE IF NOT EXISTS sets (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER REFERENCES sessions (id),
+    user_id TEXT NOT NULL,
+    exercise TEXT NOT NULL,
+    day TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    ended_at REAL NOT NULL,
+    reps INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reps (
+    id INTEGER PRIMARY KEY,
+    set_id INTEGER NOT NULL REFERENCES sets (id),
+    user_id TEXT NOT NULL,
+    exercise TEXT NOT NULL,
+    day TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    duration REAL
+);
+CREATE TABLE IF NOT EXISTS daily_rollups (
+    user_id TEXT NOT NULL,
+    exercise TEXT NOT NULL,
+    day TEXT NOT NULL,
+    sets INTEGER NOT NULL,
+    reps INTEGER NOT NULL,
+    best_set_reps INTEGER NOT NULL,
+    total_duration REAL NOT NULL,
+    fastest_rep REAL,
+    PRIMARY KEY (user_id, exercise, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS weekly_rollups (
+    user_id TEXT NOT NULL,
+    exercise TEXT NOT NULL,
+    week TEXT NOT NULL,
+    sets INTEGER NOT NULL,
+    reps INTEGER NOT NULL,
+    best_set_reps INTEGER NOT NULL,
+    total_duration REAL NOT NULL,
+    fastest_rep REAL,
+    PRIMARY KEY (user_id, exercise, week)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS sessions_user_time ON sessions (user_id, started_at);
+CREATE INDEX IF NOT EXISTS sets_user_exercise_day ON sets (user_id, exercise, day);
+CREATE INDEX IF NOT EXISTS reps_user_exercise_day ON reps (user_id, exercise, day);
+CREATE INDEX IF NOT EXISTS daily_rollups_user_day ON daily_rollups (user_id, day);
+CREATE INDEX IF NOT EXISTS weekly_rollups_user_week ON weekly_rollups (user_id, week);
+"""
+
+# Suma las series nuevas al resumen existente (o lo crea)
+_ROLLUP_UPSERT = """
+INSERT INTO {table} (user_id, exercise, {period}, sets, reps, best_set_reps, total_duration, fastest_rep)
+VALUES (?, ?, ?, 1, ?, ?, ?, ?)
+ON CONFLICT (user_id, exercise, {period}) DO UPDATE SET
+    sets = sets + 1,
+    reps = reps + excluded.reps,
+    best_set_reps = MAX(best_set_reps, excluded.best_set_reps),
+    total_duration = total_duration + excluded.total_duration,
+    fastest_rep = CASE
+        WHEN fastest_rep IS NULL THEN excluded.fastest_rep
+        WHEN excluded.fastest_rep IS NULL THEN fastest_rep
+        ELSE MIN(fastest_rep, excluded.fastest_rep) END
+"""
+
+PERIODS = {'day': ('daily_rollups', 'day'), 'week': ('weekly_rollups', 'week')}
+
+
+def day_key(timestamp: float) -> str:
+    """Fecha local 'AAAA-MM-DD' de un instante."""
+    return time.strftime('%Y-%m-%d', time.localtime(timestamp))
+
+
+def week_key(day: str) -> str:
+    """Semana ISO 'AAAA-Wss' de una fecha 'AAAA-MM-DD'."""
+    year, week, _ = date.fromisoformat(day).isocalendar()
+    return f'{year}-W{week:02d}'
+
+
+class HistoryStore:
+    """
+    Historial en SQLite. La conexión se abre en el primer uso y se comparte
+    entre hilos protegida por un lock (el servidor Flask atiende peticiones
+    en varios hilos).
+    """
+
+    def __init__(self, path: str = 'trackg_history.db'):
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def start_session(self, user_id: str, started_at: Optional[float] = None) -> int:
+        """Crea una sesión de entrenamiento y devuelve su id."""
+        started_at = time.time() if started_at is None else started_at
+        with self._lock, self.connection as connection:
+            cursor = connection.execute(
+                "INSERT INTO sessions (user_id, started_at) VALUES (?, ?)", (user_id, started_at))
+            return cursor.lastrowid
+
+    def end_session(self, session_id: int, ended_at: Optional[float] = None) -> None:
+        ended_at = time.time() if ended_at is None else ended_at
+        with self._lock, self.connection as connection:
+            connection.execute("UPDATE sessions SET ended_at = ? WHERE id = ?", (ended_at, session_id))
+
+    def record_set(self, user_id: str, exercise: str, rep_times: Sequence[float],
+                   rep_durations: Optional[Sequence[Optional[float]]] = None,
+                   session_id: Optional[int] = None, started_at: Optional[float] = None) -> Optional[int]:
+        """
+        Guarda una serie: la fila de la serie, sus repeticiones en un único
+        executemany y la actualización de los resúmenes diario y semanal, todo
+        en una transacción.
+
+        Args:
+            user_id: Usuario
+            exercise: Nombre del ejercicio
+            rep_times: Instante de cada repetición
+            rep_durations: Duración de cada repetición (None si se desconoce)
+            session_id: Sesión a la que pertenece la serie
+            started_at: Inicio de la serie (por defecto, la primera repetición)
+
+        Returns:
+            Id de la serie, o None si no tiene repeticiones
+        """
+        if not rep_times:
+            return None
+        if rep_durations is None:
+            rep_durations = [None] * len(rep_times)
+        if len(rep_durations) != len(rep_times):
+            raise ValueError("rep_durations debe tener un valor por repetición")
+
+        started_at = rep_times[0] if started_at is None else started_at
+        day = day_key(started_at)
+        known = [d for d in rep_durations if d is not None]
+        total_duration = float(sum(known))
+        fastest = min(known) if known else None
+        reps = len(rep_times)
+
+        with self._lock, self.connection as connection:
+            set_id = connection.execute(
+                "INSERT INTO sets (session_id, user_id, exercise, day, started_at, ended_at, reps) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (session_id, user_id, exercise, day, started_at, rep_times[-1], reps)
+            ).lastrowid
+            connection.executemany(
+                "INSERT INTO reps (set_id, user_id, exercise, day, timestamp, duration) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(set_id, user_id, exercise, day, t, d) for t, d in zip(rep_times, rep_durations)]
+            )
+            for period, key in (('day', day), ('week', week_key(day))):
+                table, column = PERIODS[period]
+                connection.execute(
+                    _ROLLUP_UPSERT.format(table=table, period=column),
+                    (user_id, exercise, key, reps, reps, total_duration, fastest)
+                )
+        return set_id
+
+    def personal_records(self, user_id: str, exercise: Optional[str] = None) -> List[Dict]:
+        """
+        Récords personales por ejercicio a partir de los resúmenes diarios:
+        más repeticiones en una serie, más repeticiones en un día y la
+        repetición más rápida, cada uno con su fecha.
+        """
+        where = "user_id = ?" + (" AND exercise = ?" if exercise else "")
+        params = (user_id, exercise) if exercise else (user_id,)
+        records: Dict[str, Dict] = {}
+        # En SQLite, las columnas junto a MAX()/MIN() toman los valores de la fila del extremo
+        queries = (
+            ('best_set_reps', 'MAX(best_set_reps)'),
+            ('best_day_reps', 'MAX(reps)'),
+            ('fastest_rep', 'MIN(fastest_rep)'),
+        )
+        with self._lock:
+            for name, aggregate in queries:
+                rows = self.connection.execute(
+                    f"SELECT exercise, {aggregate} AS value, day FROM daily_rollups "
+                    f"WHERE {where} GROUP BY exercise ORDER BY exercise", params
+                ).fetchall()
+                for row in rows:
+                    entry = records.setdefault(row['exercise'], {'exercise': row['exercise']})
+                    entry[name] = {'value': row['value'], 'day': row['day'] if row['value'] is not None else None}
+        return list(records.values())
+
+    def volume(self, user_id: str, period: str = 'day', exercise: Optional[str] = None,
+               start: Optional[str] = None, end: Optional[str] = None,
+               limit: int = 50, offset: int = 0) -> Dict:
+        """
+        Tendencia de volumen por día o semana, de la más reciente a la más
+        antigua, paginada.
+
+        Args:
+            user_id: Usuario
+            period: 'day' o 'week'
+            exercise: Filtrar por ejercicio (por defecto, todos)
+            start: Primer día o semana incluido ('AAAA-MM-DD' o 'AAAA-Wss')
+            end: Último día o semana incluido
+            limit: Tamaño de página
+            offset: Desplazamiento de la página
+
+        Returns:
+            {'items': [...], 'total': ..., 'limit': ..., 'offset': ...}
+        """
+        if period not in PERIODS:
+            raise ValueError(f"Periodo desconocido: {period}")
+        table, column = PERIODS[period]
+        conditions = ["user_id = ?"]
+        params: list = [user_id]
+        if exercise:
+            conditions.append("exercise = ?")
+            params.append(exercise)
+        if start:
+            conditions.append(f"{column} >= ?")
+            params.append(start)
+        if end:
+            conditions.append(f"{column} <= ?")
+            params.append(end)
+        where = " AND ".join(conditions)
+
+        with self._lock:
+            total = self.connection.execute(
+                f"SELECT COUNT(DISTINCT {column}) FROM {table} WHERE {where}", params
+            ).fetchone()[0]
+            rows = self.connection.execute(
+                f"SELECT {column} AS period, SUM(sets) AS sets, SUM(reps) AS reps, "
+                f"SUM(total_duration) AS total_duration FROM {table} WHERE {where} "
+                f"GROUP BY {column} ORDER BY {column} DESC LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return {
+            'items': [dict(row) for row in rows],
+            'total': total,
+            'limit': limit,
+            'offset': offset,
+        }
+
+
+class HistorySink(EventSink):
+    """
+    Destino de eventos (ver rep_events.py) que agrupa las repeticiones en
+    series y las guarda en el historial. Una serie termina al cambiar de
+    ejercicio o tras set_gap segundos sin repeticiones; la última se guarda
+    al cerrar. Los instantes de los eventos son de época (también al
+    procesar videos, ver ExerciseTracker.run_headless) y la sesión termina
+    en el último evento recibido.
+    """
+
+    def __init__(self, store: HistoryStore, user_id: str, set_gap: float = 90.0):
+        self.store = store
+        self.user_id = user_id
+        self.set_gap = set_gap
+        self.session_id: Optional[int] = None
+        self._exercise: Optional[str] = None
+        self._times: List[float] = []
+        self._durations: List[Optional[float]] = []
+        self._last_timestamp: Optional[float] = None
+
+    def _flush_set(self) -> None:
+        if self._times:
+            self.store.record_set(self.user_id, self._exercise, self._times, self._durations,
+                                  session_id=self.session_id)
+        self._times, self._durations = [], []
+
+    def write(self, events: List[RepEvent]) -> None:
+        for event in events:
+            self._last_timestamp = event.timestamp
+            if event.kind != 'rep':
+                continue
+            if self.session_id is None:
+                self.session_id = self.store.start_session(self.user_id, event.timestamp)
+            if event.exercise != self._exercise or (
+                    self._times and event.timestamp - self._times[-1] > self.set_gap):
+                self._flush_set()
+                self._exercise = event.exercise
+            self._times.append(event.timestamp)
+            # La primera repetición de una serie se mide desde la anterior, que
+            # puede ser de otra serie: solo se guarda si cae dentro del hueco
+            duration = event.duration if event.duration is not None and (
+                len(self._times) > 1 or event.duration <= self.set_gap) else None
+            self._durations.append(duration)
+
+    def close(self) -> None:
+        self._flush_set()
+        if self.session_id is not None:
+            self.store.end_session(self.session_id, self._last_timestamp)
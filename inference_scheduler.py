@@ -0,0 +1,245 @@
+"""
+Planificador de inferencia con salto de frames para TrackG.
+Decide en qué frames se ejecuta MediaPipe: cada N frames o de forma
+adaptativa según la velocidad medida de los landmarks. En los frames
+saltados se extrapolan linealmente los últimos landmarks observados, que
+siguen alimentando process_exercise, de modo que en los descansos entre
+series la CPU trabaja mucho menos sin perder repeticiones.
+
+Uso:
+    python exercise_tracker.py --adaptive --max-skip 6
+    python exercise_tracker.py --infer-every 2 --budget-ms 15
+    python inference_scheduler.py   # simulación con series y descansos
+"""
+
+import argparse
+import math
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from pose_frame import PoseFrame
+
+
+class InferenceScheduler:
+    """
+    Decide si un frame pasa por el modelo o se extrapola.
+
+    - every_n: inferencia fija en 1 de cada N frames (1 = todos).
+    - adaptive: el salto depende de la velocidad máxima de los landmarks
+      (coordenadas normalizadas por segundo, medida sobre velocity_window).
+      Por debajo de rest_velocity, o sin nadie delante de la cámara, se
+      saltan hasta max_skip frames; por encima de motion_velocity se infiere
+      en todos; entre ambas, el salto se interpola linealmente.
+    - budget_ms: presupuesto medio de inferencia por frame. Si el tiempo de
+      MediaPipe medido supera el presupuesto, se saltan los frames
+      necesarios para cumplirlo, también durante el movimiento.
+    """
+
+    def __init__(self, every_n: int = 1, adaptive: bool = False, max_skip: int = 6,
+                 rest_velocity: float = 0.1, motion_velocity: float = 0.4,
+                 budget_ms: Optional[float] = None, max_extrapolation: float = 0.25,
+                 velocity_window: float = 0.2):
+        if every_n < 1:
+            raise ValueError("every_n debe ser al menos 1")
+        self.every_n = every_n
+        self.adaptive = adaptive
+        self.max_skip = max_skip
+        self.rest_velocity = rest_velocity
+        self.motion_velocity = motion_velocity
+        self.budget_ms = budget_ms
+        self.max_extrapolation = max_extrapolation
+        self.velocity_window = velocity_window
+        self.inferred = 0
+        self.skipped = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Olvida las observaciones; el siguiente frame siempre se infiere."""
+        self._last: Optional[np.ndarray] = None
+        self._last_time = 0.0
+        self._history = deque()
+        self._velocity: Optional[np.ndarray] = None
+        self._visibility: Optional[np.ndarray] = None
+        self._speed = math.inf
+        self._absent = False
+        self._inference_ms: Optional[float] = None
+        self._since_inference = math.inf  # El primer frame siempre se infiere
+
+    @property
+    def inference_ratio(self) -> float:
+        """Fracción de frames que pasaron por el modelo."""
+        total = self.inferred + self.skipped
+        return self.inferred / total if total else 1.0
+
+    def allowed_skip(self) -> int:
+        """Frames consecutivos que pueden saltarse tras la última inferencia."""
+        skip = self.every_n - 1
+        if self.adaptive:
+            if self._absent or self._speed <= self.rest_velocity:
+                skip = max(skip, self.max_skip)
+            elif self._speed < self.motion_velocity:
+                fraction = (self.motion_velocity - self._speed) / (self.motion_velocity - self.rest_velocity)
+                skip = max(skip, int(self.max_skip * fraction))
+        if self.budget_ms and self._inference_ms is not None:
+            skip = max(skip, math.ceil(self._inference_ms / self.budget_ms) - 1)
+        return skip
+
+    def should_infer(self) -> bool:
+        """
+        Indica si el frame actual debe pasar por MediaPipe y contabiliza la
+        decisión.
+        """
+        if self._since_inference >= self.allowed_skip():
+            self.inferred += 1
+            self._since_inference = 0
+            return True
+        self.skipped += 1
+        self._since_inference += 1
+        return False
+
+    def observe(self, points: Optional[PoseFrame], t: float,
+                inference_ms: Optional[float] = None) -> None:
+        """
+        Registra el resultado de una inferencia.
+
+        Args:
+            points: Landmarks detectados, o None si no hubo detección
+            t: Instante del frame en segundos
+            inference_ms: Tiempo medido de la inferencia (para budget_ms)
+        """
+        if inference_ms is not None:
+            # Media móvil exponencial: un frame lento aislado no dispara saltos
+            self._inference_ms = (inference_ms if self._inference_ms is None
+                                  else 0.8 * self._inference_ms + 0.2 * inference_ms)
+        self._absent = points is None
+        if points is None:
+            self._last = None
+            self._velocity = None
+            self._speed = math.inf
+            self._history.clear()
+            return
+
+        # La velocidad se mide contra una observación de hace al menos
+        # velocity_window segundos, para que el temblor entre frames
+        # consecutivos no se confunda con movimiento
+        data = points.data[:, :2].copy()
+        history = self._history
+        while len(history) > 1 and t - history[1][0] >= self.velocity_window:
+            history.popleft()
+        if history and t > history[0][0]:
+            ref_time, ref_data = history[0]
+            self._velocity = (data - ref_data) / (t - ref_time)
+            self._speed = float(np.abs(self._velocity).max())
+        else:
+            self._velocity = np.zeros_like(data)
+            self._speed = math.inf  # Sin velocidad medida: no saltar aún
+        history.append((t, data))
+        self._last = data
+        self._last_time = t
+        self._visibility = points.data[:, 2:].copy()
+
+    def predict(self, t: float) -> Optional[PoseFrame]:
+        """
+        Extrapola linealmente la última observación hasta el instante t.
+        El horizonte se limita a max_extrapolation segundos para que un salto
+        largo no proyecte los landmarks fuera del cuerpo.
+
+        Returns:
+            PoseFrame estimado, o None si no hay observación válida
+        """
+        if self._last is None:
+            return None
+        dt = min(max(t - self._last_time, 0.0), self.max_extrapolation)
+        data = np.concatenate([self._last + self._velocity * dt, self._visibility], axis=1)
+        return PoseFrame(data)
+
+
+def rest_and_sets_stream(sets: int = 3, reps_per_set: int = 10, rest_seconds: float = 30.0,
+                         rep_period: float = 3.0, fps: float = 30.0, noise: float = 0.002,
+                         seed: int = 0) -> np.ndarray:
+    """
+    Sesión sintética de series de curl separadas por descansos quietos.
+
+    Returns:
+        Array (N, 33, 3)
+    """
+    from benchmark import synthetic_landmark_stream
+
+    set_frames = int(reps_per_set * rep_period * fps)
+    rest_frames = int(rest_seconds * fps)
+    moving = synthetic_landmark_stream(set_frames, fps, noise=0.0, rep_period=rep_period)
+    still = np.repeat(moving[:1], rest_frames, axis=0)
+    parts = []
+    for i in range(sets):
+        parts.append(moving)
+        if i < sets - 1:
+            parts.append(still)
+    session = np.concatenate(parts)
+    rng = np.random.default_rng(seed)
+    session[:, :, :2] += rng.normal(0, noise, session[:, :, :2].shape)
+    return session
+
+
+def simulate_schedule(landmarks: np.ndarray, timestamps: np.ndarray, exercise_name: str,
+                      scheduler: Optional[InferenceScheduler] = None) -> Dict:
+    """
+    Reproduce una sesión como el bucle en vivo, sustituyendo los frames
+    saltados por la extrapolación del planificador.
+
+    Returns:
+        Repeticiones contadas y fracción de frames inferidos
+    """
+    from exercise_tracker import ExerciseTracker
+
+    tracker = ExerciseTracker(load_model=False)
+    tracker.exercise_name = exercise_name
+    tracker.last_rep_time = float(timestamps[0]) if len(timestamps) else 0.0
+    for frame, t in zip(landmarks, timestamps.tolist()):
+        if scheduler is None:
+            tracker.process_exercise(frame, timestamp=t)
+            continue
+        if scheduler.should_infer():
+            points = PoseFrame.from_array(frame)
+            scheduler.observe(points, t)
+        else:
+            points = scheduler.predict(t)
+        if points is not None:
+            tracker.process_exercise(points, timestamp=t)
+    return {
+        'reps': tracker.exercise_counter,
+        'inference_ratio': scheduler.inference_ratio if scheduler is not None else 1.0,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Simula series con descansos y compara conteo y uso del modelo.
+    """
+    parser = argparse.ArgumentParser(description="TrackG - Simulación del planificador de inferencia")
+    parser.add_argument('--exercise', default="Bicep Curl")
+    parser.add_argument('--sets', type=int, default=3)
+    parser.add_argument('--rest', type=float, default=30.0, help="Segundos de descanso entre series")
+    parser.add_argument('--max-skip', type=int, default=6)
+    args = parser.parse_args(argv)
+
+    landmarks = rest_and_sets_stream(sets=args.sets, rest_seconds=args.rest)
+    timestamps = np.arange(len(landmarks)) / 30.0
+    expected = simulate_schedule(landmarks, timestamps, args.exercise)['reps']
+    print(f"Sesión: {args.sets} series de 10, {args.rest:.0f} s de descanso, {expected} repeticiones")
+
+    configurations = {
+        'cada frame': InferenceScheduler(),
+        'cada 2': InferenceScheduler(every_n=2),
+        'cada 3': InferenceScheduler(every_n=3),
+        'adaptativo': InferenceScheduler(adaptive=True, max_skip=args.max_skip),
+    }
+    for label, scheduler in configurations.items():
+        result = simulate_schedule(landmarks, timestamps, args.exercise, scheduler)
+        print(f"  {label:<12} {result['reps']:>3} repeticiones, "
+              f"modelo en {result['inference_ratio']:.0%} de los frames")
+
+
+if __name__ == "__main__":
+    main()
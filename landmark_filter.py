@@ -0,0 +1,118 @@
+"""
+Filtro One-Euro incremental de landmarks para TrackG.
+Suaviza el temblor de MediaPipe con estado O(1) por articulación (valor,
+derivada e instante anteriores), de modo que los umbrales fijos de cada
+ejercicio no oscilen entre etapas aun con el modelo ligero y entrada reducida.
+
+Referencia: Casiez, Roussel y Vogel, "1€ Filter: A Simple Speed-based Low-pass
+Filter for Noisy Input in Interactive Systems" (CHI 2012).
+"""
+
+import math
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from pose_frame import PoseFrame
+
+
+# (min_cutoff Hz, beta) por ejercicio: movimientos más lentos toleran más suavizado
+DEFAULT_FILTER_PARAMS: Tuple[float, float] = (1.0, 0.5)
+EXERCISE_FILTER_PARAMS: Dict[str, Tuple[float, float]] = {
+    "Bicep Curl": (1.0, 0.5),
+    "Shoulder Press": (1.0, 0.5),
+    "Lateral Raise": (0.8, 0.4),
+    "Front Raise": (0.8, 0.4),
+    "Hammer Curl": (1.0, 0.5),
+    "Tricep Extension": (1.2, 0.6),
+}
+
+
+class OneEuroFilter:
+    """
+    Filtro One-Euro vectorizado: filtra en bloque un array de forma fija (p. ej.
+    (landmarks, 2)), con un estado independiente por elemento.
+    """
+
+    def __init__(self, min_cutoff: float = 1.0, beta: float = 0.5, d_cutoff: float = 1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self) -> None:
+        """Olvida el estado; el próximo valor se devuelve sin filtrar."""
+        self._x = None
+        self._dx = None
+        self._t = None
+
+    @staticmethod
+    def _alpha(cutoff, dt: float):
+        tau = 1.0 / (2.0 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, x: np.ndarray, t: float) -> np.ndarray:
+        """
+        Filtra una nueva muestra.
+
+        Args:
+            x: Valores actuales (misma forma en cada llamada)
+            t: Instante de la muestra en segundos
+
+        Returns:
+            Valores filtrados (array nuevo)
+        """
+        x = np.asarray(x, dtype=np.float64)
+        if self._x is None:
+            self._x = x.copy()
+            self._dx = np.zeros_like(x)
+            self._t = t
+            return self._x.copy()
+
+        dt = t - self._t
+        if dt <= 0:
+            dt = 1.0 / 30.0  # Tiempos repetidos o desordenados: asumir un frame
+        self._t = t
+
+        dx = (x - self._x) / dt
+        self._dx += self._alpha(self.d_cutoff, dt) * (dx - self._dx)
+        cutoff = self.min_cutoff + self.beta * np.abs(self._dx)
+        self._x += self._alpha(cutoff, dt) * (x - self._x)
+        return self._x.copy()
+
+
+class LandmarkFilter:
+    """
+    Aplica un OneEuroFilter a las coordenadas x, y de un PoseFrame, con
+    parámetros por ejercicio. La visibilidad no se filtra.
+    """
+
+    def __init__(self, params: Optional[Dict[str, Tuple[float, float]]] = None):
+        self.params = EXERCISE_FILTER_PARAMS if params is None else params
+        self.exercise_name: Optional[str] = None
+        self._filter = OneEuroFilter(*DEFAULT_FILTER_PARAMS)
+
+    def set_exercise(self, exercise_name: str) -> None:
+        """Carga los parámetros del ejercicio y reinicia el estado."""
+        self.exercise_name = exercise_name
+        min_cutoff, beta = self.params.get(exercise_name, DEFAULT_FILTER_PARAMS)
+        self._filter = OneEuroFilter(min_cutoff, beta)
+
+    def reset(self) -> None:
+        """Reinicia el estado (p. ej. tras perder la detección)."""
+        self._filter.reset()
+
+    def apply(self, frame: PoseFrame, t: float, exercise_name: Optional[str] = None) -> PoseFrame:
+        """
+        Devuelve un PoseFrame nuevo con x, y filtrados.
+
+        Args:
+            frame: Landmarks del frame actual
+            t: Instante del frame en segundos
+            exercise_name: Ejercicio actual; si cambia se cargan sus parámetros
+        """
+        if exercise_name is not None and exercise_name != self.exercise_name:
+            self.set_exercise(exercise_name)
+        data = frame.data.copy()
+        data[:, :2] = self._filter(frame.data[:, :2], t)
+        return PoseFrame(data)
@@ -0,0 +1,187 @@
+"""
+Grabación y reproducción de landmarks para TrackG.
+Guarda los landmarks, la visibilidad y el instante de cada frame en un archivo
+binario compacto de registros de tamaño fijo que se puede mapear en memoria,
+y permite reproducir la sesión a través de process_exercise sin cámara ni
+MediaPipe.
+
+Formato (little-endian):
+    cabecera de 32 bytes: magic b'TRKGLM01', uint32 número de landmarks,
+    uint32 canales por landmark, uint64 número de frames, 8 bytes reservados
+    registros: float64 timestamp + float32[landmarks][canales] (x, y, visibilidad)
+"""
+
+import argparse
+import struct
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from exercise_utils import NUM_POSE_LANDMARKS
+from pose_frame import iter_pose_frames
+
+
+MAGIC = b'TRKGLM01'
+HEADER = struct.Struct('<8sIIQ8x')
+CHANNELS = 3
+
+
+def record_dtype(num_landmarks: int = NUM_POSE_LANDMARKS, channels: int = CHANNELS) -> np.dtype:
+    """Tipo de registro de un frame: timestamp y matriz de landmarks."""
+    return np.dtype([('timestamp', '<f8'), ('landmarks', '<f4', (num_landmarks, channels))])
+
+
+class LandmarkRecorder:
+    """
+    Escribe frames de landmarks en un archivo de grabación.
+
+    Los frames sin detección se guardan con NaN para conservar la línea de
+    tiempo completa de la sesión.
+    """
+
+    def __init__(self, path: str, num_landmarks: int = NUM_POSE_LANDMARKS):
+        self.path = path
+        self.num_landmarks = num_landmarks
+        self.frame_count = 0
+        self._record = np.zeros(1, dtype=record_dtype(num_landmarks))
+        self._file = open(path, 'wb')
+        self._write_header()
+
+    def _write_header(self) -> None:
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, self.num_landmarks, CHANNELS, self.frame_count))
+
+    def write(self, timestamp: float, landmarks=None) -> None:
+        """
+        Añade un frame a la grabación.
+
+        Args:
+            timestamp: Instante del frame en segundos
+            landmarks: Landmarks de MediaPipe, array (landmarks, 3) o None si
+                       no hubo detección
+        """
+        record = self._record[0]
+        record['timestamp'] = timestamp
+        if landmarks is None:
+            record['landmarks'] = np.nan
+        elif isinstance(landmarks, np.ndarray):
+            record['landmarks'] = landmarks[:, :CHANNELS]
+        else:
+            record['landmarks'] = [(lm.x, lm.y, lm.visibility) for lm in landmarks]
+        self._file.write(self._record.tobytes())
+        self.frame_count += 1
+
+    def close(self) -> None:
+        """Actualiza la cabecera con el número de frames y cierra el archivo."""
+        if self._file.closed:
+            return
+        self._write_header()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_recording(path: str) -> np.ndarray:
+    """
+    Mapea en memoria una grabación.
+
+    El número de frames se deduce del tamaño del archivo, de modo que una
+    grabación interrumpida (sin cabecera actualizada) sigue siendo legible.
+
+    Args:
+        path: Ruta del archivo de grabación
+
+    Returns:
+        Array estructurado de solo lectura con campos 'timestamp' y 'landmarks'
+    """
+    with open(path, 'rb') as f:
+        magic, num_landmarks, channels, _ = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} no es una grabación de landmarks de TrackG")
+        f.seek(0, 2)
+        size = f.tell()
+
+    dtype = record_dtype(num_landmarks, channels)
+    frames = (size - HEADER.size) // dtype.itemsize
+    if frames == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', offset=HEADER.size, shape=(frames,))
+
+
+def replay_recording(tracker, path: str, exercise_name: Optional[str] = None) -> Dict:
+    """
+    Reproduce una grabación a través de tracker.process_exercise.
+
+    El estado del ejercicio, el filtro de landmarks y las métricas se
+    reinician al comenzar (ver ExerciseTracker.reset_session) y los tiempos
+    de cada repetición se toman de la grabación, por lo que el resultado es
+    determinista aunque se reutilice el tracker.
+
+    Args:
+        tracker: Instancia de ExerciseTracker (puede crearse con load_model=False)
+        path: Ruta del archivo de grabación
+        exercise_name: Ejercicio a evaluar (por defecto, el actual del tracker)
+
+    Returns:
+        Resumen con repeticiones, instantes de cada repetición y tiempo de reproducción
+    """
+    records = load_recording(path)
+    if exercise_name is not None:
+        tracker.exercise_name = exercise_name
+    tracker.reset_session(float(records['timestamp'][0]) if len(records) else 0.0)
+
+    start = time.perf_counter()
+    landmarks = np.asarray(records['landmarks'])
+    timestamps = np.asarray(records['timestamp'])
+    detected = ~np.isnan(landmarks[:, :, 0]).any(axis=1)
+    rep_times = []
+
+    # Como en run(), un frame sin detección reinicia el filtro en lugar de
+    # suavizar a través del hueco
+    for is_detected, timestamp, frame in zip(detected.tolist(), timestamps.tolist(),
+                                             iter_pose_frames(landmarks)):
+        if not is_detected:
+            if tracker.landmark_filter is not None:
+                tracker.landmark_filter.reset()
+            continue
+        previous_count = tracker.exercise_counter
+        tracker.process_exercise(frame, timestamp=timestamp)
+        if tracker.exercise_counter != previous_count:
+            rep_times.append(timestamp)
+
+    return {
+        'exercise': tracker.exercise_name,
+        'frames': int(len(records)),
+        'detected_frames': int(detected.sum()),
+        'reps': tracker.exercise_counter,
+        'rep_times': rep_times,
+        'replay_seconds': time.perf_counter() - start,
+    }
+
+
+def main():
+    """
+    Reproduce una grabación desde la línea de comandos.
+    """
+    from exercise_tracker import ExerciseTracker
+
+    parser = argparse.ArgumentParser(description="TrackG - Reproducción de grabaciones de landmarks")
+    parser.add_argument('recording', help="Archivo de grabación")
+    parser.add_argument('--exercise', default="Bicep Curl")
+    args = parser.parse_args()
+
+    tracker = ExerciseTracker(load_model=False)
+    summary = replay_recording(tracker, args.recording, args.exercise)
+    print(f"{summary['exercise']}: {summary['reps']} repeticiones en "
+          f"{summary['frames']} frames ({summary['replay_seconds'] * 1000:.1f} ms)")
+    for rep, timestamp in enumerate(summary['rep_times'], 1):
+        print(f"  Repetición {rep}: t={timestamp:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
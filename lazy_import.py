@@ -0,0 +1,64 @@
+"""
+Importación diferida de dependencias pesadas para TrackG.
+NumPy, OpenCV y MediaPipe tardan de décimas de segundo a segundos en
+importarse. Los módulos que no los necesitan al cargarse los declaran con
+lazy_import() y el import real ocurre en el primer acceso a un atributo, de
+modo que importar exercise_utils o arrancar app.py no paga ese coste, y el
+modelo puede importarse en segundo plano mientras se abre la cámara.
+"""
+
+import importlib
+import threading
+import types
+
+# Atributos propios del proxy que no se sobrescriben con los del módulo
+_PROXY_NAMES = frozenset({'__name__', '_lazy_lock', '_lazy_module'})
+
+
+class LazyModule(types.ModuleType):
+    """
+    Módulo que se importa en el primer acceso a uno de sus atributos.
+
+    Tras el import, los atributos del módulo real se copian al proxy para
+    que los accesos siguientes no pasen por __getattr__.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._lazy_lock = threading.RLock()
+        self._lazy_module = None
+
+    def _lazy_load(self) -> types.ModuleType:
+        with self._lazy_lock:
+            if self._lazy_module is None:
+                module = importlib.import_module(self.__name__)
+                self.__dict__.update(
+                    (key, value) for key, value in vars(module).items() if key not in _PROXY_NAMES)
+                self._lazy_module = module
+        return self._lazy_module
+
+    def __getattr__(self, attribute: str):
+        # Solo se llama para atributos que aún no están en el proxy
+        return getattr(self._lazy_load(), attribute)
+
+    @property
+    def loaded(self) -> bool:
+        """True si el módulo real ya se importó."""
+        return self._lazy_module is not None
+
+    def __repr__(self) -> str:
+        state = 'cargado' if self.loaded else 'diferido'
+        return f"<LazyModule '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """
+    Declara un import diferido.
+
+    Args:
+        name: Nombre del módulo (p. ej. 'numpy')
+
+    Returns:
+        Proxy que importa el módulo en el primer acceso a un atributo
+    """
+    return LazyModule(name)
@@ -0,0 +1,256 @@
+"""
+Seguimiento simultáneo de varias cámaras o videos para TrackG.
+Cada fuente tiene su propio hilo de captura e inferencia, su propio Pose de
+MediaPipe y su propio estado de ejercicio (un ExerciseTracker sin modelo), de
+modo que una fuente lenta no frena a las demás. El hilo principal compone una
+vista en mosaico y reparte las teclas a la fuente seleccionada.
+
+Uso:
+    python multi_camera.py 0 1 2 --exercise "Bicep Curl"
+"""
+
+import argparse
+import math
+import sys
+import threading
+import time
+from collections import deque
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from exercise_tracker import ExerciseTracker
+from exercise_utils import EXERCISE_RULES
+
+
+WINDOW_NAME = 'TrackG - Multi-cámara'
+
+
+class StreamWorker(threading.Thread):
+    """
+    Hilo que procesa una fuente de video de principio a fin.
+
+    El último frame ya renderizado queda disponible en latest_frame(); las
+    teclas dirigidas a esta fuente se encolan y se aplican en el propio hilo
+    para no compartir el estado del ejercicio entre hilos.
+
+    `ready` se activa cuando la fuente y el modelo están abiertos o cuando el
+    arranque falla; en ese caso, y ante cualquier excepción posterior, el
+    motivo queda en `error`.
+    """
+
+    def __init__(self, source, index: int, exercise_name: Optional[str] = None,
+                 model_complexity: int = 1):
+        super().__init__(name=f'trackg-stream-{index}', daemon=True)
+        self.source = source
+        self.index = index
+        self.model_complexity = model_complexity
+        self.tracker = ExerciseTracker(load_model=False)
+        if exercise_name is not None:
+            self.tracker.exercise_name = exercise_name
+        self.frames = 0
+        self.error: Optional[str] = None
+        self.started = False
+        self.ready = threading.Event()
+        self._latest: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        self._keys = deque()
+        self._stop_event = threading.Event()
+
+    @property
+    def label(self) -> str:
+        return f'#{self.index} ({self.source})'
+
+    def send_key(self, key: int) -> None:
+        """Encola una tecla para el estado de ejercicio de esta fuente."""
+        self._keys.append(key)
+
+    def latest_frame(self) -> Optional[np.ndarray]:
+        """Último frame renderizado, o None si aún no hay ninguno."""
+        with self._lock:
+            return self._latest
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run(self) -> None:
+        import cv2
+        from pose_backends import MediaPipePoseBackend
+
+        cap = pose = None
+        try:
+            cap = cv2.VideoCapture(self.source)
+            if not cap.isOpened():
+                raise RuntimeError("No se puede abrir la fuente")
+            pose = MediaPipePoseBackend(self.model_complexity)
+            pose.load()
+            self.started = True
+            self.ready.set()
+
+            while not self._stop_event.is_set():
+                while self._keys:
+                    self.tracker.handle_key(self._keys.popleft())
+
+                ret, frame = cap.read()
+                if not ret:
+                    self.error = "Fuente sin frames"
+                    break
+
+                frame = cv2.flip(frame, 1)
+                image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                image.flags.writeable = False
+                results = pose.process(image)
+
+                if results.pose_landmarks:
+                    pose.draw(frame, results.pose_landmarks)
+                    self.tracker.process_exercise(results.pose_landmarks.landmark)
+
+                frame = self.tracker.draw_ui(frame)
+                with self._lock:
+                    self._latest = frame
+                self.frames += 1
+        except Exception as exc:
+            self.error = f"{type(exc).__name__}: {exc}"
+        finally:
+            self.ready.set()
+            if cap is not None:
+                cap.release()
+            if pose is not None:
+                pose.close()
+
+
+def tile_frames(frames: Sequence[Optional[np.ndarray]], tile_size: Tuple[int, int],
+                columns: Optional[int] = None, labels: Optional[Sequence[str]] = None,
+                selected: Optional[int] = None) -> np.ndarray:
+    """
+    Compone varios frames en un mosaico.
+
+    Args:
+        frames: Frames BGR (None = fuente aún sin imagen)
+        tile_size: (ancho, alto) de cada celda
+        columns: Columnas del mosaico (por defecto, raíz cuadrada redondeada)
+        labels: Texto opcional para cada celda
+        selected: Índice de la celda resaltada
+
+    Returns:
+        Imagen BGR del mosaico
+    """
+    import cv2
+
+    tile_w, tile_h = tile_size
+    columns = columns or max(1, math.ceil(math.sqrt(len(frames))))
+    rows = max(1, math.ceil(len(frames) / columns))
+    canvas = np.zeros((rows * tile_h, columns * tile_w, 3), dtype=np.uint8)
+
+    for i, frame in enumerate(frames):
+        y, x = (i // columns) * tile_h, (i % columns) * tile_w
+        cell = canvas[y:y + tile_h, x:x + tile_w]
+        if frame is not None:
+            cv2.resize(frame, (tile_w, tile_h), dst=cell, interpolation=cv2.INTER_AREA)
+        if labels is not None:
+            cv2.putText(cell, labels[i], (10, tile_h - 70), cv2.FONT_HERSHEY_SIMPLEX,
+                        0.6, (255, 255, 255), 2)
+        if i == selected:
+            cv2.rectangle(cell, (0, 0), (tile_w - 1, tile_h - 1), (0, 255, 255), 3)
+    return canvas
+
+
+def parse_source(value: str):
+    """Convierte '0' en índice de cámara y deja las rutas como texto."""
+    return int(value) if value.isdigit() else value
+
+
+def run_multi_camera(sources: List, exercise_name: Optional[str] = None,
+                     tile_size: Tuple[int, int] = (640, 360), model_complexity: int = 1) -> List[StreamWorker]:
+    """
+    Ejecuta el seguimiento de varias fuentes con vista en mosaico.
+
+    Controles: TAB selecciona la fuente, 1-6 cambia su ejercicio, Q sale.
+
+    Returns:
+        Los workers, con el estado final de cada fuente
+
+    Raises:
+        ValueError: Si el ejercicio no existe
+        RuntimeError: Si alguna fuente no arranca (no se abre o no carga el
+                      modelo); las demás se detienen
+    """
+    import cv2
+
+    if exercise_name is not None and exercise_name not in EXERCISE_RULES:
+        raise ValueError(f"Ejercicio desconocido: {exercise_name}")
+    workers = [StreamWorker(source, i, exercise_name, model_complexity)
+               for i, source in enumerate(sources)]
+    for worker in workers:
+        worker.start()
+
+    # Los errores de arranque de los hilos se informan aquí, no solo en el resumen
+    for worker in workers:
+        worker.ready.wait()
+    failed = [worker for worker in workers if not worker.started]
+    if failed:
+        for worker in workers:
+            worker.stop()
+        for worker in workers:
+            worker.join(timeout=2.0)
+        raise RuntimeError("No arrancaron las fuentes: " +
+                           "; ".join(f"{worker.label}: {worker.error}" for worker in failed))
+
+    selected = 0
+    try:
+        while any(worker.is_alive() for worker in workers):
+            frames = [worker.latest_frame() for worker in workers]
+            labels = [worker.label for worker in workers]
+            cv2.imshow(WINDOW_NAME, tile_frames(frames, tile_size, labels=labels, selected=selected))
+
+            key = cv2.waitKey(15) & 0xFF
+            if key == ord('q'):
+                break
+            elif key == 9:  # TAB
+                selected = (selected + 1) % len(workers)
+            elif key != 0xFF:
+                workers[selected].send_key(key)
+    finally:
+        for worker in workers:
+            worker.stop()
+        for worker in workers:
+            worker.join(timeout=2.0)
+        cv2.destroyAllWindows()
+
+    return workers
+
+
+def main():
+    """
+    Punto de entrada de línea de comandos para el modo multi-cámara.
+    """
+    parser = argparse.ArgumentParser(description="TrackG - Seguimiento de varias cámaras")
+    parser.add_argument('sources', nargs='+', help="Índices de cámara o rutas de video")
+    parser.add_argument('--exercise', default=None, choices=EXERCISE_RULES.names,
+                        help="Ejercicio inicial de todas las fuentes")
+    parser.add_argument('--tile-width', type=int, default=640)
+    parser.add_argument('--tile-height', type=int, default=360)
+    parser.add_argument('--model-complexity', type=int, default=1, choices=(0, 1, 2))
+    args = parser.parse_args()
+
+    print("=== TrackG - Multi-cámara ===")
+    print("TAB: cambiar fuente seleccionada | 1-6: ejercicio de la fuente | Q: salir\n")
+    start = time.perf_counter()
+    try:
+        workers = run_multi_camera([parse_source(s) for s in args.sources], args.exercise,
+                                   (args.tile_width, args.tile_height), args.model_complexity)
+    except RuntimeError as exc:
+        print(exc, file=sys.stderr)
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    print("\nResumen por fuente:")
+    for worker in workers:
+        fps = worker.frames / elapsed if elapsed > 0 else 0.0
+        status = f" [{worker.error}]" if worker.error else ""
+        print(f"  {worker.label}: {worker.tracker.exercise_name} - "
+              f"{worker.tracker.exercise_counter} repeticiones ({fps:.1f} FPS){status}")
+
+
+if __name__ == "__main__":
+    main()
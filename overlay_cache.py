@@ -0,0 +1,155 @@
+"""
+Capas de interfaz cacheadas para TrackG.
+Los paneles y textos de draw_ui solo cambian unas pocas veces por minuto,
+así que cada capa se rasteriza una vez por combinación de estado y tamaño de
+frame y después solo se copia sobre cada frame. La opacidad de cada píxel se
+recupera dibujando la capa sobre fondo negro y sobre fondo blanco, de modo
+que el resultado coincide con dibujar directamente sobre el frame (salvo
+redondeo de ±1 en los bordes suavizados).
+
+Cada capa declara la franja de filas que ocupa y al cambiar de estado solo se
+limpia y se analiza esa franja: el feedback cambia varias veces por
+repetición y rasterizar dos lienzos del frame completo (~4 ms a 1080p) costaba
+más que dibujar la interfaz entera directamente.
+"""
+
+from typing import Callable, Hashable, Optional, Tuple
+
+import numpy as np
+
+from lazy_import import lazy_import
+
+cv2 = lazy_import('cv2')
+
+
+class LayerCanvas:
+    """
+    Par de lienzos (fondo negro y fondo blanco) del tamaño del frame,
+    reutilizado entre rasterizaciones y compartible entre capas que se
+    actualizan desde el mismo hilo.
+    """
+
+    def __init__(self):
+        self.dark: Optional[np.ndarray] = None
+        self.light: Optional[np.ndarray] = None
+
+    def band(self, shape: Tuple[int, ...], top: int, bottom: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Devuelve los lienzos con las filas [top, bottom) limpias.
+
+        Fuera de la franja pueden quedar restos de dibujos anteriores; quien
+        dibuje solo debe leer la franja.
+        """
+        if self.dark is None or self.dark.shape != tuple(shape):
+            self.dark = np.zeros(shape, dtype=np.uint8)
+            self.light = np.full(shape, 255, dtype=np.uint8)
+        else:
+            self.dark[top:bottom] = 0
+            self.light[top:bottom] = 255
+        return self.dark, self.light
+
+
+class CachedLayer:
+    """
+    Resultado rasterizado de una función de dibujo.
+
+    Se guarda solo el rectángulo que contiene los píxeles dibujados, con el
+    color premultiplicado y la transparencia de cada píxel; los paneles
+    opacos de un solo color se guardan como rectángulo de relleno más el
+    recorte del texto que contienen.
+    """
+
+    def __init__(self, canvas: Optional[LayerCanvas] = None):
+        self.key: Optional[Hashable] = None
+        self.canvas = canvas if canvas is not None else LayerCanvas()
+        self.renders = 0
+        self._fill: Optional[Tuple[Tuple[int, int, int, int], Tuple[int, ...]]] = None
+        self._box: Tuple[int, int, int, int] = (0, 0, 0, 0)
+        self._image: Optional[np.ndarray] = None
+        self._transparency: Optional[np.ndarray] = None
+        self._scratch: Optional[np.ndarray] = None
+
+    @staticmethod
+    def _bounds(diff: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+        """(top, bottom, left, right) de los píxeles distintos de cero, o None si no hay."""
+        height, width = diff.shape[:2]
+        # Máximos sobre el array contiguo, bastante más rápidos que una
+        # máscara booleana reducida por canal
+        flat = diff.reshape(height, -1)
+        rows = np.flatnonzero(flat.max(axis=1))
+        if not len(rows):
+            return None
+        top, bottom = int(rows[0]), int(rows[-1]) + 1
+        cols = np.flatnonzero(flat[top:bottom].max(axis=0).reshape(width, -1).max(axis=1))
+        return top, bottom, int(cols[0]), int(cols[-1]) + 1
+
+    def update(self, key: Hashable, shape: Tuple[int, ...], draw: Callable[[np.ndarray], None],
+               rows: Optional[Tuple[int, int]] = None) -> None:
+        """
+        Vuelve a rasterizar la capa solo si la clave cambió.
+
+        Args:
+            key: Estado del que depende la capa (debe incluir el tamaño del frame)
+            shape: Forma del frame
+            draw: Función que dibuja la capa sobre un frame, en coordenadas de frame
+            rows: Franja (top, bottom) de filas que ocupa la capa; lo que se
+                  dibuje fuera se descarta (por defecto, el frame completo)
+        """
+        if key == self.key:
+            return
+        self.key = key
+        self.renders += 1
+        self._fill = None
+        self._image = None
+
+        # Dibujar sobre fondo negro y sobre fondo blanco. Con fondo b, un píxel
+        # con opacidad a y color c queda en a*c + (1-a)*b, así que
+        # 255*(1-a) = claro - oscuro y el color premultiplicado es el oscuro
+        band_top, band_bottom = (0, shape[0]) if rows is None else rows
+        band_top, band_bottom = max(band_top, 0), min(band_bottom, shape[0])
+        if band_bottom <= band_top:
+            return
+        dark, light = self.canvas.band(shape, band_top, band_bottom)
+        draw(dark)
+        draw(light)
+        dark = dark[band_top:band_bottom]
+        transparency = cv2.subtract(light[band_top:band_bottom], dark)
+        # Rectángulo con algún píxel dibujado (opacidad distinta de cero)
+        box = self._bounds(cv2.bitwise_not(transparency))
+        if box is None:
+            return
+
+        # Un panel opaco de color uniforme se rellena con cv2.rectangle (más
+        # barato que copiarlo) y solo se copia el texto que contiene
+        top, bottom, left, right = box
+        if not transparency[top:bottom, left:right].any():
+            color = tuple(int(c) for c in dark[top, right - 1])
+            detail = cv2.absdiff(dark[top:bottom, left:right], color + (0,))
+            self._fill = ((top + band_top, bottom + band_top, left, right), color)
+            detail_box = self._bounds(detail)
+            if detail_box is None:
+                return
+            box = (top + detail_box[0], top + detail_box[1], left + detail_box[2], left + detail_box[3])
+            top, bottom, left, right = box
+
+        self._box = (top + band_top, bottom + band_top, left, right)
+        self._image = dark[top:bottom, left:right].copy()
+        transparency = transparency[top:bottom, left:right]
+        self._transparency = transparency.copy() if transparency.any() else None
+        self._scratch = np.empty_like(self._image)
+
+    def compose(self, frame: np.ndarray) -> None:
+        """Dibuja la capa sobre el frame (en el sitio)."""
+        if self._fill is not None:
+            (top, bottom, left, right), color = self._fill
+            cv2.rectangle(frame, (left, top), (right - 1, bottom - 1), color, -1)
+        if self._image is None:
+            return
+        top, bottom, left, right = self._box
+        region = frame[top:bottom, left:right]
+        if self._transparency is None:
+            region[...] = self._image
+        else:
+            # color premultiplicado + frame * (1 - a), sobre la vista del frame
+            cv2.multiply(region, self._transparency, dst=self._scratch, scale=1 / 255)
+            cv2.add(self._image, self._scratch, dst=region)
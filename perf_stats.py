@@ -0,0 +1,188 @@
+"""
+Instrumentación de rendimiento por etapa para TrackG.
+Cada etapa del frame (lectura de cámara, conversión de color, inferencia,
+dibujo, lógica del ejercicio, UI y pantalla) se mide en un histograma móvil
+de tamaño fijo con percentiles p50/p95/p99, que puede mostrarse en pantalla
+o volcarse periódicamente a JSON. StartupReport desglosa el arranque por
+fases.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class RollingHistogram:
+    """Últimas `capacity` muestras en un buffer circular de tamaño fijo."""
+
+    def __init__(self, capacity: int = 300):
+        self._values = np.zeros(capacity)
+        self._index = 0
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        """Añade una muestra, sobrescribiendo la más antigua si está lleno."""
+        self._values[self._index] = value
+        self._index = (self._index + 1) % len(self._values)
+        self.count += 1
+
+    def values(self) -> np.ndarray:
+        """Muestras actualmente en la ventana (sin orden garantizado)."""
+        return self._values[:min(self.count, len(self._values))]
+
+    def percentiles(self, q=(50, 95, 99)) -> List[float]:
+        """Percentiles de la ventana actual (ceros si está vacía)."""
+        values = self.values()
+        if not len(values):
+            return [0.0] * len(q)
+        return np.percentile(values, q).tolist()
+
+
+class StageTimer:
+    """
+    Cronómetro por etapas de un frame.
+
+    Uso en el bucle principal:
+        timer.start_frame()
+        ...  # etapa
+        timer.lap('cap.read')
+        ...
+        timer.end_frame()
+    """
+
+    def __init__(self, capacity: int = 300, dump_path: Optional[str] = None,
+                 dump_interval: float = 10.0):
+        self.capacity = capacity
+        self.stages: Dict[str, RollingHistogram] = {}
+        self.dump_path = dump_path
+        self.dump_interval = dump_interval
+        self._frame_start = 0.0
+        self._last = 0.0
+        self._last_dump = time.perf_counter()
+
+    def _histogram(self, stage: str) -> RollingHistogram:
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages[stage] = RollingHistogram(self.capacity)
+        return histogram
+
+    def start_frame(self) -> None:
+        """Marca el inicio de un frame."""
+        self._frame_start = self._last = time.perf_counter()
+
+    def lap(self, stage: str) -> None:
+        """Registra el tiempo transcurrido desde la marca anterior como `stage`."""
+        now = time.perf_counter()
+        self._histogram(stage).add((now - self._last) * 1000.0)
+        self._last = now
+
+    def add(self, stage: str, ms: float) -> None:
+        """Registra una duración medida fuera del bucle (p. ej. en otro hilo)."""
+        self._histogram(stage).add(ms)
+
+    def skip(self) -> None:
+        """Descarta el tiempo desde la marca anterior (p. ej. etapa no ejecutada)."""
+        self._last = time.perf_counter()
+
+    def end_frame(self) -> None:
+        """Registra la duración total del frame y vuelca a JSON si toca."""
+        now = time.perf_counter()
+        self._histogram('frame').add((now - self._frame_start) * 1000.0)
+        if self.dump_path and now - self._last_dump >= self.dump_interval:
+            self.dump(self.dump_path)
+            self._last_dump = now
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Percentiles por etapa en milisegundos."""
+        summary = {}
+        for stage, histogram in self.stages.items():
+            p50, p95, p99 = histogram.percentiles()
+            summary[stage] = {'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99,
+                              'samples': min(histogram.count, self.capacity)}
+        return summary
+
+    def dump(self, path: str) -> None:
+        """Escribe el resumen en JSON de forma atómica."""
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'timestamp': time.time(), 'stages': self.summary()}, f, indent=2)
+        os.replace(tmp_path, path)
+
+
+class StartupReport:
+    """
+    Fases del arranque en milisegundos desde `origin` (perf_counter).
+
+    Las fases pueden solaparse (p. ej. la carga del modelo en segundo plano
+    mientras se abre la cámara); los hitos son fases de duración cero.
+    """
+
+    def __init__(self, origin: Optional[float] = None):
+        self.origin = time.perf_counter() if origin is None else origin
+        self.phases: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, start: float, end: float) -> None:
+        """Registra una fase con tiempos de perf_counter."""
+        with self._lock:
+            self.phases[name] = ((start - self.origin) * 1000.0, (end - self.origin) * 1000.0)
+
+    @contextmanager
+    def phase(self, name: str):
+        """Mide el bloque como la fase `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.perf_counter())
+
+    def mark(self, name: str) -> None:
+        """Registra un hito (p. ej. el primer frame en pantalla) si no estaba ya."""
+        if name not in self.phases:
+            now = time.perf_counter()
+            self.add(name, now, now)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Inicio, fin y duración de cada fase, ordenadas por inicio."""
+        with self._lock:
+            phases = sorted(self.phases.items(), key=lambda item: item[1])
+        return {name: {'start_ms': start, 'end_ms': end, 'duration_ms': end - start}
+                for name, (start, end) in phases}
+
+    def format(self) -> str:
+        """Tabla de texto del arranque."""
+        lines = ['fase                inicio     fin  duración ms']
+        for name, stats in self.summary().items():
+            lines.append(f"{name:<17}{stats['start_ms']:>8.0f}{stats['end_ms']:>8.0f}"
+                         f"{stats['duration_ms']:>10.0f}")
+        return '\n'.join(lines)
+
+
+def draw_perf_hud(frame: np.ndarray, timer: StageTimer, origin=(10, 120)) -> None:
+    """
+    Dibuja los percentiles de cada etapa sobre el frame.
+
+    Args:
+        frame: Frame BGR sobre el que dibujar (se modifica en el sitio)
+        timer: Cronómetro con las mediciones
+        origin: Esquina superior izquierda del panel
+    """
+    import cv2
+
+    summary = timer.summary()
+    x, y = origin
+    line_height = 18
+    width = 330
+    height = line_height * (len(summary) + 1) + 8
+    cv2.rectangle(frame, (x - 5, y - 15), (x + width, y - 15 + height), (0, 0, 0), -1)
+    cv2.putText(frame, 'etapa              p50   p95   p99 ms', (x, y),
+                cv2.FONT_HERSHEY_PLAIN, 1.0, (255, 255, 255), 1)
+    for i, (stage, stats) in enumerate(summary.items(), 1):
+        text = f"{stage:<17}{stats['p50_ms']:>6.1f}{stats['p95_ms']:>6.1f}{stats['p99_ms']:>6.1f}"
+        cv2.putText(frame, text, (x, y + i * line_height),
+                    cv2.FONT_HERSHEY_PLAIN, 1.0, (0, 255, 255), 1)
@@ -0,0 +1,599 @@
+"""
+Backends de estimación de pose para TrackG.
+
+ExerciseTracker no habla directamente con MediaPipe sino con un PoseBackend:
+process() recibe un frame RGB y devuelve un resultado con la misma forma que
+el de MediaPipe (results.pose_landmarks.landmark, 33 puntos normalizados con
+x, y, z y visibilidad), que es lo que consumen process_exercise, la grabación,
+el recorte de ROI y el planificador. draw() dibuja el esqueleto.
+
+- MediaPipePoseBackend: mp.solutions.pose.Pose.
+- TasksPoseBackend: PoseLandmarker de MediaPipe Tasks en modo LIVE_STREAM;
+  submit() no espera al modelo y poll() entrega el último resultado listo.
+- SyntheticPoseBackend: movimiento paramétrico determinista del ejercicio
+  (tempo, recorrido, temblor y pérdidas de detección) sin cámara ni modelo,
+  a decenas de miles de frames por segundo, para pruebas de carga en CI.
+
+Con SyntheticCapture como fuente el tracker funciona sin cámara:
+
+    python exercise_tracker.py --headless --backend synthetic --source synthetic --max-frames 100000
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from exercise_utils import EXERCISE_RULES, JOINT_TRIPLETS, LANDMARK_INDICES, NUM_POSE_LANDMARKS
+from lazy_import import lazy_import
+
+cv2 = lazy_import('cv2')
+mp = lazy_import('mediapipe')
+
+# Colores del esqueleto (BGR), los mismos que usa la interfaz con MediaPipe
+LANDMARK_COLOR = (245, 117, 66)
+CONNECTION_COLOR = (245, 66, 230)
+
+# Conexiones entre los puntos rastreados (subconjunto de POSE_CONNECTIONS)
+SKELETON_CONNECTIONS: Tuple[Tuple[int, int], ...] = tuple(
+    (LANDMARK_INDICES[a], LANDMARK_INDICES[b]) for a, b in (
+        ('left_shoulder', 'right_shoulder'), ('left_hip', 'right_hip'),
+        ('left_shoulder', 'left_elbow'), ('left_elbow', 'left_wrist'),
+        ('right_shoulder', 'right_elbow'), ('right_elbow', 'right_wrist'),
+        ('left_shoulder', 'left_hip'), ('right_shoulder', 'right_hip'),
+        ('left_hip', 'left_knee'), ('left_knee', 'left_ankle'),
+        ('right_hip', 'right_knee'), ('right_knee', 'right_ankle'),
+    )
+)
+
+
+class Landmark:
+    """Landmark normalizado con los atributos de los de MediaPipe."""
+
+    __slots__ = ('x', 'y', 'z', 'visibility')
+
+    def __init__(self, x: float, y: float, z: float = 0.0, visibility: float = 1.0):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.visibility = visibility
+
+
+class PoseLandmarks(NamedTuple):
+    """Equivalente a results.pose_landmarks de MediaPipe."""
+    landmark: List[Landmark]
+
+
+class PoseResult(NamedTuple):
+    """Equivalente al resultado de Pose.process(); pose_landmarks es None sin detección."""
+    pose_landmarks: Optional[PoseLandmarks]
+
+    @classmethod
+    def from_array(cls, landmarks: np.ndarray) -> 'PoseResult':
+        """Resultado a partir de un array (33, 3) con x, y y visibilidad (NaN = sin detección)."""
+        if math.isnan(landmarks[0, 0]):
+            return cls(None)
+        return cls(PoseLandmarks([Landmark(x, y, 0.0, v) for x, y, v in landmarks.tolist()]))
+
+
+def draw_skeleton(frame: np.ndarray, pose_landmarks) -> None:
+    """
+    Dibuja los puntos rastreados y sus conexiones.
+
+    Args:
+        frame: Frame BGR (se modifica en el sitio)
+        pose_landmarks: results.pose_landmarks (normalizados al frame)
+    """
+    height, width = frame.shape[:2]
+    landmarks = pose_landmarks.landmark
+    points = {index: (int(landmarks[index].x * width), int(landmarks[index].y * height))
+              for index in LANDMARK_INDICES.values()}
+    for a, b in SKELETON_CONNECTIONS:
+        cv2.line(frame, points[a], points[b], CONNECTION_COLOR, 2)
+    for point in points.values():
+        cv2.circle(frame, point, 2, LANDMARK_COLOR, 2)
+
+
+class PoseBackend:
+    """
+    Interfaz de los backends de pose.
+
+    El tracker llama a load() (en el hilo de carga del modelo), después a
+    process() con un frame negro para calentarlo, a process() por cada frame
+    RGB, a draw() para el esqueleto y a close() al terminar.
+    """
+
+    name = 'base'
+    # True si el backend usa submit()/poll() en lugar de esperar en process()
+    asynchronous = False
+
+    def load(self) -> None:
+        """Construye el modelo (puede tardar; el tracker lo llama en segundo plano)."""
+
+    def process(self, image: np.ndarray) -> PoseResult:
+        """
+        Args:
+            image: Frame RGB
+
+        Returns:
+            Resultado con pose_landmarks.landmark (33 landmarks normalizados) o None
+        """
+        raise NotImplementedError
+
+    def draw(self, frame: np.ndarray, pose_landmarks) -> None:
+        """Dibuja el esqueleto detectado sobre el frame BGR."""
+        draw_skeleton(frame, pose_landmarks)
+
+    def close(self) -> None:
+        """Libera el modelo."""
+
+
+class MediaPipePoseBackend(PoseBackend):
+    """
+    MediaPipe Pose (mp.solutions.pose). MediaPipe se importa al crear el
+    backend y el grafo se construye en load().
+
+    Args:
+        model_complexity: Complejidad del modelo (0 = ligero)
+        min_detection_confidence: Confianza mínima de detección
+        min_tracking_confidence: Confianza mínima de seguimiento
+    """
+
+    name = 'mediapipe'
+
+    def __init__(self, model_complexity: int = 1, min_detection_confidence: float = 0.5,
+                 min_tracking_confidence: float = 0.5):
+        self.model_complexity = model_complexity
+        self.min_detection_confidence = min_detection_confidence
+        self.min_tracking_confidence = min_tracking_confidence
+        self.mp_pose = mp.solutions.pose
+        self.mp_drawing = mp.solutions.drawing_utils
+        self.pose = None
+
+    def load(self) -> None:
+        if self.pose is None:
+            self.pose = self.mp_pose.Pose(
+                model_complexity=self.model_complexity,
+                min_detection_confidence=self.min_detection_confidence,
+                min_tracking_confidence=self.min_tracking_confidence
+            )
+
+    def process(self, image: np.ndarray):
+        return self.pose.process(image)
+
+    def draw(self, frame: np.ndarray, pose_landmarks) -> None:
+        self.mp_drawing.draw_landmarks(
+            frame,
+            pose_landmarks,
+            self.mp_pose.POSE_CONNECTIONS,
+            self.mp_drawing.DrawingSpec(color=LANDMARK_COLOR, thickness=2, circle_radius=2),
+            self.mp_drawing.DrawingSpec(color=CONNECTION_COLOR, thickness=2, circle_radius=2)
+        )
+
+    def close(self) -> None:
+        if self.pose is not None:
+            self.pose.close()
+            self.pose = None
+
+
+# Variantes del modelo de PoseLandmarker, por model_complexity (0, 1, 2)
+POSE_LANDMARKER_VARIANTS = ('lite', 'full', 'heavy')
+
+
+class ResultHandoff:
+    """
+    Entrega del resultado más reciente de la inferencia asíncrona al hilo
+    principal, ordenada por timestamp.
+
+    Se descartan los resultados que llegan con un timestamp no posterior al
+    último publicado, los que se sobrescriben antes de consumirse y los que
+    al consumirse tienen más de max_age_ms respecto al frame actual.
+
+    Args:
+        max_age_ms: Antigüedad máxima de un resultado al consumirlo (None = sin límite)
+    """
+
+    def __init__(self, max_age_ms: Optional[float] = None):
+        self.max_age_ms = max_age_ms
+        self._cond = threading.Condition()
+        self._item: Optional[Tuple[int, Any, Any]] = None
+        self.published_ms = -1
+        self.dropped = 0
+
+    def publish(self, timestamp_ms: int, result: Any, context: Any = None) -> bool:
+        """
+        Publica un resultado (desde el callback del modelo).
+
+        Returns:
+            False si se descartó por llegar desordenado
+        """
+        with self._cond:
+            if timestamp_ms <= self.published_ms:
+                self.dropped += 1
+                return False
+            if self._item is not None:
+                self.dropped += 1
+            self._item = (timestamp_ms, result, context)
+            self.published_ms = timestamp_ms
+            self._cond.notify_all()
+            return True
+
+    def take(self, now_ms: Optional[int] = None) -> Optional[Tuple[int, Any, Any]]:
+        """
+        Consume el resultado pendiente sin esperar.
+
+        Args:
+            now_ms: Timestamp del frame actual, para descartar resultados viejos
+
+        Returns:
+            (timestamp_ms, resultado, contexto), o None si no hay uno nuevo y vigente
+        """
+        with self._cond:
+            item, self._item = self._item, None
+            if (item is not None and now_ms is not None and self.max_age_ms is not None
+                    and now_ms - item[0] > self.max_age_ms):
+                self.dropped += 1
+                return None
+            return item
+
+    def wait(self, timestamp_ms: int, timeout: Optional[float] = None) -> bool:
+        """Espera a que se publique un resultado de timestamp_ms o posterior."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.published_ms >= timestamp_ms, timeout)
+
+
+class TasksPoseBackend(PoseBackend):
+    """
+    PoseLandmarker de MediaPipe Tasks en modo LIVE_STREAM.
+
+    submit() pasa el frame a detect_async() y vuelve enseguida; el modelo
+    entrega los resultados en un callback (en su propio hilo) a un
+    ResultHandoff, del que poll() toma el más reciente. Así la captura y la
+    interfaz nunca esperan a la inferencia: si el modelo va más lento que la
+    cámara, MediaPipe descarta frames y el tracker procesa solo los
+    resultados nuevos. process() mantiene la interfaz síncrona (calentamiento,
+    modo sin ventana) esperando al resultado de su frame.
+
+    Args:
+        variant: 'lite', 'full' o 'heavy'
+        model_path: Ruta del .task (por defecto, model_dir/pose_landmarker_<variant>.task)
+        model_dir: Carpeta de los modelos
+        max_age_ms: Antigüedad máxima de un resultado al consumirlo
+        min_detection_confidence: Confianza mínima de detección
+        min_tracking_confidence: Confianza mínima de seguimiento
+    """
+
+    name = 'tasks'
+    asynchronous = True
+
+    def __init__(self, variant: str = 'full', model_path: Optional[str] = None,
+                 model_dir: str = 'models', max_age_ms: float = 500.0,
+                 min_detection_confidence: float = 0.5, min_tracking_confidence: float = 0.5):
+        if variant not in POSE_LANDMARKER_VARIANTS:
+            raise ValueError(f"Variante desconocida: {variant} (opciones: {', '.join(POSE_LANDMARKER_VARIANTS)})")
+        self.variant = variant
+        self.model_path = model_path or os.path.join(model_dir, f'pose_landmarker_{variant}.task')
+        self.min_detection_confidence = min_detection_confidence
+        self.min_tracking_confidence = min_tracking_confidence
+        self.handoff = ResultHandoff(max_age_ms)
+        self.landmarker = None
+        self._last_submitted_ms = -1
+        # Contexto de cada frame enviado (p. ej. el recorte de la ROI), por timestamp
+        self._contexts: Dict[int, Any] = {}
+        self._contexts_lock = threading.Lock()
+
+    def load(self) -> None:
+        if self.landmarker is not None:
+            return
+        if not os.path.isfile(self.model_path):
+            raise FileNotFoundError(
+                f"No se encuentra el modelo {self.model_path}; descarga pose_landmarker_{self.variant}.task "
+                f"de los modelos de MediaPipe Pose Landmarker")
+        self.landmarker = self._create_landmarker()
+
+    def _create_landmarker(self):
+        vision = mp.tasks.vision
+        options = vision.PoseLandmarkerOptions(
+            base_options=mp.tasks.BaseOptions(model_asset_path=self.model_path),
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            num_poses=1,
+            min_pose_detection_confidence=self.min_detection_confidence,
+            min_tracking_confidence=self.min_tracking_confidence,
+            result_callback=self._on_result,
+        )
+        return vision.PoseLandmarker.create_from_options(options)
+
+    def _on_result(self, result, output_image, timestamp_ms: int) -> None:
+        """Callback de LIVE_STREAM: convierte el resultado y lo publica."""
+        with self._contexts_lock:
+            context = self._contexts.pop(timestamp_ms, None)
+            # Los frames anteriores que el modelo descartó ya no tendrán resultado
+            for stale in [ts for ts in self._contexts if ts < timestamp_ms]:
+                del self._contexts[stale]
+        pose = None
+        if result.pose_landmarks:
+            pose = PoseLandmarks([
+                Landmark(lm.x, lm.y, lm.z or 0.0, 1.0 if lm.visibility is None else lm.visibility)
+                for lm in result.pose_landmarks[0]
+            ])
+        self.handoff.publish(timestamp_ms, PoseResult(pose), context)
+
+    def submit(self, image: np.ndarray, timestamp_ms: int, context: Any = None) -> int:
+        """
+        Envía un frame RGB a la inferencia sin esperar al resultado.
+
+        Args:
+            image: Frame RGB (mp.Image copia los píxeles, así que el buffer
+                   se puede reutilizar en cuanto submit() vuelve)
+            timestamp_ms: Instante del frame en ms (se fuerza a ser creciente)
+            context: Datos que se devuelven con el resultado de este frame
+
+        Returns:
+            Timestamp usado
+        """
+        timestamp_ms = max(int(timestamp_ms), self._last_submitted_ms + 1)
+        self._last_submitted_ms = timestamp_ms
+        with self._contexts_lock:
+            self._contexts[timestamp_ms] = context
+        # image suele ser un buffer de FrameBuffers que se reescribe en el frame
+        # siguiente, mientras detect_async aún puede estar leyendo: se cuenta con
+        # que mp.Image copia los datos a su propio ImageFrame (lo comprueba
+        # TestTasksBackend). ascontiguousarray solo copia vistas no contiguas (ROI)
+        frame = mp.Image(image_format=mp.ImageFormat.SRGB, data=np.ascontiguousarray(image))
+        self.landmarker.detect_async(frame, timestamp_ms)
+        return timestamp_ms
+
+    def poll(self, now_ms: Optional[int] = None) -> Optional[Tuple[int, PoseResult, Any]]:
+        """
+        Resultado más reciente aún no consumido.
+
+        Returns:
+            (timestamp_ms del frame, resultado, contexto), o None
+        """
+        return self.handoff.take(now_ms)
+
+    def process(self, image: np.ndarray, timeout: float = 5.0) -> PoseResult:
+        timestamp_ms = self.submit(image, time.monotonic() * 1000.0)
+        if not self.handoff.wait(timestamp_ms, timeout):
+            return PoseResult(None)
+        item = self.handoff.take()
+        return item[1] if item is not None and item[0] >= timestamp_ms else PoseResult(None)
+
+    def close(self) -> None:
+        if self.landmarker is not None:
+            self.landmarker.close()
+            self.landmarker = None
+
+
+# Postura de pie de referencia (x, y) de los puntos rastreados; el resto, en el centro
+_STANDING_POSE: Dict[str, Tuple[float, float]] = {}
+for _side, _x in (('left', 0.35), ('right', 0.65)):
+    _STANDING_POSE.update({
+        f'{_side}_shoulder': (_x, 0.30), f'{_side}_elbow': (_x, 0.50), f'{_side}_wrist': (_x, 0.70),
+        f'{_side}_hip': (_x, 0.80), f'{_side}_knee': (_x, 0.92), f'{_side}_ankle': (_x, 1.00),
+    })
+
+# Puntos que giran con el extremo c de cada articulación (el vértice, si está, no se mueve)
+_LIMB_POINTS = {'elbow': ('elbow', 'wrist'), 'wrist': ('elbow', 'wrist'),
+                'knee': ('knee', 'ankle'), 'ankle': ('ankle',)}
+
+
+def default_rom(exercise_name: str, margin: float = 10.0) -> Tuple[float, float]:
+    """
+    Recorrido (ángulo inicial, ángulo de contracción) que supera en `margin`
+    grados los umbrales de etapa del ejercicio.
+    """
+    spec = EXERCISE_RULES.specs[exercise_name]
+    start, peak = spec.stage_rule_indices()
+    if start is None or peak is None:
+        raise ValueError(f"{exercise_name}: no tiene reglas de etapa")
+    extremes = []
+    for index in (start, peak):
+        rule = spec.rules[index]
+        direction = 1.0 if rule.op in ('>', '>=') else -1.0
+        extremes.append(min(178.0, max(2.0, rule.threshold + direction * margin)))
+    return extremes[0], extremes[1]
+
+
+class SyntheticMotion:
+    """
+    Generador determinista de landmarks de un ejercicio, por bloques.
+
+    El ángulo de la articulación del ejercicio (y la simétrica del otro lado)
+    va y vuelve entre los extremos del recorrido con un perfil coseno; se
+    añade temblor gaussiano a todas las coordenadas y, con probabilidad
+    `dropout` por frame, una pérdida de detección de `dropout_frames` frames.
+    Generar N frames de una vez o en varios bloques da el mismo resultado.
+
+    Args:
+        exercise_name: Ejercicio (define la articulación y el recorrido por defecto)
+        fps: Frecuencia de muestreo
+        tempo: Segundos por repetición
+        rom: (ángulo inicial, ángulo de contracción); por defecto default_rom()
+        noise: Desviación típica del temblor (coordenadas normalizadas)
+        dropout: Probabilidad por frame de que empiece una pérdida de detección
+        dropout_frames: Duración de cada pérdida en frames
+        seed: Semilla
+    """
+
+    def __init__(self, exercise_name: str = "Bicep Curl", fps: float = 30.0, tempo: float = 3.0,
+                 rom: Optional[Tuple[float, float]] = None, noise: float = 0.002,
+                 dropout: float = 0.0, dropout_frames: int = 5, seed: int = 0):
+        joint = EXERCISE_RULES.specs[exercise_name].joint
+        self.exercise_name = exercise_name
+        self.fps = fps
+        self.tempo = tempo
+        self.rom = rom if rom is not None else default_rom(exercise_name)
+        self.noise = noise
+        self.dropout = dropout
+        self.dropout_frames = max(1, dropout_frames)
+        noise_seed, dropout_seed = np.random.SeedSequence(seed).spawn(2)
+        self._noise_rng = np.random.default_rng(noise_seed)
+        self._dropout_rng = np.random.default_rng(dropout_seed)
+        self._dropout_left = 0
+        self.frame_index = 0
+
+        self._base = np.full((NUM_POSE_LANDMARKS, 3), 0.5)
+        self._base[:, 2] = 0.99
+        for name, xy in _STANDING_POSE.items():
+            self._base[LANDMARK_INDICES[name], :2] = xy
+        # Articulación del ejercicio y su simétrica, girando en sentidos opuestos
+        self._joints = []
+        for side, sign in (('left', 1.0), ('right', -1.0)):
+            mirrored = joint.replace('left_', f'{side}_').replace('right_', f'{side}_')
+            a, vertex, c = (LANDMARK_INDICES[name] for name in JOINT_TRIPLETS[mirrored])
+            part = JOINT_TRIPLETS[mirrored][2].rsplit('_', 1)[1]
+            limb = [LANDMARK_INDICES[f'{side}_{name}'] for name in _LIMB_POINTS[part]]
+            self._joints.append((a, vertex, c, limb, sign))
+
+    def angles(self, frame_indices: np.ndarray) -> np.ndarray:
+        """Ángulo objetivo de la articulación en los frames indicados."""
+        start, peak = self.rom
+        phase = 0.5 - 0.5 * np.cos(2 * np.pi * frame_indices / (self.fps * self.tempo))
+        return start + (peak - start) * phase
+
+    def generate(self, count: int) -> np.ndarray:
+        """
+        Siguientes `count` frames.
+
+        Returns:
+            Array (count, 33, 3) con x, y y visibilidad; NaN en los frames sin detección
+        """
+        frames = np.arange(self.frame_index, self.frame_index + count)
+        self.frame_index += count
+        theta = np.radians(self.angles(frames))
+
+        landmarks = np.repeat(self._base[None], count, axis=0)
+        for a, vertex, c, limb, sign in self._joints:
+            origin = self._base[vertex, :2]
+            reference = self._base[a, :2] - origin
+            offset = self._base[c, :2] - origin
+            # Dirección de c: la de a girada el ángulo objetivo (ángulo a-vértice-c exacto)
+            rotation = np.arctan2(reference[1], reference[0]) + sign * theta - np.arctan2(offset[1], offset[0])
+            cos, sin = np.cos(rotation)[:, None], np.sin(rotation)[:, None]
+            for point in limb:
+                dx, dy = self._base[point, :2] - origin
+                landmarks[:, point, 0] = origin[0] + dx * cos[:, 0] - dy * sin[:, 0]
+                landmarks[:, point, 1] = origin[1] + dx * sin[:, 0] + dy * cos[:, 0]
+        landmarks[:, :, :2] += self._noise_rng.normal(0, self.noise, (count, NUM_POSE_LANDMARKS, 2))
+
+        # Pérdidas de detección, continuando la que quedase abierta del bloque anterior
+        lost = np.zeros(count, dtype=bool)
+        lost[:self._dropout_left] = True
+        starts = np.flatnonzero(self._dropout_rng.random(count) < self.dropout)
+        if len(starts):
+            ends = np.minimum(starts + self.dropout_frames, count)
+            coverage = np.zeros(count + 1, dtype=np.int32)
+            np.add.at(coverage, starts, 1)
+            np.add.at(coverage, ends, -1)
+            lost |= np.cumsum(coverage[:-1]) > 0
+        carried = max(self._dropout_left - count, 0)
+        if len(starts):
+            carried = max(carried, int(starts[-1]) + self.dropout_frames - count)
+        self._dropout_left = carried
+        landmarks[lost] = np.nan
+        return landmarks
+
+    def completed_reps(self, frames: int) -> int:
+        """Repeticiones completas en los primeros `frames` frames."""
+        return int(frames // (self.fps * self.tempo))
+
+
+def synthetic_pose_stream(exercise_name: str, frames: int, **kwargs) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sesión sintética completa (ver SyntheticMotion para los parámetros).
+
+    Returns:
+        (timestamps (frames,), landmarks (frames, 33, 3) con NaN sin detección)
+    """
+    motion = SyntheticMotion(exercise_name, **kwargs)
+    return np.arange(frames) / motion.fps, motion.generate(frames)
+
+
+class SyntheticPoseBackend(PoseBackend):
+    """
+    Backend sin modelo: cada llamada a process() devuelve el siguiente frame
+    de SyntheticMotion, ignorando la imagen. Los frames se generan por
+    bloques vectorizados, así que el coste por frame es el de construir los
+    landmarks.
+
+    Args:
+        exercise_name: Ejercicio simulado
+        block: Frames generados por bloque
+        **kwargs: Parámetros de SyntheticMotion (fps, tempo, rom, noise, dropout...)
+    """
+
+    name = 'synthetic'
+
+    def __init__(self, exercise_name: str = "Bicep Curl", block: int = 256, **kwargs):
+        self.motion = SyntheticMotion(exercise_name, **kwargs)
+        self.block = block
+        self.frames = 0
+        self._pending = np.empty((0, NUM_POSE_LANDMARKS, 3))
+
+    @property
+    def timestamp(self) -> float:
+        """Instante del último frame devuelto, en segundos de la sesión simulada."""
+        return (self.frames - 1) / self.motion.fps
+
+    def process(self, image: Optional[np.ndarray] = None) -> PoseResult:
+        position = self.frames % self.block
+        if position == 0:
+            self._pending = self.motion.generate(self.block)
+        self.frames += 1
+        return PoseResult.from_array(self._pending[position])
+
+
+class SyntheticCapture:
+    """
+    Fuente de video sin cámara para el backend sintético: frames negros a
+    `fps`, con la misma interfaz que cv2.VideoCapture usada por el tracker.
+
+    Args:
+        size: (ancho, alto) de los frames
+        fps: Frecuencia de los frames (la posición se informa en CAP_PROP_POS_MSEC)
+        frames: Número de frames antes de agotarse (None = sin límite)
+    """
+
+    def __init__(self, size: Tuple[int, int] = (640, 480), fps: float = 30.0,
+                 frames: Optional[int] = None):
+        width, height = size
+        self._frame = np.zeros((height, width, 3), dtype=np.uint8)
+        self.fps = fps
+        self.frames = frames
+        self.position = 0
+        self._opened = True
+
+    def isOpened(self) -> bool:
+        return self._opened
+
+    def read(self, image: Optional[np.ndarray] = None):
+        if self.frames is not None and self.position >= self.frames:
+            return False, None
+        self.position += 1
+        if image is None or image.shape != self._frame.shape:
+            image = self._frame.copy()
+        return True, image
+
+    def get(self, prop: int) -> float:
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            return (self.position - 1) * 1000.0 / self.fps
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        return 0.0
+
+    def release(self) -> None:
+        self._opened = False
+
+
+# Backends seleccionables por nombre (--backend)
+POSE_BACKENDS = {
+    MediaPipePoseBackend.name: MediaPipePoseBackend,
+    TasksPoseBackend.name: TasksPoseBackend,
+    SyntheticPoseBackend.name: SyntheticPoseBackend,
+}
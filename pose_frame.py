@@ -0,0 +1,152 @@
+"""
+Representación compacta de los landmarks de un frame para TrackG.
+PoseFrame guarda x, y y visibilidad de los puntos rastreados en un único array
+de NumPy, se llena directamente desde MediaPipe con un array de índices
+precalculado y ofrece accesores con nombre y ángulos articulares vectorizados.
+"""
+
+from typing import Dict, Iterator, Tuple
+
+import numpy as np
+
+from exercise_utils import (
+    JOINT_NAMES,
+    JOINT_TRIPLETS,
+    LANDMARK_INDICES,
+    calculate_angles,
+    calculate_joint_angles
+)
+
+
+# Puntos rastreados, en el orden de las filas de PoseFrame.data
+TRACKED_LANDMARKS: Tuple[str, ...] = tuple(LANDMARK_INDICES)
+
+_SLOTS: Dict[str, int] = {name: slot for slot, name in enumerate(TRACKED_LANDMARKS)}
+
+# Índice de cada fila dentro de los 33 landmarks de MediaPipe
+SOURCE_INDICES = np.array([LANDMARK_INDICES[name] for name in TRACKED_LANDMARKS], dtype=np.intp)
+_SOURCE_INDEX_LIST = SOURCE_INDICES.tolist()
+
+# Tríos (a, vértice, c) de JOINT_NAMES expresados como filas de PoseFrame.data
+_JOINT_SLOTS = np.array(
+    [[_SLOTS[name] for name in JOINT_TRIPLETS[joint]] for joint in JOINT_NAMES],
+    dtype=np.intp
+)
+
+
+class PoseFrame:
+    """
+    Landmarks rastreados de un frame: array (len(TRACKED_LANDMARKS), 3) con
+    columnas x, y y visibilidad.
+
+    Se comporta como un mapeo de solo lectura nombre -> (x, y), por lo que las
+    funciones process_* lo aceptan en lugar del diccionario de puntos.
+    """
+
+    __slots__ = ('data', '_angles')
+
+    def __init__(self, data: np.ndarray):
+        self.data = data
+        self._angles = None
+
+    @classmethod
+    def from_landmarks(cls, landmarks) -> 'PoseFrame':
+        """
+        Crea un PoseFrame a partir de results.pose_landmarks.landmark.
+
+        Solo se leen los landmarks rastreados, sin recorrer el enum PoseLandmark.
+        """
+        get = landmarks.__getitem__
+        return cls(np.array(
+            [(lm.x, lm.y, lm.visibility) for lm in map(get, _SOURCE_INDEX_LIST)],
+            dtype=np.float64
+        ))
+
+    @classmethod
+    def from_array(cls, landmarks: np.ndarray) -> 'PoseFrame':
+        """
+        Crea un PoseFrame a partir de un array (33, 2) o (33, 3+).
+
+        Sin columna de visibilidad se asume visibilidad 1.
+        """
+        rows = np.asarray(landmarks, dtype=np.float64)[SOURCE_INDICES]
+        if rows.shape[1] == 2:
+            return cls(np.column_stack((rows, np.ones(len(rows)))))
+        return cls(rows[:, :3])
+
+    def __getitem__(self, name: str) -> Tuple[float, float]:
+        x, y = self.data[_SLOTS[name], :2].tolist()
+        return x, y
+
+    def __contains__(self, name: object) -> bool:
+        return name in _SLOTS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(TRACKED_LANDMARKS)
+
+    def __len__(self) -> int:
+        return len(TRACKED_LANDMARKS)
+
+    def keys(self) -> Tuple[str, ...]:
+        return TRACKED_LANDMARKS
+
+    def visibility(self, name: str) -> float:
+        """Visibilidad (0-1) estimada por MediaPipe para un punto."""
+        return float(self.data[_SLOTS[name], 2])
+
+    def angles(self) -> Dict[str, float]:
+        """
+        Ángulos de todas las articulaciones de JOINT_NAMES.
+
+        Se calculan en una sola llamada vectorizada la primera vez y se
+        reutilizan en el resto del frame.
+        """
+        if self._angles is None:
+            points = self.data[_JOINT_SLOTS, :2]
+            values = calculate_angles(points[:, 0], points[:, 1], points[:, 2])
+            self._angles = dict(zip(JOINT_NAMES, values.tolist()))
+        return self._angles
+
+    def __repr__(self) -> str:
+        return f"PoseFrame({len(TRACKED_LANDMARKS)} landmarks)"
+
+
+def iter_pose_frames(landmarks: np.ndarray) -> Iterator[PoseFrame]:
+    """
+    Genera un PoseFrame por fila de un array (N, 33, 2+) de una sesión.
+
+    La matriz de ángulos de toda la sesión se calcula en una sola pasada
+    vectorizada y cada frame la recibe ya calculada.
+
+    Args:
+        landmarks: Array (N, 33, 2+) de landmarks
+
+    Yields:
+        PoseFrame de cada frame, en orden
+    """
+    landmarks = np.asarray(landmarks, dtype=np.float64)
+    rows = landmarks[:, SOURCE_INDICES]
+    if rows.shape[2] == 2:
+        rows = np.concatenate((rows, np.ones(rows.shape[:2] + (1,))), axis=2)
+    angle_rows = calculate_joint_angles(landmarks).tolist()
+
+    for data, angles in zip(rows[:, :, :3], angle_rows):
+        frame = PoseFrame(data)
+        frame._angles = dict(zip(JOINT_NAMES, angles))
+        yield frame
+
+
+def _point_property(name: str) -> property:
+    slot = _SLOTS[name]
+
+    def getter(self: PoseFrame) -> Tuple[float, float]:
+        x, y = self.data[slot, :2].tolist()
+        return x, y
+
+    return property(getter, doc=f"Coordenadas (x, y) de {name}")
+
+
+# Accesores con nombre: frame.left_shoulder, frame.right_wrist, ...
+for _name in TRACKED_LANDMARKS:
+    setattr(PoseFrame, _name, _point_property(_name))
+del _name
@@ -0,0 +1,226 @@
+"""
+Analítica por repetición con memoria acotada para TrackG.
+Mantiene en buffers circulares de NumPy la serie reciente del ángulo de la
+articulación y las métricas de las últimas repeticiones: tempo concéntrico y
+excéntrico, rango de movimiento (ROM) y tiempo bajo tensión (TUT). Cada frame
+hace O(1) trabajo y la memoria no crece con la duración de la sesión.
+"""
+
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+
+from exercise_utils import EXERCISE_RULES
+from lazy_import import lazy_import
+
+cv2 = lazy_import('cv2')
+
+REP_METRICS_DTYPE = np.dtype([
+    ('timestamp', np.float64),   # Instante en que se completó la repetición
+    ('concentric', np.float64),  # Segundos del extremo inicial al extremo de la contracción
+    ('eccentric', np.float64),   # Segundos del extremo de la contracción a volver a la posición inicial
+    ('tut', np.float64),         # Tiempo bajo tensión: concéntrica + excéntrica
+    ('rom', np.float64),         # Rango de movimiento en grados
+    ('min_angle', np.float64),
+    ('max_angle', np.float64),
+])
+
+
+class RingBuffer:
+    """
+    Buffer circular de tamaño fijo sobre un array de NumPy (estructurado o
+    no). append() sobrescribe la fila más antigua cuando está lleno.
+    """
+
+    def __init__(self, capacity: int, dtype=np.float64):
+        self._data = np.zeros(capacity, dtype=dtype)
+        self._index = 0
+        self.count = 0
+
+    def __len__(self) -> int:
+        return min(self.count, len(self._data))
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data)
+
+    def append(self, row) -> None:
+        self._data[self._index] = row
+        self._index = (self._index + 1) % len(self._data)
+        self.count += 1
+
+    def clear(self) -> None:
+        self._index = 0
+        self.count = 0
+
+    def last(self):
+        """Última fila añadida, o None si está vacío."""
+        return self._data[self._index - 1] if self.count else None
+
+    def ordered(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Filas en orden cronológico.
+
+        Args:
+            out: Array de destino con al menos len(self) filas (evita asignar)
+
+        Returns:
+            Copia (o prefijo de out) con las filas de la más antigua a la más reciente
+        """
+        size = len(self)
+        if out is None:
+            out = np.empty(size, dtype=self._data.dtype)
+        out = out[:size]
+        start = self._index if self.count >= len(self._data) else 0
+        head = len(self._data) - start if start else size
+        out[:head] = self._data[start:start + head]
+        out[head:] = self._data[:size - head]
+        return out
+
+
+class RepAnalytics:
+    """
+    Métricas incrementales de las repeticiones del ejercicio activo.
+
+    La fase concéntrica va del extremo del ángulo en la posición inicial
+    (p. ej. el brazo extendido del curl) al extremo de la contracción, y la
+    excéntrica de ahí a volver a entrar en la etapa inicial, cuando se cuenta
+    la repetición. Las etapas y el sentido del movimiento salen de las reglas
+    del ejercicio (ver exercise_utils.py).
+
+    Args:
+        history: Frames de ángulo guardados para la gráfica
+        reps: Repeticiones guardadas con sus métricas
+    """
+
+    def __init__(self, history: int = 150, reps: int = 50):
+        self.angles = RingBuffer(history)
+        self.reps = RingBuffer(reps, REP_METRICS_DTYPE)
+        self.exercise_name: Optional[str] = None
+        self._start_stage: Optional[str] = None
+        self._peak_stage: Optional[str] = None
+        self._peak_low = True
+        # Cambia con cada repetición o reinicio (clave de la capa de interfaz)
+        self.revision = 0
+        self.reset()
+
+    def set_exercise(self, name: str) -> None:
+        """Configura las etapas del ejercicio y descarta la repetición en curso."""
+        self.exercise_name = name
+        self._start_stage = self._peak_stage = None
+        spec = EXERCISE_RULES.specs.get(name)
+        if spec is not None:
+            start, peak = spec.stage_rule_indices()
+            if start is not None and peak is not None:
+                self._start_stage, self._peak_stage = spec.rules[start].stage, spec.rules[peak].stage
+                self._peak_low = spec.rules[peak].op in ('<', '<=')
+        self.reset()
+
+    def reset(self) -> None:
+        """Vacía el historial y las métricas (p. ej. al cambiar de ejercicio)."""
+        self.angles.clear()
+        self.reps.clear()
+        self.revision += 1
+        self._in_peak = False
+        self._start_angle = self._start_time = math.nan
+        self._peak_angle = self._peak_time = math.nan
+        self._min_angle, self._max_angle = math.inf, -math.inf
+
+    def _beyond(self, angle: float, reference: float, towards_peak: bool) -> bool:
+        """True si angle es más extremo que reference en el sentido indicado."""
+        if math.isnan(reference):
+            return True
+        low = self._peak_low if towards_peak else not self._peak_low
+        return angle < reference if low else angle > reference
+
+    def update(self, timestamp: float, angle: float, stage: Optional[str],
+               rep_completed: bool) -> None:
+        """
+        Añade un frame. O(1) en tiempo y sin asignaciones.
+
+        Args:
+            timestamp: Instante del frame en segundos
+            angle: Ángulo de la articulación del ejercicio
+            stage: Etapa tras evaluar el frame
+            rep_completed: Si el frame completó una repetición
+        """
+        self.angles.append(angle)
+        self._min_angle = min(self._min_angle, angle)
+        self._max_angle = max(self._max_angle, angle)
+
+        if rep_completed:
+            if self._in_peak and not math.isnan(self._start_time):
+                concentric = self._peak_time - self._start_time
+                eccentric = timestamp - self._peak_time
+                self.reps.append((timestamp, concentric, eccentric, concentric + eccentric,
+                                  self._max_angle - self._min_angle, self._min_angle, self._max_angle))
+                self.revision += 1
+            # La siguiente repetición arranca desde la posición inicial
+            self._in_peak = False
+            self._start_angle, self._start_time = angle, timestamp
+            self._min_angle = self._max_angle = angle
+            return
+
+        if stage == self._peak_stage and self._start_stage is not None:
+            if not self._in_peak:
+                self._in_peak = True
+                self._peak_angle = self._peak_time = math.nan
+            if self._beyond(angle, self._peak_angle, towards_peak=True):
+                self._peak_angle, self._peak_time = angle, timestamp
+        elif not self._in_peak and self._beyond(angle, self._start_angle, towards_peak=False):
+            # Mientras no se alcanza la contracción, el inicio de la concéntrica
+            # es el extremo más reciente de la posición inicial
+            self._start_angle, self._start_time = angle, timestamp
+            self._min_angle = self._max_angle = angle
+
+    def last_rep(self) -> Optional[np.void]:
+        """Métricas de la última repetición, o None."""
+        return self.reps.last()
+
+    def summary(self) -> dict:
+        """Medias de las repeticiones guardadas."""
+        reps = self.reps.ordered()
+        if not len(reps):
+            return {'reps': 0}
+        summary = {name: float(reps[name].mean()) for name in ('concentric', 'eccentric', 'tut', 'rom')}
+        summary['reps'] = len(reps)
+        return summary
+
+
+class Sparkline:
+    """
+    Gráfica de la serie reciente de ángulos, de 0 a 180 grados, dibujada con
+    buffers de puntos reutilizados entre frames.
+    """
+
+    def __init__(self, capacity: int):
+        self._values = np.empty(capacity)
+        self._points = np.empty((capacity, 2), dtype=np.int32)
+        self._box: Optional[Tuple[int, int, int, int]] = None
+
+    def draw(self, frame: np.ndarray, history: RingBuffer, box: Tuple[int, int, int, int],
+             color=(255, 255, 255)) -> None:
+        """
+        Args:
+            frame: Frame BGR (se modifica en el sitio)
+            history: Buffer circular de ángulos
+            box: Rectángulo (x0, y0, x1, y1) de la gráfica
+            color: Color de la línea
+        """
+        x0, y0, x1, y1 = box
+        capacity = len(self._values)
+        if box != self._box:
+            # La coordenada x de cada muestra solo depende de la caja
+            self._points[:, 0] = np.linspace(x0, x1, capacity).round()
+            self._box = box
+        values = history.ordered(self._values)
+        size = len(values)
+        if size < 2:
+            return
+        points = self._points[capacity - size:]
+        np.multiply(values, -(y1 - y0) / 180.0, out=values)
+        np.add(values, y1, out=values)
+        np.clip(values, y0, y1, out=values)
+        points[:, 1] = values
+        cv2.polylines(frame, [points], False, color, 1, cv2.LINE_AA)
@@ -0,0 +1,211 @@
+"""
+Flujo de eventos de repetición para TrackG.
+process_exercise emite eventos estructurados (repeticiones completadas,
+cambios de etapa y de feedback) que un hilo de escritura agrupa en lotes y
+envía a destinos intercambiables (JSONL, SQLite, stdout). El bucle de frames
+solo encola: nunca espera a la E/S de disco.
+"""
+
+import json
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from typing import List, NamedTuple, Optional, Sequence
+
+
+class RepEvent(NamedTuple):
+    """
+    Evento emitido por process_exercise.
+
+    kind: 'rep' (repetición completada), 'stage' (cambio de etapa) o
+    'feedback' (cambio del mensaje de forma). duration, min_angle y max_angle
+    solo se rellenan en 'rep': duración desde la repetición anterior y rango
+    del ángulo de la articulación durante la repetición.
+    """
+    kind: str
+    timestamp: float
+    exercise: str
+    rep_index: int
+    stage: Optional[str]
+    feedback: str
+    angle: float
+    duration: Optional[float] = None
+    min_angle: Optional[float] = None
+    max_angle: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        return self._asdict()
+
+
+class EventSink:
+    """Destino de eventos. write() recibe lotes desde el hilo de escritura."""
+
+    def write(self, events: List[RepEvent]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class StdoutSink(EventSink):
+    """Una línea JSON por evento en stdout (o en el flujo indicado)."""
+
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def write(self, events: List[RepEvent]) -> None:
+        stream = self.stream or sys.stdout
+        stream.write(''.join(json.dumps(event.to_dict(), ensure_ascii=False) + '\n' for event in events))
+        stream.flush()
+
+
+class JsonlSink(EventSink):
+    """Añade los eventos a un archivo JSONL."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def write(self, events: List[RepEvent]) -> None:
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._file.write(''.join(json.dumps(event.to_dict(), ensure_ascii=False) + '\n' for event in events))
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class SqliteSink(EventSink):
+    """
+    Inserta los eventos en la tabla rep_events de una base SQLite, un
+    executemany y un commit por lote. La conexión se abre en el hilo de
+    escritura, que es el único que la usa.
+    """
+
+    COLUMNS = RepEvent._fields
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS rep_events ("
+            "kind TEXT NOT NULL, timestamp REAL NOT NULL, exercise TEXT NOT NULL, "
+            "rep_index INTEGER NOT NULL, stage TEXT, feedback TEXT, angle REAL, "
+            "duration REAL, min_angle REAL, max_angle REAL)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS rep_events_time ON rep_events (timestamp)")
+        return connection
+
+    def write(self, events: List[RepEvent]) -> None:
+        if self._connection is None:
+            self._connection = self._connect()
+        placeholders = ', '.join('?' * len(self.COLUMNS))
+        with self._connection:
+            self._connection.executemany(
+                f"INSERT INTO rep_events ({', '.join(self.COLUMNS)}) VALUES ({placeholders})",
+                events
+            )
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class EventWriter:
+    """
+    Escritor en segundo plano con lotes.
+
+    emit() encola sin bloquear; si la cola está llena el evento se descarta
+    y se cuenta en `dropped`. El hilo envía un lote a todos los destinos al
+    reunir batch_size eventos o al pasar flush_interval segundos desde el
+    primer evento pendiente. Un error en un destino se cuenta en `errors` y
+    no detiene la escritura.
+    """
+
+    def __init__(self, sinks: Sequence[EventSink], batch_size: int = 256,
+                 flush_interval: float = 1.0, max_queue: int = 10000):
+        self.sinks = list(sinks)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.errors = 0
+        self.written = 0
+        self._queue: "queue.Queue[Optional[RepEvent]]" = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name='trackg-events', daemon=True)
+        self._thread.start()
+
+    def emit(self, event: RepEvent) -> None:
+        """Encola un evento sin bloquear el bucle de frames."""
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def _write(self, batch: List[RepEvent]) -> None:
+        for sink in self.sinks:
+            try:
+                sink.write(batch)
+            except Exception as e:
+                self.errors += 1
+                print(f"Error escribiendo eventos en {type(sink).__name__}: {e}", file=sys.stderr)
+        self.written += len(batch)
+
+    def _run(self) -> None:
+        batch: List[RepEvent] = []
+        deadline = None
+        running = True
+        while running:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                event = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                event = None
+            else:
+                if event is None:
+                    running = False  # close(): vaciar lo pendiente y salir
+                else:
+                    batch.append(event)
+                    if deadline is None:
+                        deadline = time.monotonic() + self.flush_interval
+
+            if batch and (not running or len(batch) >= self.batch_size
+                          or time.monotonic() >= deadline):
+                self._write(batch)
+                batch = []
+                deadline = None
+
+        for sink in self.sinks:
+            sink.close()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Escribe los eventos pendientes, cierra los destinos y termina el hilo."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+
+def build_event_writer(jsonl: Optional[str] = None, sqlite: Optional[str] = None,
+                       stdout: bool = False, extra_sinks: Sequence[EventSink] = (),
+                       **kwargs) -> Optional[EventWriter]:
+    """
+    Crea un EventWriter con los destinos indicados (más extra_sinks, p. ej.
+    un HistorySink), o None si no hay ninguno.
+    """
+    sinks: List[EventSink] = list(extra_sinks)
+    if jsonl:
+        sinks.append(JsonlSink(jsonl))
+    if sqlite:
+        sinks.append(SqliteSink(sqlite))
+    if stdout:
+        sinks.append(StdoutSink())
+    return EventWriter(sinks, **kwargs) if sinks else None
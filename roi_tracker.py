@@ -0,0 +1,159 @@
+"""
+Recorte de la región de interés (ROI) antes de la inferencia para TrackG.
+Mantiene un rectángulo con margen alrededor de los landmarks del frame
+anterior, de modo que la conversión de color y el redimensionado de entrada
+de MediaPipe solo procesan la zona del atleta. Los landmarks del recorte se
+reescriben en coordenadas del frame completo, así que get_landmarks y
+draw_landmarks ven los mismos valores que sin recorte. Si se pierde el
+seguimiento se vuelve al frame completo.
+
+El recorte tiene histéresis: no se mueve ni cambia de tamaño mientras los
+landmarks queden lejos de sus bordes. MediaPipe Pose sigue al atleta y
+suaviza los landmarks en las coordenadas normalizadas de su entrada, así
+que un recorte que se desplaza en cada frame rompería ese seguimiento
+(más temblor y más ejecuciones del detector).
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class RoiTracker:
+    """
+    Rectángulo de seguimiento en píxeles (x0, y0, x1, y1) del frame completo.
+
+    Args:
+        padding: Margen añadido a cada lado, como fracción del lado mayor del
+                 rectángulo de los landmarks
+        min_size: Lado mínimo del recorte, como fracción del lado menor del frame
+        min_visibility: Visibilidad mínima para usar un landmark en el rectángulo
+        min_landmarks: Landmarks visibles necesarios para seguir recortando
+        edge_margin: Banda junto a cada borde del recorte, como fracción de su
+                     lado; la ROI solo se recalcula si un landmark entra en ella
+    """
+
+    def __init__(self, padding: float = 0.25, min_size: float = 0.4,
+                 min_visibility: float = 0.5, min_landmarks: int = 4,
+                 edge_margin: float = 0.1):
+        self.padding = padding
+        self.min_size = min_size
+        self.min_visibility = min_visibility
+        self.min_landmarks = min_landmarks
+        self.edge_margin = edge_margin
+        self.roi: Optional[Tuple[int, int, int, int]] = None
+        # Veces que se ha recalculado la ROI (desplazamientos y cambios de tamaño)
+        self.moves = 0
+
+    def reset(self) -> None:
+        """Pierde el seguimiento: el próximo frame se procesa completo."""
+        self.roi = None
+
+    def crop(self, frame: np.ndarray) -> Tuple[np.ndarray, Tuple[int, int]]:
+        """
+        Devuelve la vista del recorte actual (sin copiar) y su origen.
+
+        Returns:
+            (vista, (x0, y0)); el frame completo y (0, 0) si no hay ROI
+        """
+        if self.roi is None:
+            return frame, (0, 0)
+        x0, y0, x1, y1 = self.roi
+        return frame[y0:y1, x0:x1], (x0, y0)
+
+    @staticmethod
+    def remap(landmarks, offset: Tuple[int, int], crop_shape: Tuple[int, ...],
+              frame_shape: Tuple[int, ...]) -> None:
+        """
+        Convierte en el sitio landmarks normalizados al recorte en landmarks
+        normalizados al frame completo.
+
+        Args:
+            landmarks: Secuencia de landmarks de MediaPipe (x, y, z)
+            offset: Origen (x0, y0) del recorte en píxeles
+            crop_shape: Forma del recorte (alto, ancho, ...)
+            frame_shape: Forma del frame completo (alto, ancho, ...)
+        """
+        x0, y0 = offset
+        crop_h, crop_w = crop_shape[:2]
+        frame_h, frame_w = frame_shape[:2]
+        scale_x = crop_w / frame_w
+        scale_y = crop_h / frame_h
+        shift_x = x0 / frame_w
+        shift_y = y0 / frame_h
+        for landmark in landmarks:
+            landmark.x = shift_x + landmark.x * scale_x
+            landmark.y = shift_y + landmark.y * scale_y
+            landmark.z = landmark.z * scale_x  # z usa la misma escala que x
+
+    def _holds(self, xs: np.ndarray, ys: np.ndarray, frame_w: int, frame_h: int) -> bool:
+        """True si los puntos (en píxeles) siguen dentro de la ROI actual, fuera de la banda de sus bordes."""
+        x0, y0, x1, y1 = self.roi
+        if x1 > frame_w or y1 > frame_h:
+            return False
+        # Los puntos fuera del frame cuentan como en su borde
+        xs, ys = np.clip(xs, 0, frame_w), np.clip(ys, 0, frame_h)
+        margin_x = self.edge_margin * (x1 - x0)
+        margin_y = self.edge_margin * (y1 - y0)
+        # Un borde del recorte que coincide con el del frame no puede ir más allá
+        left = x0 + margin_x if x0 > 0 else 0
+        top = y0 + margin_y if y0 > 0 else 0
+        right = x1 - margin_x if x1 < frame_w else frame_w
+        bottom = y1 - margin_y if y1 < frame_h else frame_h
+        return xs.min() >= left and xs.max() <= right and ys.min() >= top and ys.max() <= bottom
+
+    def update(self, landmarks, frame_shape: Tuple[int, ...]) -> None:
+        """
+        Calcula la ROI del siguiente frame a partir de landmarks normalizados
+        al frame completo, o la pierde si no hay suficientes visibles. La ROI
+        actual se mantiene mientras los landmarks no se acerquen a sus bordes.
+        """
+        if landmarks is None:
+            self.reset()
+            return
+        points = np.array([(lm.x, lm.y, lm.visibility) for lm in landmarks], dtype=np.float64)
+        visible = points[points[:, 2] >= self.min_visibility]
+        if len(visible) < self.min_landmarks:
+            self.reset()
+            return
+
+        frame_h, frame_w = frame_shape[:2]
+        xs = visible[:, 0] * frame_w
+        ys = visible[:, 1] * frame_h
+        if self.roi is not None and self._holds(xs, ys, frame_w, frame_h):
+            return
+        cx, cy = (xs.min() + xs.max()) / 2, (ys.min() + ys.max()) / 2
+        side_x = xs.max() - xs.min()
+        side_y = ys.max() - ys.min()
+        margin = self.padding * max(side_x, side_y)
+        min_side = self.min_size * min(frame_w, frame_h)
+        half_w = max(side_x + 2 * margin, min_side) / 2
+        half_h = max(side_y + 2 * margin, min_side) / 2
+
+        x0 = int(max(0, cx - half_w))
+        y0 = int(max(0, cy - half_h))
+        x1 = int(min(frame_w, np.ceil(cx + half_w)))
+        y1 = int(min(frame_h, np.ceil(cy + half_h)))
+        self.roi = (x0, y0, x1, y1) if x1 - x0 > 1 and y1 - y0 > 1 else None
+        self.moves += 1
+
+    def track(self, results, offset: Tuple[int, int], crop_shape: Tuple[int, ...],
+              frame_shape: Tuple[int, ...]) -> None:
+        """
+        Tras la inferencia sobre el recorte: reescribe los landmarks al frame
+        completo y actualiza la ROI (o vuelve al frame completo si no hubo
+        detección).
+
+        Args:
+            results: Resultados de MediaPipe sobre el recorte
+            offset: Origen del recorte devuelto por crop()
+            crop_shape: Forma del recorte
+            frame_shape: Forma del frame completo
+        """
+        if not results.pose_landmarks:
+            self.reset()
+            return
+        landmarks = results.pose_landmarks.landmark
+        if crop_shape[:2] != frame_shape[:2]:
+            self.remap(landmarks, offset, crop_shape, frame_shape)
+        self.update(landmarks, frame_shape)
@@ -0,0 +1,196 @@
+"""
+Análisis de sesiones completas de landmarks para TrackG.
+Calcula en lote los ángulos de toda la sesión y aplica las reglas del
+ejercicio sin construir diccionarios por frame. Lo usan el procesamiento por
+lotes de videos y el endpoint /api/analyze.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, Optional, Tuple
+
+from exercise_utils import (
+    EXERCISE_RULES,
+    JOINT_TRIPLETS,
+    LANDMARK_INDICES,
+    NUM_POSE_LANDMARKS,
+    calculate_angles
+)
+from lazy_import import lazy_import
+
+np = lazy_import('numpy')
+
+
+def session_joint_angles(landmarks: np.ndarray, joint: str) -> np.ndarray:
+    """
+    Ángulo de una articulación en todos los frames de una sesión.
+
+    Args:
+        landmarks: Array (N, 33, 2+)
+        joint: Clave de JOINT_TRIPLETS
+
+    Returns:
+        Array (N,) en grados (NaN en frames sin detección)
+    """
+    a, b, c = (LANDMARK_INDICES[name] for name in JOINT_TRIPLETS[joint])
+    return calculate_angles(landmarks[:, a, :2], landmarks[:, b, :2], landmarks[:, c, :2])
+
+
+def analyze_session(landmarks: np.ndarray, timestamps: np.ndarray, exercise_name: str) -> Dict:
+    """
+    Cuenta repeticiones y construye la línea de tiempo del feedback.
+
+    Los frames sin detección (NaN) se ignoran, igual que en el modo en vivo.
+    La duración de cada repetición es el tiempo desde la anterior (la primera
+    se mide desde el inicio de la sesión), como ExerciseTracker.rep_duration.
+
+    Args:
+        landmarks: Array (N, 33, 2+) de landmarks normalizados
+        timestamps: Array (N,) de tiempos en segundos
+        exercise_name: Nombre del ejercicio
+
+    Returns:
+        Diccionario con repeticiones, frames e instantes de cada repetición,
+        duraciones y cambios de feedback
+    """
+    if not isinstance(exercise_name, str) or exercise_name not in EXERCISE_RULES:
+        raise ValueError(f"Ejercicio desconocido: {exercise_name}")
+
+    landmarks = np.asarray(landmarks)
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    joint = EXERCISE_RULES.specs[exercise_name].joint
+
+    if len(landmarks):
+        angles = session_joint_angles(landmarks, joint)
+        detected = ~np.isnan(landmarks[:, :, :2]).any(axis=(1, 2))
+    else:
+        angles = np.empty(0)
+        detected = np.empty(0, dtype=bool)
+
+    frame_indices = np.flatnonzero(detected)
+    detected_times = timestamps[frame_indices]
+    start_time = float(timestamps[0]) if len(timestamps) else 0.0
+
+    # Reglas evaluadas sobre toda la serie de una vez (ver evaluate_batch)
+    result = EXERCISE_RULES.evaluate_batch(exercise_name, angles[frame_indices],
+                                           timestamps=detected_times, start_time=start_time)
+    rep_frames = frame_indices[result.rep_indices].tolist()
+    rep_times = detected_times[result.rep_indices].tolist()
+    rep_durations = result.rep_durations.tolist()
+
+    # Cambios de feedback: frames cuya regla da un mensaje distinto al anterior
+    # (reglas con el mismo mensaje comparten código; la última posición es "ninguna regla")
+    feedback_names = tuple(rule.feedback for rule in EXERCISE_RULES.specs[exercise_name].rules) + ("",)
+    feedback_codes = np.array([feedback_names.index(f) for f in feedback_names])[result.rules]
+    changes = np.flatnonzero(np.diff(feedback_codes, prepend=-1) != 0)
+    feedback_timeline = [
+        {'frame': frame, 'time': t, 'feedback': feedback_names[code]}
+        for frame, t, code in zip(frame_indices[changes].tolist(), detected_times[changes].tolist(),
+                                  feedback_codes[changes].tolist())
+    ]
+
+    return {
+        'exercise': exercise_name,
+        'frames': int(len(landmarks)),
+        'detected_frames': int(len(frame_indices)),
+        'reps': len(rep_frames),
+        'rep_frames': rep_frames,
+        'rep_times': rep_times,
+        'rep_durations': rep_durations,
+        'feedback_timeline': feedback_timeline,
+    }
+
+
+def _session_fps(fps: Any) -> float:
+    """fps de una petición, que debe ser un número finito y positivo."""
+    try:
+        fps = float(fps)
+    except (TypeError, ValueError):
+        raise ValueError("'fps' debe ser un número") from None
+    if not math.isfinite(fps) or fps <= 0:
+        raise ValueError("'fps' debe ser un número positivo")
+    return fps
+
+
+def parse_binary_session(body: bytes, channels: int = 3,
+                         fps: float = 30.0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Interpreta un cuerpo binario sin copiar los datos.
+
+    Acepta una grabación de landmark_recording.py (cabecera TRKGLM01, con
+    tiempos) o un bloque crudo float32 little-endian (N, 33, channels), en cuyo
+    caso los tiempos se derivan de `fps`.
+
+    Raises:
+        ValueError: Si la cabecera está truncada o no describe frames de
+                    33 x 2+, o el bloque crudo no es un múltiplo de frames
+
+    Returns:
+        (landmarks, timestamps)
+    """
+    from landmark_recording import HEADER, MAGIC, record_dtype
+
+    if body[:len(MAGIC)] == MAGIC:
+        if len(body) < HEADER.size:
+            raise ValueError("Grabación truncada: falta la cabecera")
+        _, num_landmarks, record_channels, _ = HEADER.unpack_from(body)
+        if num_landmarks != NUM_POSE_LANDMARKS or record_channels < 2:
+            raise ValueError(f"La grabación debe tener {NUM_POSE_LANDMARKS} landmarks y 2+ canales "
+                             f"(tiene {num_landmarks} x {record_channels})")
+        dtype = record_dtype(num_landmarks, record_channels)
+        usable = (len(body) - HEADER.size) // dtype.itemsize * dtype.itemsize
+        records = np.frombuffer(body, dtype=dtype, count=usable // dtype.itemsize, offset=HEADER.size)
+        return records['landmarks'], records['timestamp']
+
+    fps = _session_fps(fps)
+    frame_size = NUM_POSE_LANDMARKS * channels * 4
+    if channels < 2 or len(body) % frame_size:
+        raise ValueError(f"El cuerpo no es un múltiplo de frames (33 x {channels} float32)")
+    landmarks = np.frombuffer(body, dtype='<f4').reshape(-1, NUM_POSE_LANDMARKS, channels)
+    return landmarks, np.arange(len(landmarks)) / fps
+
+
+def parse_json_session(payload: Dict, fps: float = 30.0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Interpreta una sesión en JSON: {"landmarks": [[[x, y, v], ...33], ...],
+    "timestamps": [...] (opcional)}. Los frames sin detección pueden ir como null.
+
+    Raises:
+        ValueError: Si el payload no es un objeto, los frames no son listas
+                    (33 x 2+) o fps no es un número positivo
+
+    Returns:
+        (landmarks, timestamps)
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("El cuerpo JSON debe ser un objeto")
+    fps = _session_fps(fps)
+    frames = payload.get('landmarks')
+    if not isinstance(frames, list):
+        raise ValueError("Falta la lista 'landmarks'")
+    if not all(frame is None or isinstance(frame, list) for frame in frames):
+        raise ValueError("Cada frame de 'landmarks' debe ser una lista de 33 puntos o null")
+    channels = next((len(frame[0]) for frame in frames if frame and isinstance(frame[0], list)), 2)
+    missing = [[np.nan] * channels] * NUM_POSE_LANDMARKS
+    frames = [frame if frame is not None else missing for frame in frames]
+    try:
+        landmarks = np.array(frames, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise ValueError("Todos los frames deben tener la misma forma (33 x 2 o 33 x 3)") from None
+    if len(landmarks) and (landmarks.ndim != 3 or landmarks.shape[1] != NUM_POSE_LANDMARKS
+                           or landmarks.shape[2] < 2):
+        raise ValueError("'landmarks' debe tener forma (N, 33, 2+)")
+
+    timestamps: Optional[list] = payload.get('timestamps')
+    if timestamps is None:
+        return landmarks, np.arange(len(landmarks)) / fps
+    if not isinstance(timestamps, list) or len(timestamps) != len(landmarks):
+        raise ValueError("'timestamps' debe tener un valor por frame")
+    try:
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise ValueError("'timestamps' debe ser una lista de números") from None
+    if timestamps.ndim != 1 or not np.isfinite(timestamps).all():
+        raise ValueError("'timestamps' debe ser una lista de números")
+    return landmarks, timestamps
@@ -0,0 +1,161 @@
+"""
+Sesiones en vivo del lado del servidor para TrackG.
+Cada cliente envía lotes pequeños de landmarks y el servidor mantiene su
+estado de ejercicio (contador, etapa, última repetición), igual que
+ExerciseTracker. Las sesiones viven en un almacén acotado en memoria con
+expulsión LRU y por inactividad, sin hilos por cliente.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from exercise_utils import EXERCISE_RULES
+from lazy_import import lazy_import
+from session_analysis import session_joint_angles
+
+np = lazy_import('numpy')
+
+
+class LiveSession:
+    """
+    Estado de ejercicio de un cliente, con los mismos campos que
+    ExerciseTracker (exercise_counter, exercise_stage, last_rep_time,
+    rep_duration, form_feedback).
+    """
+
+    __slots__ = ('session_id', 'exercise_name', 'exercise_counter', 'exercise_stage',
+                 'last_rep_time', 'rep_duration', 'form_feedback', 'last_seen', 'frames', 'lock')
+
+    def __init__(self, session_id: str, exercise_name: str = "Bicep Curl",
+                 now: Optional[float] = None):
+        if not isinstance(exercise_name, str) or exercise_name not in EXERCISE_RULES:
+            raise ValueError(f"Ejercicio desconocido: {exercise_name}")
+        now = time.time() if now is None else now
+        self.session_id = session_id
+        self.exercise_name = exercise_name
+        self.exercise_counter = 0
+        self.exercise_stage = None
+        self.last_rep_time: Optional[float] = None
+        self.rep_duration = 0.0
+        self.form_feedback = ""
+        self.last_seen = now
+        self.frames = 0
+        self.lock = threading.Lock()  # Lotes concurrentes del mismo cliente
+
+    def set_exercise(self, exercise_name: str) -> None:
+        """Cambia de ejercicio reiniciando el contador, como la tecla 1-6."""
+        if not isinstance(exercise_name, str) or exercise_name not in EXERCISE_RULES:
+            raise ValueError(f"Ejercicio desconocido: {exercise_name}")
+        if exercise_name != self.exercise_name:
+            self.exercise_name = exercise_name
+            self.exercise_counter = 0
+            self.exercise_stage = None
+            self.form_feedback = ""
+
+    def ingest(self, landmarks: np.ndarray, timestamps: np.ndarray) -> Dict:
+        """
+        Procesa un lote de frames en orden.
+
+        Args:
+            landmarks: Array (k, 33, 2+) con NaN en frames sin detección
+            timestamps: Array (k,) de tiempos en segundos
+
+        Returns:
+            Estado tras el lote y los instantes de las repeticiones nuevas
+        """
+        rep_times = []
+        if len(landmarks):
+            joint = EXERCISE_RULES.specs[self.exercise_name].joint
+            angles = session_joint_angles(landmarks, joint)
+            detected = ~np.isnan(angles)
+            if self.last_rep_time is None:
+                self.last_rep_time = float(timestamps[0])
+
+            result = EXERCISE_RULES.evaluate_batch(
+                self.exercise_name, angles[detected], self.exercise_stage,
+                timestamps=timestamps[detected], start_time=self.last_rep_time)
+            if len(result.rep_indices):
+                rep_times = timestamps[detected][result.rep_indices].tolist()
+                self.rep_duration = float(result.rep_durations[-1])
+                self.last_rep_time = rep_times[-1]
+                self.exercise_counter += len(rep_times)
+            if len(result.rules):
+                self.exercise_stage = result.final_stage
+                self.form_feedback = result.final_feedback
+            self.frames += len(landmarks)
+
+        state = self.to_dict()
+        state['new_rep_times'] = rep_times
+        return state
+
+    def to_dict(self) -> Dict:
+        return {
+            'session_id': self.session_id,
+            'exercise': self.exercise_name,
+            'counter': self.exercise_counter,
+            'stage': self.exercise_stage,
+            'rep_duration': self.rep_duration,
+            'feedback': self.form_feedback,
+            'frames': self.frames,
+        }
+
+
+class SessionStore:
+    """
+    Almacén de sesiones acotado en memoria.
+
+    El OrderedDict se mantiene en orden de último acceso, de modo que tanto la
+    expulsión LRU (al superar max_sessions) como la expulsión por inactividad
+    (idle_timeout) solo recorren las sesiones que se eliminan.
+    """
+
+    def __init__(self, max_sessions: int = 10000, idle_timeout: float = 300.0):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions: "OrderedDict[str, LiveSession]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _evict(self, now: float) -> None:
+        sessions = self._sessions
+        while sessions:
+            oldest = next(iter(sessions.values()))
+            if len(sessions) <= self.max_sessions and now - oldest.last_seen < self.idle_timeout:
+                break
+            sessions.popitem(last=False)
+            self.evicted += 1
+
+    def create(self, exercise_name: str = "Bicep Curl", now: Optional[float] = None) -> LiveSession:
+        """Crea una sesión nueva con identificador aleatorio."""
+        now = time.time() if now is None else now
+        session = LiveSession(uuid.uuid4().hex, exercise_name, now)
+        with self._lock:
+            self._sessions[session.session_id] = session
+            self._evict(now)
+        return session
+
+    def get(self, session_id: str, now: Optional[float] = None) -> Optional[LiveSession]:
+        """
+        Devuelve una sesión y la marca como usada, o None si no existe o expiró.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            self._evict(now)
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.last_seen = now
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        """Elimina una sesión; devuelve False si no existía."""
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
@@ -335,7 +335,9 @@ function onResults(results) {
 function initializePose() {
     pose = new Pose({
         locateFile: (file) => {
-            return `https://cdn.jsdelivr.net/npm/@mediapipe/pose/${file}`;
+            // Archivos autoalojados con hash (ver static_assets.py), o la CDN
+            const local = window.TRACKG_POSE_ASSETS || {};
+            return local[file] || `https://cdn.jsdelivr.net/npm/@mediapipe/pose@0.5.1675469240/${file}`;
         }
     });
     
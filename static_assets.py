@@ -0,0 +1,289 @@
+"""
+Recursos estáticos autoalojados y precomprimidos para la aplicación web de TrackG.
+
+La página carga los scripts de MediaPipe y, desde ellos, varios megas de WASM
+y modelos. En lugar de pedirlos a la CDN en cada visita, se copian a vendor/
+(python static_assets.py vendor) y el build genera en dist/:
+
+- nombres con el hash del contenido (pose.3f2a9c1b7d4e.js), que nunca
+  cambian de contenido y se pueden cachear de forma indefinida;
+- variantes precomprimidas .gz y, si está instalado el paquete brotli, .br;
+- manifest.json con la correspondencia nombre lógico -> archivo, ETag,
+  tamaños y tipo de contenido.
+
+app.py sirve dist/ en /assets/ (ver serve_asset) con TRACKG_LOCAL_ASSETS=1.
+
+Uso:
+    python static_assets.py vendor            # descarga los paquetes de MediaPipe a vendor/
+    python static_assets.py build             # static/ y vendor/ -> dist/
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+import urllib.request
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import brotli
+except ImportError:  # Opcional: sin brotli solo se generan las variantes .gz
+    brotli = None
+
+# Versiones de los paquetes de MediaPipe que carga templates/index.html
+MEDIAPIPE_CDN = 'https://cdn.jsdelivr.net/npm'
+MEDIAPIPE_PACKAGES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    'camera_utils': ('0.3.1675469240', ('camera_utils.js',)),
+    'control_utils': ('0.6.1629159505', ('control_utils.js',)),
+    'drawing_utils': ('0.3.1675469240', ('drawing_utils.js',)),
+    'pose': ('0.5.1675469240', (
+        'pose.js',
+        'pose_solution_packed_assets_loader.js',
+        'pose_solution_packed_assets.data',
+        'pose_solution_simd_wasm_bin.js',
+        'pose_solution_simd_wasm_bin.wasm',
+        'pose_solution_wasm_bin.js',
+        'pose_solution_wasm_bin.wasm',
+        'pose_web.binarypb',
+        'pose_landmark_lite.tflite',
+        'pose_landmark_full.tflite',
+        'pose_landmark_heavy.tflite',
+    )),
+}
+
+# Tipos que mimetypes no conoce en todas las plataformas
+CONTENT_TYPES = {
+    '.js': 'text/javascript',
+    '.wasm': 'application/wasm',
+    '.data': 'application/octet-stream',
+    '.tflite': 'application/octet-stream',
+    '.binarypb': 'application/octet-stream',
+}
+
+# Codificaciones precomprimidas, en orden de preferencia al servir
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+# Una variante comprimida solo se guarda si ahorra al menos un 10 %
+MIN_COMPRESSION_RATIO = 0.9
+
+HASH_LENGTH = 12
+
+
+def content_type(path: str) -> str:
+    """Tipo de contenido por extensión."""
+    extension = os.path.splitext(path)[1].lower()
+    return CONTENT_TYPES.get(extension) or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+
+def hashed_name(logical: str, digest: str) -> str:
+    """'mediapipe/pose/pose.js' -> 'mediapipe/pose/pose.<hash>.js'."""
+    root, extension = os.path.splitext(logical)
+    return f'{root}.{digest[:HASH_LENGTH]}{extension}'
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=11)
+    # mtime=0: la misma entrada da siempre el mismo .gz
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _iter_sources(roots: Sequence[str], exclude: str):
+    """(ruta, nombre lógico) de los archivos de cada raíz, sin la carpeta de salida."""
+    exclude = os.path.abspath(exclude)
+    for root in roots:
+        for directory, subdirs, files in os.walk(root):
+            subdirs[:] = sorted(d for d in subdirs if os.path.abspath(os.path.join(directory, d)) != exclude)
+            for name in sorted(files):
+                path = os.path.join(directory, name)
+                yield path, os.path.relpath(path, root).replace(os.sep, '/')
+
+
+def build_assets(roots: Sequence[str] = ('static', 'vendor'), output_dir: str = 'dist') -> Dict:
+    """
+    Copia los recursos con nombres con hash y genera las variantes
+    comprimidas y el manifiesto.
+
+    Args:
+        roots: Carpetas de origen (el nombre lógico es la ruta relativa a cada una)
+        output_dir: Carpeta de salida
+
+    Returns:
+        Manifiesto (también escrito en output_dir/manifest.json)
+    """
+    encodings = [(name, suffix) for name, suffix in ENCODINGS if name != 'br' or brotli is not None]
+    assets = {}
+    for path, logical in _iter_sources([root for root in roots if os.path.isdir(root)], output_dir):
+        with open(path, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        target = hashed_name(logical, digest)
+        destination = os.path.join(output_dir, target)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        entry = {
+            'file': target,
+            'size': len(data),
+            'etag': digest[:32],
+            'content_type': content_type(logical),
+            'encodings': {},
+        }
+        if not os.path.exists(destination):
+            shutil.copyfile(path, destination)
+        for encoding, suffix in encodings:
+            compressed_path = destination + suffix
+            if os.path.exists(compressed_path):
+                size = os.path.getsize(compressed_path)
+            else:
+                compressed = _compress(data, encoding)
+                size = len(compressed)
+                if size > len(data) * MIN_COMPRESSION_RATIO:
+                    continue
+                with open(compressed_path, 'wb') as f:
+                    f.write(compressed)
+            entry['encodings'][encoding] = size
+        assets[logical] = entry
+
+    manifest = {'version': 1, 'assets': assets}
+    os.makedirs(output_dir, exist_ok=True)
+    tmp_path = os.path.join(output_dir, 'manifest.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, os.path.join(output_dir, 'manifest.json'))
+    return manifest
+
+
+def vendor_mediapipe(dest: str = 'vendor') -> List[str]:
+    """
+    Descarga de la CDN los archivos de los paquetes de MediaPipe que usa la página.
+
+    Returns:
+        Rutas descargadas
+    """
+    downloaded = []
+    for package, (version, files) in MEDIAPIPE_PACKAGES.items():
+        directory = os.path.join(dest, 'mediapipe', package)
+        os.makedirs(directory, exist_ok=True)
+        for name in files:
+            path = os.path.join(directory, name)
+            url = f'{MEDIAPIPE_CDN}/@mediapipe/{package}@{version}/{name}'
+            with urllib.request.urlopen(url, timeout=60) as response, open(path, 'wb') as f:
+                shutil.copyfileobj(response, f)
+            downloaded.append(path)
+    return downloaded
+
+
+class AssetManifest:
+    """
+    Manifiesto de un build, para generar URLs y resolver peticiones.
+
+    Args:
+        directory: Carpeta del build (con manifest.json)
+        assets: Entradas del manifiesto por nombre lógico
+    """
+
+    def __init__(self, directory: str, assets: Dict[str, Dict]):
+        self.directory = os.path.abspath(directory)
+        self.assets = assets
+        self._by_file = {entry['file']: entry for entry in assets.values()}
+
+    @classmethod
+    def load(cls, directory: str) -> Optional['AssetManifest']:
+        """Carga directory/manifest.json, o None si no existe."""
+        path = os.path.join(directory, 'manifest.json')
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            return cls(directory, json.load(f)['assets'])
+
+    def __contains__(self, logical: str) -> bool:
+        return logical in self.assets
+
+    def file(self, logical: str) -> Optional[str]:
+        """Nombre con hash de un recurso, o None si no está en el build."""
+        entry = self.assets.get(logical)
+        return entry['file'] if entry is not None else None
+
+    def urls(self, prefix: str, url_prefix: str) -> Dict[str, str]:
+        """
+        URLs de los recursos de una carpeta lógica, por nombre de archivo
+        (p. ej. para el locateFile de MediaPipe).
+        """
+        return {logical[len(prefix):]: f"{url_prefix}/{entry['file']}"
+                for logical, entry in self.assets.items() if logical.startswith(prefix)}
+
+    def resolve(self, filename: str, accept_encoding: str = '',
+                allow_encoded: bool = True) -> Optional[Tuple[str, Dict, Optional[str]]]:
+        """
+        Archivo a servir para una petición de un nombre con hash.
+
+        Args:
+            filename: Nombre con hash pedido
+            accept_encoding: Cabecera Accept-Encoding
+            allow_encoded: False para servir siempre la versión sin comprimir
+                           (p. ej. en peticiones con Range)
+
+        Returns:
+            (ruta en disco, entrada del manifiesto, codificación o None), o
+            None si el archivo no pertenece al build
+        """
+        entry = self._by_file.get(filename)
+        if entry is None:
+            return None
+        path = os.path.join(self.directory, entry['file'])
+        if allow_encoded:
+            accepted = _accepted_encodings(accept_encoding)
+            for encoding, suffix in ENCODINGS:
+                if encoding in entry['encodings'] and encoding in accepted:
+                    return path + suffix, entry, encoding
+        return path, entry, None
+
+
+def _accepted_encodings(header: str) -> set:
+    """Codificaciones aceptadas (q > 0) de una cabecera Accept-Encoding."""
+    accepted = set()
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        quality = params.strip()
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Punto de entrada de línea de comandos.
+    """
+    parser = argparse.ArgumentParser(description="TrackG - Build de recursos estáticos")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    vendor = subparsers.add_parser('vendor', help="Descargar los paquetes de MediaPipe")
+    vendor.add_argument('--dest', default='vendor')
+    build = subparsers.add_parser('build', help="Generar dist/ con hash, compresión y manifiesto")
+    build.add_argument('--source', action='append', dest='sources',
+                       help="Carpeta de origen (repetible; por defecto static y vendor)")
+    build.add_argument('--output', default='dist')
+    args = parser.parse_args(argv)
+
+    if args.command == 'vendor':
+        paths = vendor_mediapipe(args.dest)
+        print(f"{len(paths)} archivos descargados en {args.dest}")
+        return
+
+    manifest = build_assets(args.sources or ('static', 'vendor'), args.output)
+    assets = manifest['assets'].values()
+    original = sum(entry['size'] for entry in assets)
+    best = sum(min([entry['size'], *entry['encodings'].values()]) for entry in assets)
+    print(f"{len(manifest['assets'])} recursos en {args.output}: {original / 1e6:.2f} MB, "
+          f"{best / 1e6:.2f} MB comprimidos" + ("" if brotli is not None else " (sin brotli: solo gzip)"))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,32 @@ Tests para el sistema de seguimiento de ejercicios.
 Valida cálculos de ángulos y lógica de detección de ejercicios.
 """
 
+import gzip
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
 import unittest
+from types import SimpleNamespace
 import numpy as np
 from exercise_utils import (
+    EXERCISE_RULES,
+    ExerciseRules,
+    ExerciseSpec,
+    FrameAngles,
+    StageRule,
     calculate_angle,
+    evaluate_batch,
+    calculate_angles,
+    calculate_joint_angles,
+    JOINT_NAMES,
+    JOINT_TRIPLETS,
+    LANDMARK_INDICES,
+    load_thresholds,
     process_bicep_curl,
     process_shoulder_press,
     process_lateral_raise,
@@ -15,6 +37,52 @@ from exercise_utils import (
     process_tricep_extension
 )
 
+import batch_processor
+import app as app_module
+import benchmark
+from app import app
+from exercise_tracker import ExerciseTracker
+from frame_buffers import FrameBuffers
+from frame_pipeline import LatestQueue, PipelineStats, run_pipeline
+from history_store import HistorySink, HistoryStore, day_key, week_key
+from filter_evaluation import add_jitter, count_reps
+from inference_scheduler import InferenceScheduler, rest_and_sets_stream, simulate_schedule
+from lazy_import import LazyModule, lazy_import
+from landmark_filter import EXERCISE_FILTER_PARAMS, LandmarkFilter, OneEuroFilter
+from landmark_recording import LandmarkRecorder, load_recording, replay_recording
+from multi_camera import StreamWorker, parse_source, run_multi_camera, tile_frames
+from overlay_cache import CachedLayer
+from perf_stats import RollingHistogram, StageTimer, StartupReport
+from pose_backends import (PoseResult, ResultHandoff, SyntheticCapture, SyntheticMotion,
+                           SyntheticPoseBackend, TasksPoseBackend, draw_skeleton, synthetic_pose_stream)
+from pose_frame import PoseFrame, TRACKED_LANDMARKS, iter_pose_frames
+from rep_analytics import RepAnalytics, RingBuffer
+from rep_events import EventSink, EventWriter, JsonlSink, RepEvent, SqliteSink
+from roi_tracker import RoiTracker
+from session_analysis import session_joint_angles
+from session_store import LiveSession, SessionStore
+import static_assets
+import threshold_tuner
+
+
+def make_session_landmarks(wrist_positions):
+    """Crea un array (N, 33, 3) con el brazo izquierdo en las posiciones dadas."""
+    landmarks = np.zeros((len(wrist_positions), 33, 3))
+    landmarks[:, :, 2] = 1.0
+    for name, (x, y) in {
+        'left_shoulder': (0.3, 0.3), 'left_elbow': (0.3, 0.5), 'left_hip': (0.3, 0.8),
+        'right_shoulder': (0.7, 0.3), 'right_elbow': (0.7, 0.5), 'right_wrist': (0.7, 0.7),
+        'right_hip': (0.7, 0.8),
+    }.items():
+        landmarks[:, LANDMARK_INDICES[name], :2] = (x, y)
+    landmarks[:, LANDMARK_INDICES['left_wrist'], :2] = wrist_positions
+    return landmarks
+
+
+EXTENDED_WRIST = (0.3, 0.7)
+FLEXED_WRIST = (0.25, 0.35)
+TRACKED_WRIST = TRACKED_LANDMARKS.index('left_wrist')
+
 
 class TestExerciseUtils(unittest.TestCase):
     """Tests para las funciones de utilidad."""
@@ -241,6 +309,1816 @@ class TestAngleCalculations(unittest.TestCase):
             self.assertLessEqual(angle, 180)
 
 
+class TestJointAngleKernel(unittest.TestCase):
+    """Tests para el cálculo vectorizado de ángulos articulares."""
+    
+    def test_batch_angles_match_scalar(self):
+        """Test: El cálculo en lote coincide con calculate_angle."""
+        rng = np.random.default_rng(0)
+        a, b, c = rng.random((3, 50, 2))
+        
+        batch = calculate_angles(a, b, c)
+        for i in range(50):
+            self.assertAlmostEqual(batch[i], calculate_angle(a[i], b[i], c[i]), places=9)
+    
+    def test_joint_angle_matrix_shape(self):
+        """Test: La matriz de ángulos tiene una columna por articulación."""
+        landmarks = np.random.default_rng(1).random((7, 33, 2))
+        
+        angles = calculate_joint_angles(landmarks)
+        self.assertEqual(angles.shape, (7, len(JOINT_NAMES)))
+        self.assertEqual(calculate_joint_angles(landmarks[0]).shape, (len(JOINT_NAMES),))
+    
+    def test_joint_angle_matrix_values(self):
+        """Test: Cada columna coincide con el ángulo escalar de su trío."""
+        landmarks = np.random.default_rng(2).random((4, 33, 3))
+        
+        angles = calculate_joint_angles(landmarks)
+        for frame in range(4):
+            for column, name in enumerate(JOINT_NAMES):
+                a, b, c = (landmarks[frame, LANDMARK_INDICES[p], :2] for p in JOINT_TRIPLETS[name])
+                self.assertAlmostEqual(angles[frame, column], calculate_angle(a, b, c), places=9)
+
+
+class TestBatchProcessor(unittest.TestCase):
+    """Tests para el procesamiento por lotes de videos."""
+    
+    def test_score_session_counts_reps(self):
+        """Test: Las reglas cuentan repeticiones sobre una sesión grabada."""
+        landmarks = make_session_landmarks([EXTENDED_WRIST, FLEXED_WRIST, EXTENDED_WRIST] * 3)
+        landmarks[3] = np.nan  # Frame sin detección
+        timestamps = np.arange(len(landmarks)) * 0.5
+        
+        result = batch_processor.score_session(landmarks, timestamps, "Bicep Curl")
+        self.assertEqual(result['detected_frames'], 8)
+        self.assertEqual(result['reps'], 3)
+        self.assertEqual(result['rep_frames'], [2, 5, 8])
+        self.assertEqual(result['rep_durations'], [1.0, 1.5, 1.5])
+        self.assertEqual(result['feedback_timeline'][0]['frame'], 0)
+    
+    def test_process_video_uses_cache(self):
+        """Test: Un video ya cacheado no vuelve a ejecutar MediaPipe."""
+        with tempfile.TemporaryDirectory() as tmp:
+            video = os.path.join(tmp, 'sesion.mp4')
+            with open(video, 'wb') as f:
+                f.write(b'contenido de prueba')
+            cache_dir = os.path.join(tmp, 'cache')
+            landmarks = make_session_landmarks([EXTENDED_WRIST, FLEXED_WRIST, EXTENDED_WRIST])
+            key = batch_processor.cache_key(batch_processor.file_hash(video),
+                                            batch_processor.model_config(1))
+            batch_processor.save_cached_landmarks(cache_dir, key, landmarks, np.arange(3.0))
+            
+            result = batch_processor.process_video(
+                video, "Bicep Curl", os.path.join(tmp, 'out'), cache_dir)
+            self.assertTrue(result['cached'])
+            self.assertEqual(result['reps'], 1)
+            self.assertTrue(os.path.exists(os.path.join(tmp, 'out', 'sesion.json')))
+            self.assertTrue(os.path.exists(os.path.join(tmp, 'out', 'sesion.npz')))
+            
+            # Otra complejidad del modelo no reutiliza esos landmarks
+            other = batch_processor.cache_key(batch_processor.file_hash(video),
+                                              batch_processor.model_config(2))
+            self.assertNotEqual(other, key)
+            self.assertIsNone(batch_processor.load_cached_landmarks(cache_dir, other))
+    
+    def test_unreadable_video_is_not_cached(self):
+        """Test: Un video ilegible da error y una sesión sin frames no queda en la caché."""
+        with tempfile.TemporaryDirectory() as tmp:
+            video = os.path.join(tmp, 'roto.mp4')
+            with open(video, 'wb') as f:
+                f.write(b'no es un video')
+            with self.assertRaises(ValueError):
+                batch_processor.extract_landmarks(video, pose=None)
+            
+            cache_dir = os.path.join(tmp, 'cache')
+            empty = np.empty((0, batch_processor.NUM_POSE_LANDMARKS, 3), dtype=np.float32)
+            batch_processor.save_cached_landmarks(cache_dir, 'vacio', empty, np.empty(0))
+            self.assertFalse(os.path.exists(os.path.join(cache_dir, 'vacio.npz')))
+            
+            # Entradas vacías de versiones anteriores se vuelven a procesar
+            os.makedirs(cache_dir)
+            np.savez_compressed(os.path.join(cache_dir, 'antiguo.npz'), landmarks=empty, timestamps=np.empty(0))
+            self.assertIsNone(batch_processor.load_cached_landmarks(cache_dir, 'antiguo'))
+    
+    def test_output_names_keep_folders(self):
+        """Test: Videos con el mismo nombre en carpetas distintas no comparten salida."""
+        names = batch_processor.output_names([os.path.join('x', 'a', 'sesion.mp4'),
+                                              os.path.join('x', 'b', 'sesion.mp4')])
+        self.assertEqual(sorted(names.values()), [os.path.join('a', 'sesion'), os.path.join('b', 'sesion')])
+        self.assertEqual(list(batch_processor.output_names(['sesion.mp4']).values()), ['sesion'])
+        with self.assertRaises(ValueError):
+            batch_processor.output_names([os.path.join('x', 'sesion.mp4'), os.path.join('x', 'sesion.avi')])
+    
+    def test_collect_videos_from_directory(self):
+        """Test: Se recogen solo los archivos de video de un directorio."""
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ('b.mp4', 'a.MOV', 'notas.txt'):
+                open(os.path.join(tmp, name), 'w').close()
+            
+            videos = batch_processor.collect_videos([tmp])
+            self.assertEqual([os.path.basename(v) for v in videos], ['a.MOV', 'b.mp4'])
+
+
+class PacedCapture(SyntheticCapture):
+    """Cámara simulada a su ritmo: la captura no termina antes de renderizar."""
+    
+    def read(self, image=None):
+        time.sleep(0.005)
+        return super().read(image)
+
+
+class TestFramePipeline(unittest.TestCase):
+    """Tests para las colas y estadísticas del pipeline de frames."""
+    
+    def test_latest_queue_drops_oldest(self):
+        """Test: Con la cola llena gana el frame más reciente."""
+        queue = LatestQueue(maxsize=1)
+        for frame_id in range(5):
+            queue.put(frame_id)
+        
+        self.assertEqual(queue.get(timeout=0), 4)
+        self.assertEqual(queue.dropped, 4)
+        self.assertIsNone(queue.get(timeout=0.01))
+    
+    def test_latest_queue_close_wakes_consumer(self):
+        """Test: Cerrar la cola devuelve None a los consumidores."""
+        queue = LatestQueue()
+        queue.close()
+        self.assertIsNone(queue.get(timeout=1.0))
+    
+    def test_pipeline_stats(self):
+        """Test: FPS y latencia se calculan sobre los frames registrados."""
+        stats = PipelineStats()
+        for i in range(31):
+            stats.record(capture_time=i / 30.0, render_time=i / 30.0 + 0.05)
+        
+        self.assertAlmostEqual(stats.fps, 30.0, places=6)
+        self.assertAlmostEqual(stats.latency_ms, 50.0, places=6)
+    
+    def run_without_window(self, run, wait_key=lambda delay: -1, imshow=lambda name, frame: None):
+        """Ejecuta run() con las funciones de ventana de OpenCV sustituidas."""
+        import cv2
+        patched = {'imshow': imshow, 'waitKey': wait_key, 'destroyAllWindows': lambda: None}
+        saved = {name: getattr(cv2, name) for name in patched}
+        try:
+            for name, function in patched.items():
+                setattr(cv2, name, function)
+            return run()
+        finally:
+            for name, function in saved.items():
+                setattr(cv2, name, function)
+    
+    def test_pipeline_uses_capture_time_and_feeds_perf(self):
+        """Test: El pipeline pasa el instante de captura a process_exercise y alimenta el panel de rendimiento."""
+        tracker = ExerciseTracker(pose_backend=SyntheticPoseBackend("Bicep Curl"))
+        calls = []
+        process = tracker.process_exercise
+        
+        def record_call(landmarks, timestamp=None):
+            calls.append((timestamp, time.time()))
+            process(landmarks, timestamp)
+        
+        tracker.process_exercise = record_call
+        started = time.time()
+        self.run_without_window(lambda: run_pipeline(tracker, PacedCapture((64, 48), frames=40)))
+        
+        self.assertTrue(calls)
+        for timestamp, processed in calls:
+            self.assertIsNotNone(timestamp)
+            self.assertTrue(started <= timestamp <= processed)
+        for stage in ('cvtColor+pose.process', 'process_exercise', 'draw_ui', 'frame'):
+            self.assertIn(stage, tracker.perf.stages)
+    
+    def test_pipeline_waits_for_inference_before_closing_model(self):
+        """Test: Al salir, el modelo no se cierra mientras el hilo de inferencia sigue en pose.process."""
+        class SlowBackend(SyntheticPoseBackend):
+            active = False
+            calls = 0
+            closed_while_active = None
+            
+            def process(self, image=None):
+                self.active = True
+                # La segunda inferencia sigue en curso cuando se pulsa Q
+                time.sleep(1.2 if self.calls else 0.0)
+                self.calls += 1
+                result = super().process(image)
+                self.active = False
+                return result
+            
+            def close(self):
+                self.closed_while_active = self.active
+                super().close()
+        
+        backend = SlowBackend("Bicep Curl")
+        tracker = ExerciseTracker(pose_backend=backend)
+        shown = []
+        self.run_without_window(lambda: tracker.run_pipelined(PacedCapture((64, 48))),
+                                wait_key=lambda delay: ord('q') if shown else -1,
+                                imshow=lambda name, frame: shown.append(True))
+        self.assertEqual(shown, [True])
+        self.assertFalse(backend.closed_while_active)
+    
+    def test_pipeline_rejects_scheduler_flags(self):
+        """Test: --pipeline no acepta las opciones del planificador."""
+        for flag in (['--infer-every', '2'], ['--adaptive'], ['--budget-ms', '10']):
+            with self.subTest(flag=flag):
+                output = subprocess.run([sys.executable, 'exercise_tracker.py', '--pipeline', *flag],
+                                        capture_output=True, text=True, timeout=60,
+                                        cwd=os.path.dirname(os.path.abspath(__file__)))
+                self.assertEqual(output.returncode, 2)
+                self.assertIn('--pipeline', output.stderr)
+
+
+class TestLandmarkRecording(unittest.TestCase):
+    """Tests para la grabación y reproducción de landmarks."""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'sesion.trkg')
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_round_trip(self):
+        """Test: Lo grabado se recupera mediante memmap."""
+        landmarks = make_session_landmarks([EXTENDED_WRIST, FLEXED_WRIST])
+        with LandmarkRecorder(self.path) as recorder:
+            recorder.write(0.0, landmarks[0])
+            recorder.write(0.1, None)
+            recorder.write(0.2, landmarks[1])
+        
+        records = load_recording(self.path)
+        self.assertEqual(len(records), 3)
+        np.testing.assert_allclose(records['timestamp'], [0.0, 0.1, 0.2])
+        np.testing.assert_allclose(records['landmarks'][2], landmarks[1], rtol=1e-6)
+        self.assertTrue(np.isnan(records['landmarks'][1]).all())
+    
+    def test_replay_is_deterministic(self):
+        """Test: La reproducción cuenta repeticiones con los tiempos grabados."""
+        wrists = [EXTENDED_WRIST, FLEXED_WRIST] * 4 + [EXTENDED_WRIST]
+        landmarks = make_session_landmarks(wrists)
+        with LandmarkRecorder(self.path) as recorder:
+            for i, frame in enumerate(landmarks):
+                recorder.write(10.0 + i, frame)
+        
+        tracker = ExerciseTracker(load_model=False)
+        first = replay_recording(tracker, self.path, "Bicep Curl")
+        second = replay_recording(tracker, self.path, "Bicep Curl")
+        self.assertEqual(first['reps'], 4)
+        self.assertEqual(first['rep_times'], [12.0, 14.0, 16.0, 18.0])
+        self.assertEqual(first['rep_times'], second['rep_times'])
+        self.assertEqual(tracker.rep_duration, 2.0)
+    
+    def test_replay_resets_filter_and_analytics(self):
+        """Test: Reproducir dos veces con el mismo tracker no arrastra el filtro ni las métricas."""
+        timestamps, landmarks = synthetic_pose_stream("Bicep Curl", 600, seed=3)
+        with LandmarkRecorder(self.path) as recorder:
+            for t, frame in zip(timestamps.tolist(), landmarks):
+                recorder.write(100.0 + t, frame)
+        
+        tracker = ExerciseTracker(load_model=False, filter_landmarks=True)
+        first = replay_recording(tracker, self.path, "Bicep Curl")
+        first_metrics = tracker.analytics.reps.ordered().copy()
+        second = replay_recording(tracker, self.path, "Bicep Curl")
+        self.assertGreater(first['reps'], 0)
+        self.assertEqual(first['rep_times'], second['rep_times'])
+        np.testing.assert_array_equal(tracker.analytics.reps.ordered(), first_metrics)
+        self.assertEqual(len(first_metrics), first['reps'])
+    
+    def test_filtered_replay_resets_on_detection_gaps(self):
+        """Test: Con filtro, la reproducción reinicia el filtro en los huecos como el modo en vivo."""
+        timestamps, landmarks = synthetic_pose_stream("Bicep Curl", 600, seed=4)
+        gaps = set(range(95, 140)) | set(range(290, 330))
+        with LandmarkRecorder(self.path) as recorder:
+            for i, (t, frame) in enumerate(zip(timestamps.tolist(), landmarks)):
+                recorder.write(100.0 + t, None if i in gaps else frame)
+        
+        # Referencia: el bucle de run(), que reinicia el filtro sin detección,
+        # con los mismos landmarks float32 de la grabación
+        records = load_recording(self.path)
+        live = ExerciseTracker(load_model=False, filter_landmarks=True)
+        live.reset_session(100.0)
+        live_times = []
+        for t, frame in zip(records['timestamp'].tolist(), np.asarray(records['landmarks'])):
+            if np.isnan(frame).any():
+                live.landmark_filter.reset()
+                continue
+            previous_count = live.exercise_counter
+            live.process_exercise(frame, timestamp=t)
+            if live.exercise_counter != previous_count:
+                live_times.append(t)
+        
+        tracker = ExerciseTracker(load_model=False, filter_landmarks=True)
+        result = replay_recording(tracker, self.path, "Bicep Curl")
+        self.assertEqual(result['detected_frames'], 600 - len(gaps))
+        self.assertEqual(result['reps'], live.exercise_counter)
+        self.assertEqual(result['rep_times'], live_times)
+        replayed, reference = tracker.analytics.reps.ordered(), live.analytics.reps.ordered()
+        for field in reference.dtype.names:
+            np.testing.assert_allclose(replayed[field], reference[field], rtol=1e-9)
+    
+    def test_rejects_foreign_file(self):
+        """Test: Un archivo que no es una grabación se rechaza."""
+        with open(self.path, 'wb') as f:
+            f.write(b'\x00' * 64)
+        with self.assertRaises(ValueError):
+            load_recording(self.path)
+
+
+class TestExerciseRules(unittest.TestCase):
+    """Tests para la tabla de reglas declarativa."""
+    
+    def test_all_specs_compiled(self):
+        """Test: Los seis ejercicios están en la tabla de despacho."""
+        self.assertEqual(EXERCISE_RULES.names, (
+            "Bicep Curl", "Shoulder Press", "Lateral Raise",
+            "Front Raise", "Hammer Curl", "Tricep Extension"))
+    
+    def test_custom_spec_is_data_only(self):
+        """Test: Un ejercicio nuevo se define solo con datos."""
+        rules = ExerciseRules((
+            ExerciseSpec("Squat", 'left_knee', (
+                StageRule('>', 160, "De pie", "up", "down"),
+                StageRule('<', 90, "Abajo", "down"),
+                StageRule(None, 0, "Bajando..."),
+            )),
+        ))
+        
+        self.assertEqual(rules.evaluate("Squat", {'left_knee': 80.0}, "up"), (False, "Abajo", "down"))
+        self.assertEqual(rules.evaluate("Squat", {'left_knee': 120.0}, "down"), (False, "Bajando...", "down"))
+        self.assertEqual(rules.evaluate("Squat", {'left_knee': 170.0}, "down"), (True, "De pie", "up"))
+    
+    def test_frame_angles_computed_once(self):
+        """Test: Cada ángulo se calcula una vez por frame y se comparte."""
+        points = {
+            'left_shoulder': (0.3, 0.3),
+            'left_elbow': (0.3, 0.5),
+            'left_wrist': (0.3, 0.7),
+            'left_hip': (0.3, 0.8),
+        }
+        angles = FrameAngles(points)
+        
+        EXERCISE_RULES.evaluate("Bicep Curl", angles, None)
+        EXERCISE_RULES.evaluate("Hammer Curl", angles, None)
+        EXERCISE_RULES.evaluate("Tricep Extension", angles, None)
+        self.assertEqual(list(angles), ['left_elbow'])
+        self.assertAlmostEqual(angles['left_elbow'], 180.0, places=6)
+
+
+class TestPoseFrame(unittest.TestCase):
+    """Tests para el PoseFrame respaldado por arrays."""
+    
+    def setUp(self):
+        self.array = make_session_landmarks([FLEXED_WRIST])[0]
+        self.array[LANDMARK_INDICES['left_wrist'], 2] = 0.25
+        self.landmarks = [SimpleNamespace(x=x, y=y, visibility=v) for x, y, v in self.array]
+    
+    def test_from_landmarks_matches_from_array(self):
+        """Test: Llenar desde MediaPipe o desde un array da lo mismo."""
+        from_mediapipe = PoseFrame.from_landmarks(self.landmarks)
+        from_array = PoseFrame.from_array(self.array)
+        np.testing.assert_array_equal(from_mediapipe.data, from_array.data)
+    
+    def test_named_accessors(self):
+        """Test: Accesores con nombre, por clave y visibilidad."""
+        frame = PoseFrame.from_landmarks(self.landmarks)
+        self.assertEqual(frame.left_wrist, FLEXED_WRIST)
+        self.assertEqual(frame['left_shoulder'], (0.3, 0.3))
+        self.assertEqual(frame.visibility('left_wrist'), 0.25)
+        self.assertIn('right_hip', frame)
+    
+    def test_process_functions_accept_pose_frame(self):
+        """Test: Las funciones process_* trabajan sobre PoseFrame sin diccionario."""
+        frame = PoseFrame.from_array(self.array)
+        points = {name: frame[name] for name in frame}
+        self.assertEqual(process_bicep_curl(frame, None), process_bicep_curl(points, None))
+        self.assertEqual(frame.angles()['left_elbow'],
+                         calculate_angle(FLEXED_WRIST, (0.3, 0.5), (0.3, 0.3)))
+    
+    def test_iter_pose_frames_precomputes_angles(self):
+        """Test: Los frames de una sesión reciben la matriz de ángulos ya calculada."""
+        landmarks = make_session_landmarks([EXTENDED_WRIST, FLEXED_WRIST])
+        frames = list(iter_pose_frames(landmarks))
+        for frame, row in zip(frames, landmarks):
+            expected = PoseFrame.from_array(row)
+            np.testing.assert_array_equal(frame.data, expected.data)
+            self.assertEqual(frame.angles(), expected.angles())
+    
+    def test_tracker_counts_with_pose_frames(self):
+        """Test: ExerciseTracker cuenta repeticiones a partir de landmarks de MediaPipe."""
+        tracker = ExerciseTracker(load_model=False)
+        for i, wrist in enumerate([EXTENDED_WRIST, FLEXED_WRIST, EXTENDED_WRIST]):
+            row = make_session_landmarks([wrist])[0]
+            tracker.process_exercise(
+                [SimpleNamespace(x=x, y=y, visibility=v) for x, y, v in row], timestamp=float(i))
+        self.assertEqual(tracker.exercise_counter, 1)
+
+
+class TestBenchmark(unittest.TestCase):
+    """Tests para la suite de microbenchmarks."""
+    
+    def test_synthetic_stream_counts_reps(self):
+        """Test: El flujo sintético produce repeticiones reales de bicep curl."""
+        landmarks = benchmark.synthetic_landmark_stream(frames=300)
+        tracker = ExerciseTracker(load_model=False)
+        for i, frame in enumerate(landmarks):
+            tracker.process_exercise(frame, timestamp=i / 30.0)
+        self.assertEqual(tracker.exercise_counter, 3)
+    
+    def test_run_benchmarks_reports_distribution(self):
+        """Test: Cada benchmark informa percentiles y llamadas por segundo."""
+        results = benchmark.run_benchmarks(samples=3, calls=2, frames=10, only='process_exercise')
+        self.assertEqual(len(results), 6)
+        for stats in results.values():
+            self.assertLessEqual(stats['p50_us'], stats['p99_us'])
+            self.assertGreater(stats['per_second'], 0)
+    
+    def test_compare_flags_regressions(self):
+        """Test: La comparación marca aumentos de p50 por encima del umbral."""
+        baseline = {'a': {'p50_us': 10.0}, 'b': {'p50_us': 10.0}}
+        current = {'a': {'p50_us': 10.5}, 'b': {'p50_us': 13.0}, 'c': {'p50_us': 1.0}}
+        
+        comparisons = {c['name']: c for c in benchmark.compare_results(current, baseline, 0.2)}
+        self.assertEqual(sorted(comparisons), ['a', 'b'])
+        self.assertFalse(comparisons['a']['regression'])
+        self.assertTrue(comparisons['b']['regression'])
+    
+    def test_compare_reads_baseline_before_writing(self):
+        """Test: Con --output igual a --compare se compara contra la línea base anterior."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'base.json')
+            name = 'process_exercise[Bicep Curl]'
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'results': {name: {'p50_us': 1e-6}}}, f)
+            argv = ['--output', path, '--compare', path, '--samples', '2', '--calls', '1',
+                    '--only', 'process_exercise']
+            
+            with self.assertRaises(SystemExit):
+                benchmark.main(argv)
+            self.assertEqual(benchmark.main(argv + ['--overwrite-baseline']), 1)
+            with open(path, encoding='utf-8') as f:
+                self.assertGreater(json.load(f)['results'][name]['p50_us'], 1e-6)
+
+
+class TestPerfStats(unittest.TestCase):
+    """Tests para la instrumentación por etapa."""
+    
+    def test_rolling_histogram_keeps_fixed_window(self):
+        """Test: El histograma solo conserva las últimas muestras."""
+        histogram = RollingHistogram(capacity=100)
+        for value in range(1000):
+            histogram.add(float(value))
+        
+        self.assertEqual(histogram.count, 1000)
+        self.assertEqual(len(histogram.values()), 100)
+        p50, p95, p99 = histogram.percentiles()
+        self.assertAlmostEqual(p50, 949.5)
+        self.assertLess(p95, p99)
+    
+    def test_stage_timer_records_laps_and_dumps(self):
+        """Test: Cada etapa y el frame completo se registran y se vuelcan a JSON."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'perf.json')
+            timer = StageTimer(dump_path=path, dump_interval=0.0)
+            for _ in range(3):
+                timer.start_frame()
+                timer.lap('cap.read')
+                timer.lap('pose.process')
+                timer.end_frame()
+            
+            with open(path, encoding='utf-8') as f:
+                stages = json.load(f)['stages']
+            self.assertEqual(set(stages), {'cap.read', 'pose.process', 'frame'})
+            self.assertEqual(stages['frame']['samples'], 3)
+    
+    def test_draw_ui_perf_hud_toggle(self):
+        """Test: La tecla P activa el panel de rendimiento en draw_ui."""
+        tracker = ExerciseTracker(load_model=False)
+        tracker.perf.start_frame()
+        tracker.perf.lap('pose.process')
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        without_hud = tracker.draw_ui(frame.copy())
+        
+        self.assertFalse(tracker.handle_key(ord('p')))
+        with_hud = tracker.draw_ui(frame.copy())
+        self.assertTrue(tracker.show_perf_hud)
+        self.assertFalse(np.array_equal(without_hud, with_hud))
+
+
+class TestMultiCamera(unittest.TestCase):
+    """Tests para el modo multi-cámara."""
+    
+    def test_tile_frames_layout(self):
+        """Test: El mosaico coloca cada fuente en su celda."""
+        red = np.zeros((480, 640, 3), dtype=np.uint8)
+        red[:, :, 2] = 255
+        blue = np.zeros((720, 1280, 3), dtype=np.uint8)
+        blue[:, :, 0] = 255
+        
+        canvas = tile_frames([red, blue, None], tile_size=(320, 180))
+        self.assertEqual(canvas.shape, (360, 640, 3))
+        self.assertEqual(tuple(canvas[90, 160]), (0, 0, 255))
+        self.assertEqual(tuple(canvas[90, 480]), (255, 0, 0))
+        self.assertEqual(tuple(canvas[270, 160]), (0, 0, 0))
+    
+    def test_streams_have_independent_state(self):
+        """Test: Cada fuente tiene su propio estado de ejercicio."""
+        first = StreamWorker(0, 0, "Bicep Curl")
+        second = StreamWorker('video.mp4', 1, "Lateral Raise")
+        first.tracker.exercise_counter = 5
+        
+        self.assertEqual(second.tracker.exercise_counter, 0)
+        self.assertEqual(second.tracker.exercise_name, "Lateral Raise")
+        self.assertEqual((parse_source('2'), parse_source('video.mp4')), (2, 'video.mp4'))
+    
+    def test_startup_failures_reach_the_caller(self):
+        """Test: Una fuente que no arranca se informa al hilo principal."""
+        with tempfile.TemporaryDirectory() as tmp:
+            missing = os.path.join(tmp, 'no_existe.mp4')
+            worker = StreamWorker(missing, 0)
+            worker.start()
+            self.assertTrue(worker.ready.wait(5.0))
+            worker.join(5.0)
+            self.assertFalse(worker.started)
+            self.assertIn("No se puede abrir la fuente", worker.error)
+            
+            with self.assertRaises(RuntimeError) as raised:
+                run_multi_camera([missing])
+            self.assertIn('no_existe.mp4', str(raised.exception))
+        with self.assertRaises(ValueError):
+            run_multi_camera([0], exercise_name="Sentadilla")
+
+
+class TestAnalyzeAPI(unittest.TestCase):
+    """Tests para el endpoint /api/analyze."""
+    
+    def setUp(self):
+        self.client = app.test_client()
+        self.landmarks = make_session_landmarks([EXTENDED_WRIST, FLEXED_WRIST, EXTENDED_WRIST] * 2)
+    
+    def test_analyze_json(self):
+        """Test: Una sesión en JSON devuelve repeticiones y duraciones."""
+        frames = self.landmarks.tolist()
+        frames[1] = None  # Frame sin detección
+        response = self.client.post('/api/analyze', json={
+            'exercise': "Bicep Curl",
+            'landmarks': frames,
+            'timestamps': [0.0, 0.5, 1.0, 1.5, 2.0, 2.5],
+        })
+        
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data['reps'], 1)
+        self.assertEqual(data['rep_frames'], [5])
+        self.assertEqual(data['rep_durations'], [2.5])
+        self.assertEqual(data['detected_frames'], 5)
+    
+    def test_analyze_raw_binary(self):
+        """Test: Un bloque float32 crudo se analiza sin JSON."""
+        body = self.landmarks.astype('<f4').tobytes()
+        response = self.client.post('/api/analyze?exercise=Bicep%20Curl&fps=2', data=body,
+                                    content_type='application/octet-stream')
+        
+        data = response.get_json()
+        self.assertEqual(data['reps'], 2)
+        self.assertEqual(data['rep_times'], [1.0, 2.5])
+    
+    def test_analyze_recording_body(self):
+        """Test: Se acepta directamente un archivo de landmark_recording.py."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'sesion.trkg')
+            with LandmarkRecorder(path) as recorder:
+                for i, frame in enumerate(self.landmarks):
+                    recorder.write(100.0 + i, frame)
+            with open(path, 'rb') as f:
+                body = f.read()
+        
+        response = self.client.post('/api/analyze?exercise=Bicep%20Curl', data=body,
+                                    content_type='application/octet-stream')
+        self.assertEqual(response.get_json()['rep_times'], [102.0, 105.0])
+    
+    def test_analyze_rejects_bad_input(self):
+        """Test: Ejercicios desconocidos y formas inválidas devuelven 400."""
+        response = self.client.post('/api/analyze', json={
+            'exercise': "Sentadilla", 'landmarks': self.landmarks.tolist()})
+        self.assertEqual(response.status_code, 400)
+        
+        response = self.client.post('/api/analyze', data=b'\x00' * 10,
+                                    content_type='application/octet-stream')
+        self.assertEqual(response.status_code, 400)
+    
+    def test_analyze_rejects_malformed_bodies(self):
+        """Test: Cuerpos con tipos inesperados devuelven 400, no 500."""
+        frames = self.landmarks.tolist()
+        for payload in ([1, 2], "sesion", {'landmarks': [1, 2]}, {'landmarks': [[1, 2]]},
+                        {'landmarks': frames, 'fps': None}, {'landmarks': frames, 'fps': 0},
+                        {'landmarks': frames, 'fps': -30}, {'landmarks': frames, 'fps': "rápido"},
+                        {'landmarks': frames, 'timestamps': 5},
+                        {'landmarks': frames, 'exercise': ["Bicep Curl"]}):
+            with self.subTest(payload=payload):
+                response = self.client.post('/api/analyze', json=payload)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.get_json())
+        
+        from landmark_recording import HEADER, MAGIC, record_dtype
+        body = self.landmarks.astype('<f4').tobytes()
+        for data, query in ((MAGIC, ''), (MAGIC + b'\x01', ''), (body, '?fps=0'), (body, '?fps=nan')):
+            with self.subTest(data=data[:16], query=query):
+                response = self.client.post(f'/api/analyze{query}', data=data,
+                                            content_type='application/octet-stream')
+                self.assertEqual(response.status_code, 400)
+        
+        # Cabeceras TRKGLM01 que no describen frames de 33 x 2+
+        session_id = self.client.post('/api/sessions', json={}).get_json()['session_id']
+        for num_landmarks, channels in ((10, 3), (33, 0), (33, 1)):
+            records = np.zeros(4, dtype=record_dtype(num_landmarks, channels)).tobytes()
+            data = HEADER.pack(MAGIC, num_landmarks, channels, 4) + records
+            for url in ('/api/analyze', f'/api/sessions/{session_id}/frames'):
+                with self.subTest(url=url, num_landmarks=num_landmarks, channels=channels):
+                    response = self.client.post(url, data=data, content_type='application/octet-stream')
+                    self.assertEqual(response.status_code, 400)
+
+
+class TestLiveSessions(unittest.TestCase):
+    """Tests para las sesiones en vivo del servidor."""
+    
+    def test_reps_span_batches(self):
+        """Test: El estado se conserva entre lotes como en ExerciseTracker."""
+        session = LiveSession('s1', "Bicep Curl", now=0.0)
+        landmarks = make_session_landmarks([EXTENDED_WRIST, FLEXED_WRIST, EXTENDED_WRIST, FLEXED_WRIST])
+        
+        first = session.ingest(landmarks[:2], np.array([10.0, 11.0]))
+        self.assertEqual((first['counter'], first['stage']), (0, "up"))
+        second = session.ingest(landmarks[2:], np.array([12.0, 13.0]))
+        self.assertEqual(second['counter'], 1)
+        self.assertEqual(second['new_rep_times'], [12.0])
+        self.assertEqual(session.rep_duration, 2.0)
+    
+    def test_store_lru_eviction(self):
+        """Test: Al superar el máximo se expulsa la sesión usada hace más tiempo."""
+        store = SessionStore(max_sessions=2, idle_timeout=1000)
+        a = store.create(now=0.0)
+        b = store.create(now=1.0)
+        store.get(a.session_id, now=2.0)
+        store.create(now=3.0)
+        
+        self.assertEqual(len(store), 2)
+        self.assertIsNotNone(store.get(a.session_id, now=4.0))
+        self.assertIsNone(store.get(b.session_id, now=4.0))
+    
+    def test_store_idle_eviction(self):
+        """Test: Las sesiones inactivas expiran."""
+        store = SessionStore(idle_timeout=60)
+        session = store.create(now=0.0)
+        self.assertIsNotNone(store.get(session.session_id, now=59.0))
+        self.assertIsNone(store.get(session.session_id, now=200.0))
+        self.assertEqual(store.evicted, 1)
+    
+    def test_live_session_api(self):
+        """Test: Crear sesión, enviar lotes, consultar y cerrar por HTTP."""
+        client = app.test_client()
+        session_id = client.post('/api/sessions', json={'exercise': "Bicep Curl"}).get_json()['session_id']
+        landmarks = make_session_landmarks([EXTENDED_WRIST, FLEXED_WRIST, EXTENDED_WRIST])
+        
+        state = client.post(f'/api/sessions/{session_id}/frames', json={
+            'landmarks': landmarks.tolist(), 'timestamps': [1.0, 2.0, 3.0]}).get_json()
+        self.assertEqual(state['counter'], 1)
+        self.assertEqual(client.get(f'/api/sessions/{session_id}').get_json()['counter'], 1)
+        
+        state = client.post(f'/api/sessions/{session_id}/frames', json={
+            'exercise': "Lateral Raise", 'landmarks': []}).get_json()
+        self.assertEqual((state['exercise'], state['counter']), ("Lateral Raise", 0))
+        
+        self.assertEqual(client.delete(f'/api/sessions/{session_id}').status_code, 204)
+        self.assertEqual(client.get(f'/api/sessions/{session_id}').status_code, 404)
+    
+    def test_live_session_api_rejects_non_objects(self):
+        """Test: Cuerpos JSON que no son objetos o ejercicios que no son texto devuelven 400."""
+        client = app.test_client()
+        for payload in ([1, 2], 5, "Bicep Curl", {'exercise': ["x"]}, {'exercise': {}}):
+            with self.subTest(payload=payload):
+                self.assertEqual(client.post('/api/sessions', json=payload).status_code, 400)
+        self.assertEqual(client.post('/api/sessions').status_code, 201)
+        session_id = client.post('/api/sessions', json={}).get_json()['session_id']
+        for payload in ([1, 2], "lote", {'landmarks': [], 'fps': None}, {'landmarks': [], 'exercise': 3},
+                        {'landmarks': [], 'exercise': ["x"]}, {'landmarks': [], 'exercise': {}}):
+            with self.subTest(payload=payload):
+                response = client.post(f'/api/sessions/{session_id}/frames', json=payload)
+                self.assertEqual(response.status_code, 400)
+
+
+class TestLandmarkFilter(unittest.TestCase):
+    """Tests para el filtro One-Euro de landmarks"""
+    
+    def test_one_euro_reduces_jitter(self):
+        """Test: Una señal constante con ruido sale con menos varianza."""
+        rng = np.random.default_rng(0)
+        noisy = 0.5 + rng.normal(0, 0.01, (300, 2))
+        one_euro = OneEuroFilter(min_cutoff=1.0, beta=0.5)
+        filtered = np.array([one_euro(x, i / 30.0) for i, x in enumerate(noisy)])
+        self.assertLess(filtered[30:].std(), noisy[30:].std() / 2)
+    
+    def test_reset_restarts_from_sample(self):
+        """Test: Tras reset la primera muestra se devuelve sin filtrar."""
+        one_euro = OneEuroFilter()
+        one_euro(np.zeros(2), 0.0)
+        one_euro(np.ones(2), 1 / 30.0)
+        one_euro.reset()
+        np.testing.assert_array_equal(one_euro(np.full(2, 0.7), 2 / 30.0), [0.7, 0.7])
+    
+    def test_per_exercise_params(self):
+        """Test: Al cambiar de ejercicio se cargan sus parámetros."""
+        landmark_filter = LandmarkFilter()
+        frame = PoseFrame.from_array(benchmark.synthetic_landmark_stream(1)[0])
+        landmark_filter.apply(frame, 0.0, "Lateral Raise")
+        self.assertEqual((landmark_filter._filter.min_cutoff, landmark_filter._filter.beta),
+                         EXERCISE_FILTER_PARAMS["Lateral Raise"])
+        filtered = landmark_filter.apply(frame, 1 / 30.0)
+        np.testing.assert_allclose(filtered.data, frame.data)
+    
+    def test_filtered_tracker_counts_noisy_reps(self):
+        """Test: Con temblor y saltos, el conteo filtrado coincide con el real."""
+        clean = benchmark.synthetic_landmark_stream(900, noise=0.0)
+        noisy = add_jitter(clean, 0.03, 0.05, seed=5)
+        timestamps = np.arange(900) / 30.0
+        self.assertEqual(count_reps(noisy, timestamps, "Bicep Curl", True)['reps'], 10)
+        
+        tracker = ExerciseTracker(load_model=False, filter_landmarks=True)
+        for i, frame in enumerate(noisy):
+            tracker.process_exercise(frame, timestamp=i / 30.0)
+        self.assertEqual(tracker.exercise_counter, 10)
+
+
+class TestInferenceScheduler(unittest.TestCase):
+    """Tests para el planificador de inferencia con salto de frames"""
+    
+    def frame_at(self, wrist_x):
+        frame = PoseFrame.from_array(benchmark.synthetic_landmark_stream(1, noise=0.0)[0])
+        frame.data[TRACKED_WRIST, 0] = wrist_x
+        return frame
+    
+    def test_every_n(self):
+        """Test: Con every_n=3 se infiere en 1 de cada 3 frames."""
+        scheduler = InferenceScheduler(every_n=3)
+        decisions = [scheduler.should_infer() for _ in range(9)]
+        self.assertEqual(decisions, [True, False, False] * 3)
+        self.assertAlmostEqual(scheduler.inference_ratio, 1 / 3)
+    
+    def test_adaptive_skips_only_at_rest(self):
+        """Test: En reposo se salta hasta max_skip; en movimiento rápido, nunca."""
+        scheduler = InferenceScheduler(adaptive=True, max_skip=4)
+        for i in range(10):
+            scheduler.observe(self.frame_at(0.3), i / 30.0)
+        self.assertEqual(scheduler.allowed_skip(), 4)
+        
+        for i in range(10, 20):
+            scheduler.observe(self.frame_at(0.3 + 0.05 * i), i / 30.0)
+        self.assertEqual(scheduler.allowed_skip(), 0)
+        
+        scheduler.observe(None, 1.0)
+        self.assertEqual(scheduler.allowed_skip(), 4)
+        self.assertIsNone(scheduler.predict(1.1))
+    
+    def test_predict_extrapolates_and_clamps(self):
+        """Test: La extrapolación es lineal y se limita a max_extrapolation."""
+        scheduler = InferenceScheduler(max_extrapolation=0.2, velocity_window=0.0)
+        scheduler.observe(self.frame_at(0.30), 0.0)
+        scheduler.observe(self.frame_at(0.40), 0.1)
+        self.assertAlmostEqual(scheduler.predict(0.15).data[TRACKED_WRIST, 0], 0.45)
+        self.assertAlmostEqual(scheduler.predict(5.0).data[TRACKED_WRIST, 0], 0.60)
+    
+    def test_budget_limits_inference_rate(self):
+        """Test: Una inferencia de 40 ms con presupuesto de 10 ms salta 3 frames."""
+        scheduler = InferenceScheduler(budget_ms=10.0)
+        scheduler.observe(self.frame_at(0.3), 0.0, inference_ms=40.0)
+        self.assertEqual(scheduler.allowed_skip(), 3)
+    
+    def test_rest_periods_keep_rep_count(self):
+        """Test: Series con descansos: mismas repeticiones con menos de la mitad de inferencias."""
+        landmarks = rest_and_sets_stream(sets=2, rest_seconds=30.0, noise=0.005)
+        timestamps = np.arange(len(landmarks)) / 30.0
+        result = simulate_schedule(landmarks, timestamps, "Bicep Curl",
+                                   InferenceScheduler(adaptive=True))
+        self.assertEqual(result['reps'], 20)
+        self.assertLess(result['inference_ratio'], 0.5)
+
+
+class TestRoiTracker(unittest.TestCase):
+    """Tests para el recorte de la región de interés"""
+    
+    def make_landmarks(self, visibility=0.99):
+        frame = benchmark.synthetic_landmark_stream(1, noise=0.0)[0]
+        return [SimpleNamespace(x=x, y=y, z=0.1, visibility=visibility) for x, y, _ in frame.tolist()]
+    
+    def test_full_frame_without_tracking(self):
+        """Test: Sin ROI se usa el frame completo."""
+        frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+        view, offset = RoiTracker().crop(frame)
+        self.assertIs(view, frame)
+        self.assertEqual(offset, (0, 0))
+    
+    def test_roi_covers_landmarks(self):
+        """Test: La ROI contiene todos los landmarks visibles con margen."""
+        roi_tracker = RoiTracker(padding=0.1)
+        landmarks = self.make_landmarks()
+        roi_tracker.update(landmarks, (1080, 1920, 3))
+        x0, y0, x1, y1 = roi_tracker.roi
+        self.assertLess((x1 - x0) * (y1 - y0), 1080 * 1920)
+        for lm in landmarks:
+            self.assertTrue(x0 < lm.x * 1920 < x1)
+            self.assertTrue(y0 <= lm.y * 1080 <= y1)
+    
+    def test_remap_round_trip(self):
+        """Test: Landmarks del recorte vuelven a las coordenadas del frame completo."""
+        frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+        roi_tracker = RoiTracker()
+        expected = self.make_landmarks()
+        roi_tracker.update(expected, frame.shape)
+        view, (x0, y0) = roi_tracker.crop(frame)
+        crop_h, crop_w = view.shape[:2]
+        
+        in_crop = [SimpleNamespace(x=(lm.x * 1920 - x0) / crop_w, y=(lm.y * 1080 - y0) / crop_h,
+                                   z=lm.z * 1920 / crop_w, visibility=lm.visibility) for lm in expected]
+        results = SimpleNamespace(pose_landmarks=SimpleNamespace(landmark=in_crop))
+        roi_tracker.track(results, (x0, y0), view.shape, frame.shape)
+        for got, want in zip(in_crop, expected):
+            self.assertAlmostEqual(got.x, want.x)
+            self.assertAlmostEqual(got.y, want.y)
+            self.assertAlmostEqual(got.z, want.z)
+    
+    def test_fallback_when_tracking_lost(self):
+        """Test: Sin detección o con pocos landmarks visibles se vuelve al frame completo."""
+        roi_tracker = RoiTracker()
+        roi_tracker.update(self.make_landmarks(), (1080, 1920, 3))
+        roi_tracker.track(SimpleNamespace(pose_landmarks=None), (0, 0), (10, 10, 3), (1080, 1920, 3))
+        self.assertIsNone(roi_tracker.roi)
+        
+        roi_tracker.update(self.make_landmarks(visibility=0.1), (1080, 1920, 3))
+        self.assertIsNone(roi_tracker.roi)
+    
+    def test_roi_holds_under_small_movements(self):
+        """Test: El recorte no se mueve con desplazamientos pequeños y se recalcula cerca del borde."""
+        roi_tracker = RoiTracker()
+        landmarks = self.make_landmarks()
+        roi_tracker.update(landmarks, (1080, 1920, 3))
+        roi = roi_tracker.roi
+        for dx, dy in ((0.01, 0.0), (-0.01, 0.01), (0.02, -0.01), (0.0, 0.0)):
+            shifted = [SimpleNamespace(x=lm.x + dx, y=lm.y + dy, z=lm.z, visibility=lm.visibility)
+                       for lm in landmarks]
+            roi_tracker.update(shifted, (1080, 1920, 3))
+            self.assertEqual(roi_tracker.roi, roi)
+        self.assertEqual(roi_tracker.moves, 1)
+        
+        far = [SimpleNamespace(x=lm.x + 0.2, y=lm.y, z=lm.z, visibility=lm.visibility) for lm in landmarks]
+        roi_tracker.update(far, (1080, 1920, 3))
+        self.assertEqual(roi_tracker.moves, 2)
+        x0, _, x1, _ = roi_tracker.roi
+        self.assertGreater(x0, roi[0])
+        for lm in far:
+            self.assertTrue(x0 < lm.x * 1920 < x1)
+
+
+class TestFrameBuffers(unittest.TestCase):
+    """Tests para los buffers de frame preasignados"""
+    
+    class FakeCapture:
+        """Cámara simulada que, como cv2.VideoCapture, reutiliza el buffer recibido."""
+        
+        def __init__(self, shape):
+            self.source = np.random.default_rng(0).integers(0, 255, shape, dtype=np.uint8)
+        
+        def read(self, image=None):
+            if image is None or image.shape != self.source.shape:
+                image = np.empty_like(self.source)
+            np.copyto(image, self.source)
+            return True, image
+    
+    def test_matches_allocating_path(self):
+        """Test: Volteo, conversión y escalado dan lo mismo que las llamadas con copia."""
+        import cv2
+        cap = self.FakeCapture((120, 160, 3))
+        buffers = FrameBuffers()
+        _, captured = buffers.read(cap)
+        frame = buffers.mirror(captured)
+        np.testing.assert_array_equal(frame, cv2.flip(cap.source, 1))
+        crop = frame[10:90, 20:120]
+        rgb = buffers.to_rgb(crop)
+        np.testing.assert_array_equal(rgb, cv2.cvtColor(crop, cv2.COLOR_BGR2RGB))
+        self.assertFalse(rgb.flags.writeable)
+        np.testing.assert_array_equal(
+            buffers.resize(rgb, 0.5),
+            cv2.resize(rgb, (50, 40), interpolation=cv2.INTER_AREA))
+    
+    def test_steady_state_has_no_frame_allocations(self):
+        """Test: Tras el primer frame el bucle no asigna arrays del tamaño del frame."""
+        shape = (720, 1280, 3)
+        cap = self.FakeCapture(shape)
+        landmarks = benchmark.as_mediapipe_landmarks(benchmark.synthetic_landmark_stream(1))[0]
+        results = SimpleNamespace(pose_landmarks=SimpleNamespace(landmark=landmarks))
+        tracker = ExerciseTracker(load_model=False, input_scale=0.5)
+        tracker.pose = SimpleNamespace(process=lambda image: results)
+        buffers = tracker.frame_buffers
+        
+        def loop_iteration(i):
+            _, frame = buffers.read(cap)
+            frame = buffers.mirror(frame)
+            image = buffers.to_rgb(frame)
+            detected = tracker.infer(image)
+            tracker.process_exercise(detected.pose_landmarks.landmark, timestamp=i / 30.0)
+            tracker.draw_ui(frame)
+        
+        loop_iteration(0)
+        tracemalloc.start()
+        try:
+            baseline, _ = tracemalloc.get_traced_memory()
+            for i in range(1, 31):
+                loop_iteration(i)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak - baseline, np.prod(shape) // 8)
+
+
+class TestOverlayCache(unittest.TestCase):
+    """Tests para las capas de interfaz cacheadas"""
+    
+    def draw_direct(self, tracker, frame):
+        tracker._draw_header(frame)
+        tracker._draw_footer(frame)
+        tracker._draw_instructions(frame)
+        tracker._draw_analytics(frame)
+    
+    def test_matches_direct_drawing(self):
+        """Test: La interfaz cacheada coincide con dibujar directamente (±1 en bordes suavizados)."""
+        rng = np.random.default_rng(0)
+        tracker = ExerciseTracker(load_model=False)
+        states = [("Bicep Curl", 0, 0.0, ""), ("Bicep Curl", 3, 2.5, "Brazo extendido - ¡Bien!"),
+                  ("Lateral Raise", 0, 0.0, "Elevando...")]
+        for shape in ((480, 640, 3), (720, 1280, 3)):
+            for name, counter, duration, feedback in states:
+                tracker.exercise_name, tracker.exercise_counter = name, counter
+                tracker.rep_duration, tracker.form_feedback = duration, feedback
+                frame = rng.integers(0, 255, shape, dtype=np.uint8)
+                expected = frame.copy()
+                tracker.draw_ui(frame)
+                self.draw_direct(tracker, expected)
+                self.assertLessEqual(np.abs(frame.astype(int) - expected).max(), 1)
+    
+    def test_renders_only_on_change(self):
+        """Test: Cada capa se rasteriza solo cuando cambia su estado o el tamaño del frame."""
+        tracker = ExerciseTracker(load_model=False)
+        layers = tracker.overlay_layers
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        for _ in range(5):
+            tracker.draw_ui(frame)
+        self.assertEqual([layer.renders for layer in layers.values()], [1, 1, 1, 1])
+        
+        tracker.exercise_counter += 1
+        tracker.draw_ui(frame)
+        self.assertEqual([layer.renders for layer in layers.values()], [2, 1, 1, 1])
+        
+        tracker.form_feedback = "Flexión completa - ¡Perfecto!"
+        tracker.draw_ui(frame)
+        tracker.draw_ui(np.zeros((720, 1280, 3), dtype=np.uint8))
+        self.assertEqual([layer.renders for layer in layers.values()], [3, 3, 2, 2])
+    
+    def test_rerender_touches_only_the_band(self):
+        """Test: Un cambio de feedback rasteriza solo la franja del pie, sin lienzos del frame completo."""
+        shape = (1080, 1920, 3)
+        tracker = ExerciseTracker(load_model=False)
+        frame = np.zeros(shape, dtype=np.uint8)
+        tracker.draw_ui(frame)
+        tracemalloc.start()
+        try:
+            baseline, _ = tracemalloc.get_traced_memory()
+            for i in range(5):
+                tracker.form_feedback = f"Flexionando... {i}"
+                tracker.draw_ui(frame)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(tracker.overlay_layers['footer'].renders, 6)
+        self.assertLess(peak - baseline, np.prod(shape) // 8)
+    
+    def test_empty_layer(self):
+        """Test: Una capa sin nada dibujado no modifica el frame."""
+        layer = CachedLayer()
+        layer.update('vacía', (40, 60, 3), lambda frame: None)
+        frame = np.full((40, 60, 3), 7, dtype=np.uint8)
+        layer.compose(frame)
+        self.assertTrue((frame == 7).all())
+
+
+class MemorySink(EventSink):
+    """Destino de eventos en memoria para los tests."""
+    
+    def __init__(self):
+        self.batches = []
+        self.closed = False
+    
+    def write(self, events):
+        self.batches.append(list(events))
+    
+    def close(self):
+        self.closed = True
+
+
+class TestRepEvents(unittest.TestCase):
+    """Tests para el flujo de eventos de repetición"""
+    
+    def make_event(self, i=0):
+        return RepEvent('rep', float(i), "Bicep Curl", i, "up", "¡Bien!", 30.0, 3.0, 20.0, 170.0)
+    
+    def test_batches_by_size(self):
+        """Test: Los eventos se agrupan en lotes de batch_size y close() vacía el resto."""
+        sink = MemorySink()
+        writer = EventWriter([sink], batch_size=3, flush_interval=60.0)
+        for i in range(7):
+            writer.emit(self.make_event(i))
+        writer.close()
+        self.assertEqual([len(batch) for batch in sink.batches], [3, 3, 1])
+        self.assertTrue(sink.closed)
+        self.assertEqual(writer.written, 7)
+    
+    def test_flushes_on_time(self):
+        """Test: Un lote incompleto se escribe al pasar flush_interval."""
+        sink = MemorySink()
+        writer = EventWriter([sink], batch_size=100, flush_interval=0.05)
+        writer.emit(self.make_event())
+        deadline = time.monotonic() + 2.0
+        while not sink.batches and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(sink.batches), 1)
+        writer.close()
+    
+    def test_file_sinks(self):
+        """Test: Los destinos JSONL y SQLite guardan todos los campos."""
+        with tempfile.TemporaryDirectory() as tmp:
+            jsonl_path = os.path.join(tmp, 'eventos.jsonl')
+            sqlite_path = os.path.join(tmp, 'eventos.db')
+            writer = EventWriter([JsonlSink(jsonl_path), SqliteSink(sqlite_path)], batch_size=2)
+            for i in range(3):
+                writer.emit(self.make_event(i))
+            writer.close()
+            
+            with open(jsonl_path, encoding='utf-8') as f:
+                rows = [json.loads(line) for line in f]
+            self.assertEqual([row['rep_index'] for row in rows], [0, 1, 2])
+            self.assertEqual(rows[0]['feedback'], "¡Bien!")
+            
+            connection = sqlite3.connect(sqlite_path)
+            stored = connection.execute(
+                "SELECT rep_index, duration, min_angle, max_angle FROM rep_events ORDER BY rep_index").fetchall()
+            connection.close()
+            self.assertEqual(stored[2], (2, 3.0, 20.0, 170.0))
+    
+    def test_tracker_emits_rep_events(self):
+        """Test: process_exercise emite repeticiones con duración y rango de ángulo."""
+        sink = MemorySink()
+        tracker = ExerciseTracker(load_model=False)
+        tracker.events = EventWriter([sink])
+        tracker.last_rep_time = 0.0
+        for i, frame in enumerate(benchmark.synthetic_landmark_stream(300)):
+            tracker.process_exercise(frame, timestamp=i / 30.0)
+        tracker.events.close()
+        
+        events = [event for batch in sink.batches for event in batch]
+        reps = [event for event in events if event.kind == 'rep']
+        self.assertEqual([event.rep_index for event in reps], [1, 2, 3])
+        self.assertAlmostEqual(reps[1].duration, 3.0, places=1)
+        for event in reps:
+            self.assertLess(event.min_angle, 40)
+            self.assertGreater(event.max_angle, 160)
+        self.assertIn('stage', {event.kind for event in events})
+        self.assertIn('feedback', {event.kind for event in events})
+    
+    def test_headless_run(self):
+        """Test: run_headless procesa un video sin ventana y emite los eventos."""
+        import cv2
+        landmarks = benchmark.as_mediapipe_landmarks(benchmark.synthetic_landmark_stream(200))
+        frames = iter(landmarks)
+        
+        tracker = ExerciseTracker(load_model=False)
+        tracker.pose = SimpleNamespace(
+            process=lambda image: SimpleNamespace(
+                pose_landmarks=SimpleNamespace(landmark=next(frames))),
+            close=lambda: None)
+        sink = MemorySink()
+        tracker.events = EventWriter([sink])
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'sesion.avi')
+            writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 30, (64, 48))
+            for _ in range(200):
+                writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+            writer.release()
+            processed = tracker.run_headless(path)
+        
+        self.assertEqual(processed, 200)
+        self.assertEqual(tracker.exercise_counter, 2)
+        self.assertTrue(sink.closed)
+        reps = [event for batch in sink.batches for event in batch if event.kind == 'rep']
+        self.assertEqual(len(reps), 2)
+
+
+class TestHistoryStore(unittest.TestCase):
+    """Tests para el historial persistente y sus endpoints."""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = HistoryStore(os.path.join(self.tmp.name, 'historial.db'))
+        self.day = time.mktime((2024, 3, 4, 10, 0, 0, 0, 0, -1))  # lunes
+    
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+    
+    def record(self, days, reps, exercise="Bicep Curl", durations=None):
+        start = self.day + days * 86400
+        times = [start + 2.0 * i for i in range(reps)]
+        return self.store.record_set('ana', exercise, times, durations or [2.0] * reps)
+    
+    def test_rollups_and_records(self):
+        """Test: Los resúmenes acumulan series y los récords llevan su fecha."""
+        self.record(0, 8)
+        self.record(0, 10, durations=[2.0] * 9 + [1.5])
+        self.record(1, 12)
+        self.record(1, 5, exercise="Squat")
+        
+        connection = self.store.connection
+        self.assertEqual(connection.execute("SELECT COUNT(*) FROM reps").fetchone()[0], 35)
+        row = connection.execute(
+            "SELECT sets, reps, best_set_reps, total_duration, fastest_rep FROM daily_rollups "
+            "WHERE user_id = 'ana' AND exercise = 'Bicep Curl' AND day = '2024-03-04'").fetchone()
+        self.assertEqual(tuple(row), (2, 18, 10, 35.5, 1.5))
+        
+        records = {r['exercise']: r for r in self.store.personal_records('ana')}
+        curl = records["Bicep Curl"]
+        self.assertEqual(curl['best_set_reps'], {'value': 12, 'day': '2024-03-05'})
+        self.assertEqual(curl['best_day_reps'], {'value': 18, 'day': '2024-03-04'})
+        self.assertEqual(curl['fastest_rep'], {'value': 1.5, 'day': '2024-03-04'})
+        self.assertEqual(records["Squat"]['best_set_reps']['value'], 5)
+        self.assertEqual(self.store.personal_records('otro'), [])
+    
+    def test_volume_paging(self):
+        """Test: El volumen se pagina de lo más reciente a lo más antiguo."""
+        for days in range(10):
+            self.record(days, 10)
+        
+        page = self.store.volume('ana', limit=3, offset=0)
+        self.assertEqual(page['total'], 10)
+        self.assertEqual([item['period'] for item in page['items']],
+                         ['2024-03-13', '2024-03-12', '2024-03-11'])
+        self.assertEqual(self.store.volume('ana', limit=3, offset=9)['items'][0]['period'], '2024-03-04')
+        
+        weeks = self.store.volume('ana', period='week')
+        self.assertEqual([(w['period'], w['reps']) for w in weeks['items']],
+                         [('2024-W11', 30), ('2024-W10', 70)])
+        self.assertEqual(week_key('2024-03-10'), '2024-W10')
+        
+        ranged = self.store.volume('ana', start='2024-03-05', end='2024-03-06')
+        self.assertEqual(ranged['total'], 2)
+        with self.assertRaises(ValueError):
+            self.store.volume('ana', period='month')
+    
+    def test_history_sink_groups_sets(self):
+        """Test: HistorySink separa series por ejercicio y por descanso."""
+        def rep(t, exercise="Bicep Curl", duration=2.0):
+            return RepEvent('rep', t, exercise, 0, 'up', '', 30.0, duration)
+        
+        sink = HistorySink(self.store, 'ana', set_gap=60)
+        t = self.day
+        sink.write([rep(t), rep(t + 2), RepEvent('stage', t + 3, "Bicep Curl", 2, 'down', '', 160.0)])
+        sink.write([rep(t + 200, duration=200), rep(t + 202)])
+        sink.write([rep(t + 204, exercise="Squat", duration=None)])
+        sink.close()
+        
+        rows = self.store.connection.execute(
+            "SELECT exercise, reps, session_id FROM sets ORDER BY id").fetchall()
+        self.assertEqual([(r['exercise'], r['reps']) for r in rows],
+                         [("Bicep Curl", 2), ("Bicep Curl", 2), ("Squat", 1)])
+        self.assertEqual({r['session_id'] for r in rows}, {sink.session_id})
+        durations = [r[0] for r in self.store.connection.execute("SELECT duration FROM reps ORDER BY id")]
+        self.assertEqual(durations, [2.0, 2.0, None, 2.0, None])
+        ended = self.store.connection.execute("SELECT ended_at FROM sessions").fetchone()[0]
+        self.assertIsNotNone(ended)
+    
+    def test_headless_history_uses_wall_clock(self):
+        """Test: Una sesión sin ventana sobre una fuente simulada se guarda con su fecha real."""
+        tracker = ExerciseTracker(pose_backend=SyntheticPoseBackend("Bicep Curl", tempo=2.0))
+        sink = HistorySink(self.store, 'ana')
+        tracker.events = EventWriter([sink])
+        started = time.time()
+        tracker.run_headless(SyntheticCapture((64, 48), frames=600))
+        
+        session = self.store.connection.execute("SELECT started_at, ended_at FROM sessions").fetchone()
+        self.assertGreaterEqual(session['started_at'], started)
+        self.assertAlmostEqual(session['ended_at'] - started, 20.0, delta=0.5)
+        today = day_key(started)
+        days = self.store.volume('ana')['items']
+        self.assertEqual([(d['period'], d['reps']) for d in days], [(today, tracker.exercise_counter)])
+        weeks = self.store.volume('ana', period='week')['items']
+        self.assertEqual([w['period'] for w in weeks], [week_key(today)])
+    
+    def test_history_api(self):
+        """Test: Los endpoints de historial guardan series y devuelven récords y volumen."""
+        previous, app_module.history = app_module.history, self.store
+        try:
+            client = app.test_client()
+            response = client.post('/api/history/ana/sets', json={
+                'exercise': "Bicep Curl", 'rep_times': [self.day, self.day + 2]})
+            self.assertEqual(response.status_code, 201)
+            
+            records = client.get('/api/history/ana/records').get_json()['records']
+            self.assertEqual(records[0]['best_set_reps']['value'], 2)
+            volume = client.get('/api/history/ana/volume?period=week&limit=10').get_json()
+            self.assertEqual(volume['total'], 1)
+            self.assertEqual(volume['items'][0]['reps'], 2)
+            
+            self.assertEqual(client.get('/api/history/ana/volume?limit=0').status_code, 400)
+            self.assertEqual(client.get('/api/history/ana/volume?period=year').status_code, 400)
+            self.assertEqual(client.post('/api/history/ana/sets', json={
+                'exercise': "Sentadilla", 'rep_times': [1.0]}).status_code, 400)
+            self.assertEqual(client.post('/api/history/ana/sets', json={
+                'exercise': "Bicep Curl", 'rep_times': [1.0], 'rep_durations': [1, 2]}).status_code, 400)
+            self.assertEqual(client.post('/api/history/ana/sets', json=[self.day]).status_code, 400)
+            for rep_times in ([1e300], ["inf"], ["nan"], [-1e300], ["día"], [[1.0]]):
+                with self.subTest(rep_times=rep_times):
+                    response = client.post('/api/history/ana/sets', json={
+                        'exercise': "Bicep Curl", 'rep_times': rep_times})
+                    self.assertEqual(response.status_code, 400)
+            self.assertEqual(self.store.volume('ana')['total'], 1)
+        finally:
+            app_module.history = previous
+
+
+class TestStartup(unittest.TestCase):
+    """Tests para los imports diferidos y la carga del modelo en segundo plano."""
+    
+    def loaded_modules(self, module):
+        code = (f"import sys, {module}; "
+                "print(','.join(m for m in ('numpy', 'cv2', 'mediapipe') if m in sys.modules))")
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+        return output.stdout.strip().split(',')
+    
+    def test_run_releases_camera_when_model_load_fails(self):
+        """Test: Si la carga en segundo plano falla, run() relanza el error y libera la cámara."""
+        class BrokenBackend(SyntheticPoseBackend):
+            def load(self):
+                raise RuntimeError("modelo dañado")
+        
+        capture = SyntheticCapture((64, 48), frames=10)
+        released = []
+        capture.release = lambda: released.append(True)
+        tracker = ExerciseTracker(pose_backend=BrokenBackend(), background_load=True)
+        tracker._model_thread.join()
+        with self.assertRaises(RuntimeError):
+            tracker.run(capture)
+        self.assertEqual(released, [True])
+    
+    def test_light_modules_do_not_import_numpy(self):
+        """Test: exercise_utils y app no importan NumPy al cargarse."""
+        self.assertNotIn('numpy', self.loaded_modules('exercise_utils'))
+        self.assertNotIn('numpy', self.loaded_modules('app'))
+        loaded = self.loaded_modules('exercise_tracker')
+        self.assertNotIn('cv2', loaded)
+        self.assertNotIn('mediapipe', loaded)
+    
+    def test_lazy_module(self):
+        """Test: El proxy importa el módulo en el primer acceso."""
+        module = lazy_import('colorsys')
+        self.assertIsInstance(module, LazyModule)
+        self.assertEqual(module.rgb_to_hsv(1.0, 0.0, 0.0), (0.0, 1.0, 1.0))
+        self.assertTrue(module.loaded)
+        self.assertIn('rgb_to_hsv', vars(module))
+        import exercise_utils
+        self.assertEqual(exercise_utils.JOINT_INDEX_ARRAY.shape, (len(JOINT_NAMES), 3))
+    
+    def test_background_model_load(self):
+        """Test: El modelo carga en un hilo y se calienta antes de quedar listo."""
+        calls = []
+        
+        class SlowTracker(ExerciseTracker):
+            def _create_pose(self, model_complexity):
+                time.sleep(0.05)
+                return SimpleNamespace(process=lambda image: calls.append(image.shape),
+                                       close=lambda: calls.append('close'))
+        
+        tracker = SlowTracker(background_load=True)
+        self.assertFalse(tracker.model_ready)
+        self.assertTrue(tracker.wait_for_model(timeout=5))
+        self.assertEqual(calls, [(256, 256, 3)])
+        tracker.close_model()
+        self.assertEqual(calls[-1], 'close')
+        summary = tracker.startup.summary()
+        self.assertEqual(list(summary)[0], 'imports')
+        self.assertGreaterEqual(summary['model']['duration_ms'], 50)
+        self.assertIn('model.warmup', summary)
+    
+    def test_background_model_error(self):
+        """Test: Un fallo al cargar en segundo plano se relanza al consultar el modelo."""
+        class BrokenTracker(ExerciseTracker):
+            def _create_pose(self, model_complexity):
+                raise RuntimeError("sin modelo")
+        
+        tracker = BrokenTracker(background_load=True)
+        with self.assertRaises(RuntimeError):
+            tracker.wait_for_model(timeout=5)
+    
+    def test_startup_report(self):
+        """Test: Las fases se ordenan por inicio y los hitos se registran una vez."""
+        report = StartupReport(origin=100.0)
+        report.add('camera', 100.2, 100.5)
+        report.add('model', 100.1, 101.0)
+        report.mark('first_frame')
+        first = report.phases['first_frame']
+        report.mark('first_frame')
+        self.assertEqual(report.phases['first_frame'], first)
+        summary = report.summary()
+        self.assertEqual(list(summary)[:2], ['model', 'camera'])
+        self.assertAlmostEqual(summary['camera']['duration_ms'], 300.0)
+        self.assertIn('camera', report.format())
+
+
+class TestRepAnalytics(unittest.TestCase):
+    """Tests para la analítica por repetición en buffers circulares."""
+    
+    def run_session(self, exercise, frames=900, tracker=None):
+        tracker = tracker or ExerciseTracker(load_model=False)
+        tracker.exercise_name = exercise
+        for i, frame in enumerate(benchmark.synthetic_landmark_stream(frames)):
+            tracker.process_exercise(frame, timestamp=i / 30)
+        return tracker
+    
+    def test_ring_buffer_order(self):
+        """Test: El buffer circular devuelve las filas en orden tras dar la vuelta."""
+        ring = RingBuffer(4)
+        for value in range(3):
+            ring.append(value)
+        np.testing.assert_array_equal(ring.ordered(), [0, 1, 2])
+        for value in range(3, 7):
+            ring.append(value)
+        np.testing.assert_array_equal(ring.ordered(), [3, 4, 5, 6])
+        out = np.empty(10)
+        np.testing.assert_array_equal(ring.ordered(out), [3, 4, 5, 6])
+        self.assertEqual(ring.last(), 6)
+        self.assertEqual(len(ring), 4)
+    
+    def test_tempo_and_range(self):
+        """Test: Con un ciclo coseno de 3 s la concéntrica dura ~1.5 s en ambos sentidos."""
+        for exercise in ("Bicep Curl", "Tricep Extension"):
+            tracker = self.run_session(exercise)
+            reps = tracker.analytics.reps.ordered()
+            self.assertGreaterEqual(len(reps), tracker.exercise_counter - 1)
+            np.testing.assert_allclose(reps['concentric'], 1.5, atol=0.1)
+            np.testing.assert_allclose(reps['tut'], reps['concentric'] + reps['eccentric'])
+            self.assertTrue((reps['rom'] > 100).all())
+        summary = tracker.analytics.summary()
+        self.assertEqual(summary['reps'], len(reps))
+    
+    def test_exercise_change_resets(self):
+        """Test: Cambiar de ejercicio descarta el historial del anterior."""
+        tracker = self.run_session("Bicep Curl", frames=200)
+        self.assertGreater(len(tracker.analytics.angles), 0)
+        tracker.handle_key(ord('3'))
+        tracker.process_exercise(benchmark.synthetic_landmark_stream(1)[0], timestamp=10.0)
+        self.assertEqual(tracker.analytics.exercise_name, "Lateral Raise")
+        self.assertEqual(len(tracker.analytics.angles), 1)
+        self.assertIsNone(tracker.analytics.last_rep())
+    
+    def test_bounded_memory(self):
+        """Test: Una sesión larga no hace crecer la memoria de la analítica."""
+        tracker = self.run_session("Bicep Curl", frames=300)
+        analytics = tracker.analytics
+        landmarks = benchmark.synthetic_landmark_stream(3000)
+        tracemalloc.start()
+        try:
+            baseline, _ = tracemalloc.get_traced_memory()
+            for i, frame in enumerate(landmarks):
+                tracker.process_exercise(frame, timestamp=10.0 + i / 30)
+            current, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(len(analytics.angles), analytics.angles.capacity)
+        self.assertGreater(analytics.reps.count, analytics.reps.capacity / 2)
+        self.assertLess(current - baseline, 16 * 1024)
+    
+    def test_sparkline_drawn(self):
+        """Test: draw_ui dibuja la gráfica del ángulo en el panel de analítica."""
+        tracker = self.run_session("Bicep Curl", frames=200)
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        empty = frame.copy()
+        ExerciseTracker(load_model=False).draw_ui(empty)
+        tracker.draw_ui(frame)
+        x0, y0, x1, y1 = tracker._analytics_box(frame)
+        self.assertTrue((frame[y0:y0 + 60, x0:x1] != empty[y0:y0 + 60, x0:x1]).any())
+
+
+class TestBatchEvaluation(unittest.TestCase):
+    """Tests para la evaluación vectorizada de las reglas sobre series completas."""
+    
+    def frame_by_frame(self, name, angles, stage=None):
+        joint = EXERCISE_RULES.specs[name].joint
+        reps, stages, feedback = [], [], []
+        for i, angle in enumerate(angles.tolist()):
+            rep_completed, message, stage = EXERCISE_RULES.evaluate(name, {joint: angle}, stage)
+            if rep_completed:
+                reps.append(i)
+            stages.append(stage)
+            feedback.append(message)
+        return reps, stages, feedback
+    
+    def test_identical_to_frame_by_frame(self):
+        """Test: Etapas, feedback y repeticiones coinciden con evaluate() frame a frame."""
+        rng = np.random.default_rng(3)
+        t = np.arange(3000)
+        angles = np.clip(90 + 85 * np.sin(t / 12) + rng.normal(0, 20, len(t)), 0, 180)
+        angles[::53] = np.nan
+        for name in EXERCISE_RULES.names:
+            stages = {rule.stage for rule in EXERCISE_RULES.specs[name].rules} - {None}
+            for initial in [None] + sorted(stages):
+                result = EXERCISE_RULES.evaluate_batch(name, angles, initial)
+                reps, expected_stages, feedback = self.frame_by_frame(name, angles, initial)
+                self.assertEqual(result.rep_indices.tolist(), reps)
+                self.assertEqual(result.stage_labels(), expected_stages)
+                self.assertEqual(result.feedback_labels(), feedback)
+                self.assertEqual(result.final_stage, expected_stages[-1])
+                self.assertEqual(result.final_feedback, feedback[-1])
+    
+    def test_joint_matrix_and_durations(self):
+        """Test: Acepta la matriz (N, n_joints) y calcula las duraciones de las repeticiones."""
+        landmarks = benchmark.synthetic_landmark_stream(600)
+        timestamps = 100.0 + np.arange(600) / 30
+        matrix = calculate_joint_angles(landmarks)
+        result = evaluate_batch(EXERCISE_RULES.specs["Bicep Curl"], matrix, timestamps=timestamps)
+        column = matrix[:, JOINT_NAMES.index('left_elbow')]
+        self.assertEqual(result.rep_indices.tolist(), self.frame_by_frame("Bicep Curl", column)[0])
+        self.assertEqual(len(result.rep_indices), 6)
+        np.testing.assert_allclose(result.rep_durations[1:], 3.0, atol=0.1)
+        self.assertAlmostEqual(result.rep_durations[0], timestamps[result.rep_indices[0]] - 100.0)
+    
+    def test_empty_series(self):
+        """Test: Una serie vacía conserva la etapa inicial y no cuenta repeticiones."""
+        result = EXERCISE_RULES.evaluate_batch("Bicep Curl", np.empty(0), "up", timestamps=np.empty(0))
+        self.assertEqual(len(result.rep_indices), 0)
+        self.assertEqual(len(result.rep_durations), 0)
+        self.assertIsNone(result.final_stage)
+        self.assertEqual(result.final_feedback, "")
+
+
+class TestThresholdTuner(unittest.TestCase):
+    """Tests para el ajuste de umbrales sobre sesiones etiquetadas."""
+    
+    def test_grid_counts_match_batch_evaluation(self):
+        """Test: El conteo de cada candidato coincide con evaluate_batch usando esos umbrales."""
+        for name in EXERCISE_RULES.names:
+            spec = EXERCISE_RULES.specs[name]
+            start, peak = spec.stage_rule_indices()
+            grid = threshold_tuner.default_grid(spec, steps=7)
+            sessions, _ = threshold_tuner.synthetic_sessions(name, 3, seed=5)
+            for angles in sessions:
+                sides, values = threshold_tuner.reduce_session(angles, spec, grid)
+                counts = threshold_tuner.count_grid(sides, values, spec, grid)
+                for i, start_value in enumerate(grid.start_values):
+                    for j, peak_value in enumerate(grid.peak_values):
+                        candidate = spec.with_thresholds({spec.rules[start].stage: start_value,
+                                                          spec.rules[peak].stage: peak_value})
+                        self.assertEqual(counts[i, j], len(evaluate_batch(candidate, angles).rep_indices))
+    
+    def test_overlapping_grid_rejected(self):
+        """Test: Bandas solapadas o ejercicios sin reglas de etapa dan error."""
+        spec = EXERCISE_RULES.specs["Bicep Curl"]
+        grid = threshold_tuner.ThresholdGrid(np.linspace(80, 170, 5), np.linspace(20, 100, 5))
+        with self.assertRaises(ValueError):
+            threshold_tuner.tune_thresholds([np.zeros(10)], [0], "Bicep Curl", grid)
+        with self.assertRaises(ValueError):
+            threshold_tuner.default_grid(ExerciseSpec("Libre", 'left_elbow', (StageRule(None, 0, "-"),)))
+    
+    def test_tuning_improves_synthetic_accuracy(self):
+        """Test: Los umbrales elegidos aciertan más sesiones que los actuales, en serie y en paralelo."""
+        sessions, truths = threshold_tuner.synthetic_sessions("Bicep Curl", 60, seed=1)
+        grid = threshold_tuner.default_grid(EXERCISE_RULES.specs["Bicep Curl"], steps=30)
+        entry = threshold_tuner.tune_thresholds(sessions, truths, "Bicep Curl", grid, workers=1)
+        self.assertGreater(entry['accuracy'], entry['previous']['accuracy'] + 0.5)
+        self.assertEqual(entry['candidates'], 900)
+        self.assertEqual(set(entry['thresholds']), {'down', 'up'})
+        self.assertEqual(len(entry['curves']['down']['accuracy']), 30)
+        parallel = threshold_tuner.tune_thresholds(sessions, truths, "Bicep Curl", grid,
+                                                   workers=2, chunk_size=20)
+        self.assertEqual(parallel['thresholds'], entry['thresholds'])
+        self.assertEqual(parallel['accuracy'], entry['accuracy'])
+    
+    def test_thresholds_file_loads_into_rules(self):
+        """Test: El JSON generado se carga en una tabla de reglas y cambia el conteo."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'thresholds.json')
+            threshold_tuner.main(['--exercise', 'Bicep Curl', '--synthetic', '40', '--steps', '20',
+                                  '--workers', '1', '--output', path])
+            threshold_tuner.write_thresholds(path, "Lateral Raise", {'thresholds': {'down': 25.0}})
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            self.assertEqual(set(data['exercises']), {"Bicep Curl", "Lateral Raise"})
+            rules = ExerciseRules()
+            self.assertEqual(load_thresholds(path, rules), ("Bicep Curl", "Lateral Raise"))
+        tuned = data['exercises']["Bicep Curl"]['thresholds']
+        self.assertEqual(rules.specs["Bicep Curl"].rules[0].threshold, tuned['down'])
+        self.assertEqual(rules.specs["Lateral Raise"].rules[0].threshold, 25.0)
+        self.assertEqual(EXERCISE_RULES.specs["Bicep Curl"].rules[0].threshold, 160)
+        # Con repeticiones que no llegan a 160° el ajuste baja el umbral del brazo extendido
+        self.assertLess(tuned['down'], 160)
+        angle = (tuned['down'] + 160) / 2
+        self.assertEqual(rules.evaluate("Bicep Curl", {'left_elbow': angle}, "up")[2], "down")
+        with self.assertRaises(ValueError):
+            rules.set_thresholds("Bicep Curl", {'sideways': 10})
+
+
+class TestPoseBackends(unittest.TestCase):
+    """Tests para los backends de pose y el movimiento sintético."""
+    
+    def test_synthetic_motion_hits_target_angles(self):
+        """Test: El ángulo de la articulación sigue el recorrido y cada ciclo es una repetición."""
+        for name in EXERCISE_RULES.names:
+            joint = EXERCISE_RULES.specs[name].joint
+            motion = SyntheticMotion(name, noise=0.0)
+            timestamps, landmarks = synthetic_pose_stream(name, 900, noise=0.0)
+            angles = session_joint_angles(landmarks, joint)
+            np.testing.assert_allclose(angles, motion.angles(np.arange(900)), atol=1e-6)
+            self.assertEqual(len(EXERCISE_RULES.evaluate_batch(name, angles).rep_indices),
+                             motion.completed_reps(900))
+            self.assertAlmostEqual(timestamps[30], 1.0)
+    
+    def test_backend_matches_stream_in_blocks(self):
+        """Test: El backend por frames reproduce la sesión generada de una vez, con pérdidas."""
+        _, expected = synthetic_pose_stream("Bicep Curl", 700, dropout=0.02, seed=4)
+        backend = SyntheticPoseBackend("Bicep Curl", block=64, dropout=0.02, seed=4)
+        lost = 0
+        for row in expected:
+            result = backend.process(None)
+            if result.pose_landmarks is None:
+                lost += 1
+                self.assertTrue(np.isnan(row).all())
+            else:
+                got = [(lm.x, lm.y, lm.visibility) for lm in result.pose_landmarks.landmark]
+                np.testing.assert_allclose(got, row)
+        self.assertGreater(lost, 20)
+        self.assertAlmostEqual(backend.timestamp, 699 / 30)
+        self.assertIsNone(PoseResult.from_array(np.full((33, 3), np.nan)).pose_landmarks)
+    
+    def test_tracker_runs_headless_on_synthetic_backend(self):
+        """Test: El tracker cuenta las repeticiones simuladas sin cámara ni MediaPipe."""
+        backend = SyntheticPoseBackend("Shoulder Press", tempo=2.0, dropout=0.005)
+        tracker = ExerciseTracker(pose_backend=backend)
+        tracker.exercise_name = "Shoulder Press"
+        sink = MemorySink()
+        tracker.events = EventWriter([sink])
+        started = time.time()
+        processed = tracker.run_headless(SyntheticCapture((64, 48), frames=1200))
+        self.assertEqual(processed, 1200)
+        self.assertEqual(tracker.exercise_counter, backend.motion.completed_reps(1200))
+        reps = [event for batch in sink.batches for event in batch if event.kind == 'rep']
+        # Tiempos de la fuente simulada (30 fps) desde la hora de inicio, no del reloj
+        self.assertAlmostEqual(reps[0].timestamp - started, 2.0, delta=0.5)
+        self.assertAlmostEqual(reps[1].duration, 2.0, delta=0.1)
+    
+    def test_headless_uses_scheduler_and_roi(self):
+        """Test: Sin ventana también se saltan frames con el planificador y se infiere sobre la ROI."""
+        backend = SyntheticPoseBackend("Bicep Curl", tempo=2.0, noise=0.0)
+        tracker = ExerciseTracker(pose_backend=backend)
+        tracker.scheduler = InferenceScheduler(every_n=3)
+        processed = tracker.run_headless(SyntheticCapture((64, 48), frames=900))
+        self.assertEqual(processed, 900)
+        self.assertAlmostEqual(tracker.scheduler.inference_ratio, 1 / 3, places=2)
+        # El backend sintético avanza un frame por inferencia (más el de calentamiento)
+        self.assertEqual(backend.frames, 301)
+        self.assertEqual(tracker.exercise_counter, backend.motion.completed_reps(backend.frames))
+        
+        shapes = []
+        pose = synthetic_pose_stream("Bicep Curl", 1, noise=0.0)[1][0]
+        
+        def process(image):
+            shapes.append(image.shape[:2])
+            return PoseResult.from_array(pose)
+        
+        tracker = ExerciseTracker(load_model=False, track_roi=True)
+        tracker.pose = SimpleNamespace(process=process, close=lambda: None)
+        tracker.run_headless(SyntheticCapture((640, 480), frames=5))
+        self.assertEqual(shapes[0], (480, 640))
+        self.assertTrue(all(h < 480 and w < 640 for h, w in shapes[1:]))
+    
+    def test_draw_skeleton(self):
+        """Test: El esqueleto por defecto se dibuja con los colores de la interfaz."""
+        frame = np.zeros((120, 160, 3), dtype=np.uint8)
+        result = SyntheticPoseBackend(noise=0.0).process(None)
+        draw_skeleton(frame, result.pose_landmarks)
+        self.assertTrue((frame == (245, 66, 230)).all(axis=2).any())
+        self.assertTrue((frame == (245, 117, 66)).all(axis=2).any())
+
+
+class FakeLandmarker:
+    """
+    PoseLandmarker simulado en LIVE_STREAM: entrega por el callback el
+    resultado de cada frame `lag` envíos después (0 = en el propio envío),
+    a partir de una sesión sintética, y descarta uno de cada `drop_every`.
+    """
+    
+    def __init__(self, callback, landmarks, lag=1, drop_every=None):
+        self.callback = callback
+        self.landmarks = landmarks
+        self.lag = lag
+        self.drop_every = drop_every
+        self.queue = []
+        self.submitted = []
+        self.images = []
+        self.closed = False
+    
+    def detect_async(self, image, timestamp_ms):
+        self.submitted.append(timestamp_ms)
+        self.images.append(image)
+        index = len(self.submitted) - 1
+        if self.drop_every is None or index % self.drop_every:
+            self.queue.append((index, timestamp_ms))
+        while self.queue and self.queue[0][0] <= index - self.lag:
+            frame, ts = self.queue.pop(0)
+            row = self.landmarks[frame % len(self.landmarks)]
+            pose = [SimpleNamespace(x=x, y=y, z=0.0, visibility=v) for x, y, v in row.tolist()]
+            self.callback(SimpleNamespace(pose_landmarks=[pose]), image, ts)
+    
+    def close(self):
+        self.closed = True
+
+
+class TestTasksBackend(unittest.TestCase):
+    """Tests para el backend asíncrono de MediaPipe Tasks y la entrega de resultados."""
+    
+    def make_backend(self, tmp, **kwargs):
+        landmarks = synthetic_pose_stream("Bicep Curl", 900)[1]
+        
+        class FakeTasksBackend(TasksPoseBackend):
+            def _create_landmarker(self):
+                return FakeLandmarker(self._on_result, landmarks, **kwargs)
+        
+        path = os.path.join(tmp, 'pose_landmarker_lite.task')
+        with open(path, 'wb') as f:
+            f.write(b'modelo')
+        backend = FakeTasksBackend('lite', model_dir=tmp)
+        backend.load()
+        return backend
+    
+    def test_handoff_orders_and_drops(self):
+        """Test: Se descartan resultados desordenados, sobrescritos o viejos."""
+        handoff = ResultHandoff(max_age_ms=100)
+        self.assertTrue(handoff.publish(10, 'a'))
+        self.assertFalse(handoff.publish(5, 'viejo'))
+        self.assertTrue(handoff.publish(20, 'b', 'ctx'))
+        self.assertEqual(handoff.take(30), (20, 'b', 'ctx'))
+        self.assertIsNone(handoff.take(30))
+        handoff.publish(40, 'c')
+        self.assertIsNone(handoff.take(200))
+        self.assertEqual(handoff.dropped, 3)
+        self.assertTrue(handoff.wait(40, timeout=0))
+        self.assertFalse(handoff.wait(41, timeout=0.01))
+    
+    def test_submit_does_not_alias_the_frame_buffer(self):
+        """Test: Reescribir el buffer tras submit() no cambia la imagen en inferencia."""
+        with tempfile.TemporaryDirectory() as tmp:
+            backend = self.make_backend(tmp, lag=5)
+        buffer = np.zeros((48, 64, 3), dtype=np.uint8)
+        backend.submit(buffer, 1000)
+        buffer[:] = 255
+        backend.submit(buffer[8:40, 16:48], 1033)
+        first, crop = backend.landmarker.images
+        self.assertEqual(first.numpy_view().max(), 0)
+        self.assertEqual(crop.numpy_view().shape[:2], (32, 32))
+    
+    def test_model_variants(self):
+        """Test: La variante elige el .task local y falta de modelo da un error claro."""
+        self.assertEqual(TasksPoseBackend('heavy', model_dir='m').model_path,
+                         os.path.join('m', 'pose_landmarker_heavy.task'))
+        with self.assertRaises(ValueError):
+            TasksPoseBackend('enorme')
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaises(FileNotFoundError):
+                TasksPoseBackend('lite', model_dir=tmp).load()
+    
+    def test_tracker_consumes_results_with_their_timestamps(self):
+        """Test: El tracker no espera al modelo y procesa cada resultado con el instante de su frame."""
+        with tempfile.TemporaryDirectory() as tmp:
+            backend = self.make_backend(tmp, lag=2, drop_every=7)
+        tracker = ExerciseTracker(load_model=False)
+        tracker.pose = backend
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        processed = []
+        for i in range(900):
+            polled = tracker._infer_async(frame, 1000.0 + i / 30)
+            if polled is None:
+                continue
+            timestamp, skeleton, landmarks = polled
+            processed.append(timestamp)
+            tracker.process_exercise(landmarks, timestamp=timestamp)
+        self.assertEqual(len(backend.landmarker.submitted), 900)
+        # Cada resultado llega dos frames tarde (el frame 0 se descarta) y en orden
+        self.assertAlmostEqual(processed[0], 1000.0 + 1 / 30, places=3)
+        self.assertEqual(processed, sorted(processed))
+        self.assertLess(len(processed), 900 - 900 // 7 + 1)
+        self.assertEqual(tracker.exercise_counter, 10)
+        # Los contextos de frames descartados por el modelo no se acumulan
+        self.assertLessEqual(len(backend._contexts), 2)
+    
+    def test_synchronous_process_and_close(self):
+        """Test: process() espera al resultado de su frame (calentamiento y modo sin ventana)."""
+        with tempfile.TemporaryDirectory() as tmp:
+            backend = self.make_backend(tmp, lag=0)
+        result = backend.process(np.zeros((256, 256, 3), dtype=np.uint8))
+        self.assertEqual(len(result.pose_landmarks.landmark), 33)
+        landmarker = backend.landmarker
+        backend.close()
+        self.assertTrue(landmarker.closed)
+        self.assertIsNone(backend.landmarker)
+
+
+class TestStaticAssets(unittest.TestCase):
+    """Tests para el build de recursos con hash y su servicio en /assets/."""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        vendor = os.path.join(self.tmp.name, 'vendor')
+        os.makedirs(os.path.join(vendor, 'mediapipe', 'pose'))
+        with open(os.path.join(vendor, 'mediapipe', 'pose', 'pose.js'), 'w') as f:
+            f.write('var pose = 1;\n' * 1000)
+        self.wasm = np.random.default_rng(0).integers(0, 4, 200_000, dtype=np.uint8).tobytes()
+        with open(os.path.join(vendor, 'mediapipe', 'pose', 'pose_solution_wasm_bin.wasm'), 'wb') as f:
+            f.write(self.wasm)
+        self.output = os.path.join(self.tmp.name, 'dist')
+        self.manifest = static_assets.build_assets([vendor], self.output)
+        self.previous = app_module.assets
+        app_module.assets = static_assets.AssetManifest.load(self.output)
+        self.client = app.test_client()
+    
+    def tearDown(self):
+        app_module.assets = self.previous
+        self.tmp.cleanup()
+    
+    def wasm_url(self):
+        return '/assets/' + self.manifest['assets']['mediapipe/pose/pose_solution_wasm_bin.wasm']['file']
+    
+    def test_build_hashes_and_compresses(self):
+        """Test: Nombres con hash del contenido, .gz reproducible y manifiesto."""
+        entry = self.manifest['assets']['mediapipe/pose/pose.js']
+        self.assertRegex(entry['file'], r'^mediapipe/pose/pose\.[0-9a-f]{12}\.js$')
+        self.assertEqual(entry['content_type'], 'text/javascript')
+        path = os.path.join(self.output, entry['file'])
+        with open(path + '.gz', 'rb') as f:
+            compressed = f.read()
+        with open(path, 'rb') as f:
+            self.assertEqual(gzip.decompress(compressed), f.read())
+        self.assertEqual(entry['encodings']['gzip'], len(compressed))
+        rebuilt = static_assets.build_assets([os.path.join(self.tmp.name, 'vendor')], self.output)
+        self.assertEqual(rebuilt, self.manifest)
+        with open(os.path.join(self.output, 'manifest.json'), encoding='utf-8') as f:
+            self.assertEqual(json.load(f), self.manifest)
+    
+    def test_immutable_precompressed_and_conditional(self):
+        """Test: Variante gzip con caché immutable, ETag por variante y 304."""
+        response = self.client.get(self.wasm_url(), headers={'Accept-Encoding': 'gzip, deflate'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(response.headers['Content-Type'], 'application/wasm')
+        self.assertIn('immutable', response.headers['Cache-Control'])
+        self.assertIn('max-age=31536000', response.headers['Cache-Control'])
+        self.assertEqual(response.headers['Vary'], 'Accept-Encoding')
+        self.assertEqual(gzip.decompress(response.data), self.wasm)
+        cached = self.client.get(self.wasm_url(), headers={
+            'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['ETag']})
+        self.assertEqual(cached.status_code, 304)
+        plain = self.client.get(self.wasm_url(), headers={'Accept-Encoding': 'gzip;q=0'})
+        self.assertNotIn('Content-Encoding', plain.headers)
+        self.assertNotEqual(plain.headers['ETag'], response.headers['ETag'])
+        self.assertEqual(plain.data, self.wasm)
+    
+    def test_range_requests(self):
+        """Test: Las peticiones con Range reciben la versión sin comprimir con 206."""
+        response = self.client.get(self.wasm_url(), headers={'Range': 'bytes=1000-1999',
+                                                             'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.headers['Content-Range'], f'bytes 1000-1999/{len(self.wasm)}')
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(response.data, self.wasm[1000:2000])
+        self.assertEqual(self.client.get('/assets/mediapipe/pose/otro.js').status_code, 404)
+    
+    def test_template_uses_local_assets(self):
+        """Test: La página carga pose.js y sus archivos desde /assets/ y, sin build, desde la CDN."""
+        html = self.client.get('/').get_data(as_text=True)
+        self.assertIn('/assets/' + self.manifest['assets']['mediapipe/pose/pose.js']['file'], html)
+        self.assertIn('"pose_solution_wasm_bin.wasm": "' + self.wasm_url() + '"', html)
+        self.assertIn('cdn.jsdelivr.net/npm/@mediapipe/camera_utils', html)
+        app_module.assets = None
+        html = self.client.get('/').get_data(as_text=True)
+        self.assertIn('cdn.jsdelivr.net/npm/@mediapipe/pose@', html)
+        self.assertIn('window.TRACKG_POSE_ASSETS = {}', html)
+        self.assertEqual(self.client.get(self.wasm_url()).status_code, 404)
+
+
 def run_tests():
     """Ejecutar todos los tests."""
     unittest.main(argv=[''], verbosity=2, exit=False)
@@ -0,0 +1,386 @@
+"""
+Ajuste automático de los umbrales de etapa de un ejercicio para TrackG.
+
+Evalúa una rejilla de umbrales (inicial × contracción, p. ej. 100 × 100 =
+10.000 candidatos) sobre sesiones etiquetadas con el número real de
+repeticiones y elige la combinación con más sesiones exactas, desempatando
+por robustez (precisión media de los candidatos vecinos) y por error medio.
+El resultado es un JSON que cargan exercise_tracker.py (--thresholds) y
+app.py (TRACKG_THRESHOLDS).
+
+Cada sesión se reduce primero a la secuencia alternada de tramos por encima
+y por debajo de las bandas de la rejilla (su extremo es lo único que decide
+si una regla de etapa se cumple), así que una sesión de miles de frames se
+evalúa para todos los candidatos en unas decenas de pasos vectorizados, con
+el mismo conteo que evaluate_batch. Las sesiones se reparten entre procesos.
+
+Uso:
+    python threshold_tuner.py --exercise "Bicep Curl" sesion1.trkg:12 sesion2.trkg:10
+    python threshold_tuner.py --exercise "Bicep Curl" --synthetic 500 --steps 100
+"""
+
+import argparse
+import json
+import operator
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from exercise_utils import EXERCISE_RULES, ExerciseSpec
+from filter_evaluation import parse_labelled
+from session_analysis import session_joint_angles
+
+_OPS = {'>': operator.gt, '<': operator.lt, '>=': operator.ge, '<=': operator.le}
+
+# Lado de cada tramo de la sesión reducida
+START, PEAK = 1, 2
+
+# Una sesión: ruta de una grabación .trkg, landmarks (N, 33, 2+) o ángulos (N,)
+Session = Union[str, np.ndarray]
+
+
+class ThresholdGrid(NamedTuple):
+    """Valores candidatos de los umbrales inicial y de contracción, en orden creciente."""
+    start_values: np.ndarray
+    peak_values: np.ndarray
+
+    @property
+    def size(self) -> int:
+        return len(self.start_values) * len(self.peak_values)
+
+
+def _stage_rules(spec: ExerciseSpec) -> Tuple[int, int]:
+    """Índices de las reglas inicial y de contracción, validando que se puedan ajustar."""
+    start, peak = spec.stage_rule_indices()
+    if start is None or peak is None:
+        raise ValueError(f"{spec.name}: no tiene reglas de etapa que ajustar")
+    if sorted((start, peak)) != [0, 1]:
+        # Si otra regla se evaluase antes, podría ocultar a las de etapa según el umbral
+        raise ValueError(f"{spec.name}: las reglas de etapa deben ser las dos primeras")
+    return start, peak
+
+
+def _is_upper(op: str) -> bool:
+    """True si la regla se cumple por encima del umbral."""
+    return op in ('>', '>=')
+
+
+def default_grid(spec: ExerciseSpec, steps: int = 100, span: float = 25.0) -> ThresholdGrid:
+    """
+    Rejilla de steps × steps valores alrededor de los umbrales actuales.
+
+    Cada umbral se explora ±span grados, sin salir de [0, 180] ni cruzar el
+    punto medio entre ambos umbrales (las dos bandas no deben solaparse).
+    """
+    start, peak = _stage_rules(spec)
+    start_rule, peak_rule = spec.rules[start], spec.rules[peak]
+    middle = (start_rule.threshold + peak_rule.threshold) / 2
+    ranges = []
+    for rule in (start_rule, peak_rule):
+        low, high = max(0.0, rule.threshold - span), min(180.0, rule.threshold + span)
+        if rule.threshold > middle:
+            low = max(low, middle + 1)
+        else:
+            high = min(high, middle - 1)
+        ranges.append(np.linspace(low, high, steps))
+    return ThresholdGrid(*ranges)
+
+
+def _check_grid(spec: ExerciseSpec, grid: ThresholdGrid) -> None:
+    start, peak = _stage_rules(spec)
+    start_upper = _is_upper(spec.rules[start].op)
+    if start_upper == _is_upper(spec.rules[peak].op):
+        raise ValueError(f"{spec.name}: las reglas de etapa deben ir en sentidos opuestos")
+    high, low = (grid.start_values, grid.peak_values) if start_upper else (grid.peak_values, grid.start_values)
+    if high.min() <= low.max():
+        raise ValueError("Las bandas de los umbrales inicial y de contracción se solapan")
+    for values in grid:
+        if np.any(np.diff(values) <= 0):
+            raise ValueError("Los valores de la rejilla deben ser crecientes")
+
+
+def session_angles(session: Session, spec: ExerciseSpec) -> np.ndarray:
+    """Ángulo de la articulación del ejercicio por frame detectado."""
+    if isinstance(session, str):
+        from landmark_recording import load_recording
+        session = load_recording(session)['landmarks']
+    angles = np.asarray(session, dtype=np.float64)
+    if angles.ndim == 3:
+        angles = session_joint_angles(angles, spec.joint)
+    return angles[~np.isnan(angles)]
+
+
+def reduce_session(angles: np.ndarray, spec: ExerciseSpec,
+                   grid: ThresholdGrid) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce una serie de ángulos a tramos alternos de la banda inicial y de la
+    de contracción.
+
+    Un frame fuera de ambas bandas (para cualquier candidato) no cambia la
+    etapa, y dentro de un tramo solo importa su valor más extremo, así que
+    el conteo de cada candidato sobre los tramos es el mismo que sobre la
+    serie completa.
+
+    Returns:
+        (lado de cada tramo, START o PEAK; valor extremo de cada tramo)
+    """
+    start, peak = _stage_rules(spec)
+    side = np.zeros(len(angles), dtype=np.int8)
+    for index, label, values in ((peak, PEAK, grid.peak_values), (start, START, grid.start_values)):
+        op = spec.rules[index].op
+        loosest = values.min() if _is_upper(op) else values.max()
+        side[_OPS[op](angles, loosest)] = label
+
+    kept = np.flatnonzero(side)
+    side, angles = side[kept], angles[kept]
+    if not len(side):
+        return side, angles
+    runs = np.flatnonzero(np.diff(side, prepend=0))
+    run_sides = side[runs]
+    upper = {label: _is_upper(spec.rules[index].op) for index, label in ((start, START), (peak, PEAK))}
+    run_values = np.where(run_sides == START,
+                          (np.maximum if upper[START] else np.minimum).reduceat(angles, runs),
+                          (np.maximum if upper[PEAK] else np.minimum).reduceat(angles, runs))
+    return run_sides, run_values
+
+
+def _matching(op: str, values: np.ndarray, angle: float) -> slice:
+    """Candidatos (valores crecientes) cuya regla se cumple con `angle`, como slice."""
+    if op == '>':
+        return slice(0, np.searchsorted(values, angle, side='left'))
+    if op == '>=':
+        return slice(0, np.searchsorted(values, angle, side='right'))
+    if op == '<':
+        return slice(np.searchsorted(values, angle, side='right'), None)
+    return slice(np.searchsorted(values, angle, side='left'), None)
+
+
+def count_grid(sides: np.ndarray, values: np.ndarray, spec: ExerciseSpec,
+               grid: ThresholdGrid) -> np.ndarray:
+    """
+    Repeticiones contadas por cada candidato, con la sesión ya reducida.
+
+    Returns:
+        Array (len(start_values), len(peak_values))
+    """
+    start, peak = _stage_rules(spec)
+    start_op, peak_op = spec.rules[start].op, spec.rules[peak].op
+    shape = (len(grid.start_values), len(grid.peak_values))
+    state = np.zeros(shape, dtype=np.int8)
+    reps = np.zeros(shape, dtype=np.int32)
+    for side, value in zip(sides.tolist(), values.tolist()):
+        if side == START:
+            rows = _matching(start_op, grid.start_values, value)
+            reps[rows] += state[rows] == PEAK
+            state[rows] = START
+        else:
+            state[:, _matching(peak_op, grid.peak_values, value)] = PEAK
+    return reps
+
+
+def _score_chunk(sessions: Sequence[Session], truths: Sequence[int], spec: ExerciseSpec,
+                 grid: ThresholdGrid) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Worker: acumula, para cada candidato, sesiones exactas y suma del error
+    absoluto y con signo sobre un bloque de sesiones.
+    """
+    shape = (len(grid.start_values), len(grid.peak_values))
+    exact = np.zeros(shape, dtype=np.int32)
+    abs_error = np.zeros(shape, dtype=np.int64)
+    signed_error = np.zeros(shape, dtype=np.int64)
+    for session, truth in zip(sessions, truths):
+        sides, values = reduce_session(session_angles(session, spec), spec, grid)
+        error = count_grid(sides, values, spec, grid) - truth
+        exact += error == 0
+        abs_error += np.abs(error)
+        signed_error += error
+    return exact, abs_error, signed_error
+
+
+def _neighbourhood_mean(values: np.ndarray, radius: int) -> np.ndarray:
+    """Media de cada celda y sus vecinas a `radius` pasos (bordes replicados)."""
+    size = 2 * radius + 1
+    padded = np.pad(values, radius, mode='edge')
+    # Imagen integral: la suma de cada ventana son cuatro lecturas
+    integral = np.zeros((padded.shape[0] + 1, padded.shape[1] + 1))
+    integral[1:, 1:] = padded.cumsum(axis=0).cumsum(axis=1)
+    windows = (integral[size:, size:] - integral[:-size, size:]
+               - integral[size:, :-size] + integral[:-size, :-size])
+    return windows / size ** 2
+
+
+def tune_thresholds(sessions: Sequence[Session], truths: Sequence[int], exercise_name: str,
+                    grid: Optional[ThresholdGrid] = None, workers: Optional[int] = None,
+                    chunk_size: int = 25) -> Dict:
+    """
+    Evalúa la rejilla sobre todas las sesiones y elige los mejores umbrales.
+
+    Args:
+        sessions: Sesiones (rutas .trkg, landmarks o ángulos)
+        truths: Repeticiones reales de cada sesión
+        exercise_name: Ejercicio
+        grid: Rejilla de candidatos (por defecto, default_grid)
+        workers: Procesos (por defecto, núcleos disponibles; 1 = sin pool)
+        chunk_size: Sesiones por tarea del pool
+
+    Returns:
+        Entrada del JSON de umbrales: umbrales elegidos, métricas, métricas de
+        los umbrales actuales y curvas de precisión por umbral
+    """
+    if exercise_name not in EXERCISE_RULES:
+        raise ValueError(f"Ejercicio desconocido: {exercise_name}")
+    if len(sessions) != len(truths) or not len(sessions):
+        raise ValueError("Se necesita una etiqueta por sesión y al menos una sesión")
+    spec = EXERCISE_RULES.specs[exercise_name]
+    grid = grid or default_grid(spec)
+    _check_grid(spec, grid)
+
+    started = time.perf_counter()
+    chunks = [(sessions[i:i + chunk_size], truths[i:i + chunk_size])
+              for i in range(0, len(sessions), chunk_size)]
+    if workers == 1 or len(chunks) == 1:
+        partials = [_score_chunk(chunk, labels, spec, grid) for chunk, labels in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_score_chunk, chunk, labels, spec, grid) for chunk, labels in chunks]
+            partials = [future.result() for future in futures]
+    exact, abs_error, signed_error = (sum(parts) for parts in zip(*partials))
+
+    count = len(sessions)
+    accuracy = exact / count
+    mean_abs_error = abs_error / count
+    # Vecindario de ±5 % de la rejilla: prefiere el centro de las mesetas
+    robustness = _neighbourhood_mean(accuracy, max(1, max(accuracy.shape) // 20))
+    # Más sesiones exactas; a igualdad, vecindario más estable y menor error
+    order = np.lexsort((-mean_abs_error.ravel(), robustness.ravel(), accuracy.ravel()))
+    best_start, best_peak = np.unravel_index(order[-1], accuracy.shape)
+
+    start, peak = _stage_rules(spec)
+    start_stage, peak_stage = spec.rules[start].stage, spec.rules[peak].stage
+    current = _score_chunk(sessions, truths, spec, ThresholdGrid(
+        np.array([spec.rules[start].threshold]), np.array([spec.rules[peak].threshold])))
+
+    def metrics(i, j) -> Dict:
+        return {'accuracy': float(accuracy[i, j]), 'robustness': float(robustness[i, j]),
+                'mean_abs_error': float(mean_abs_error[i, j]),
+                'mean_error': float(signed_error[i, j] / count)}
+
+    return {
+        'thresholds': {start_stage: round(float(grid.start_values[best_start]), 2),
+                       peak_stage: round(float(grid.peak_values[best_peak]), 2)},
+        **metrics(best_start, best_peak),
+        'previous': {
+            'thresholds': {start_stage: spec.rules[start].threshold, peak_stage: spec.rules[peak].threshold},
+            'accuracy': float(current[0][0, 0] / count),
+            'mean_abs_error': float(current[1][0, 0] / count),
+        },
+        'sessions': count,
+        'candidates': grid.size,
+        'seconds': time.perf_counter() - started,
+        # Precisión y error al mover un umbral con el otro fijo en el óptimo
+        'curves': {
+            start_stage: {'values': grid.start_values.tolist(),
+                          'accuracy': accuracy[:, best_peak].tolist(),
+                          'mean_abs_error': mean_abs_error[:, best_peak].tolist()},
+            peak_stage: {'values': grid.peak_values.tolist(),
+                         'accuracy': accuracy[best_start, :].tolist(),
+                         'mean_abs_error': mean_abs_error[best_start, :].tolist()},
+        },
+    }
+
+
+def synthetic_sessions(exercise_name: str, count: int, fps: float = 30.0,
+                       seed: int = 0) -> Tuple[List[np.ndarray], List[int]]:
+    """
+    Series de ángulos sintéticas etiquetadas: repeticiones con periodo,
+    recorrido y temblor variables (algunas no llegan a los umbrales
+    actuales) y saltos esporádicos del ángulo.
+
+    Returns:
+        (series de ángulos, repeticiones reales)
+    """
+    spec = EXERCISE_RULES.specs[exercise_name]
+    start, peak = _stage_rules(spec)
+    start_threshold, peak_threshold = spec.rules[start].threshold, spec.rules[peak].threshold
+    direction = 1.0 if _is_upper(spec.rules[start].op) else -1.0
+    rng = np.random.default_rng(seed)
+
+    sessions, truths = [], []
+    for _ in range(count):
+        reps = int(rng.integers(5, 21))
+        period = rng.uniform(2.0, 4.0)
+        samples = int(period * fps)
+        # Extremos de cada repetición alrededor de los umbrales actuales
+        start_extremes = start_threshold + direction * rng.uniform(-15, 15, reps + 1)
+        peak_extremes = peak_threshold - direction * rng.uniform(-15, 20, reps)
+        phase = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(samples) / samples)
+        cycles = [start_extremes[i] + (peak_extremes[i] - start_extremes[i]) * phase
+                  + (start_extremes[i + 1] - start_extremes[i]) * np.arange(samples) / samples
+                  for i in range(reps)]
+        rest = np.full(int(fps), start_extremes[0])
+        angles = np.concatenate([rest] + cycles + [np.full(int(fps), start_extremes[-1])])
+        angles += rng.normal(0, rng.uniform(1, 6), len(angles))
+        spikes = rng.random(len(angles)) < 0.02
+        angles[spikes] += rng.normal(0, 35, spikes.sum())
+        sessions.append(np.clip(angles, 0, 180))
+        truths.append(reps)
+    return sessions, truths
+
+
+def write_thresholds(path: str, exercise_name: str, entry: Dict) -> None:
+    """Añade o sustituye la entrada de un ejercicio en el JSON de umbrales."""
+    data = {'version': 1, 'exercises': {}}
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    data.setdefault('exercises', {})[exercise_name] = entry
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Punto de entrada de línea de comandos.
+    """
+    parser = argparse.ArgumentParser(description="TrackG - Ajuste de umbrales sobre sesiones etiquetadas")
+    parser.add_argument('recordings', nargs='*', type=parse_labelled,
+                        help="Grabaciones etiquetadas RUTA:REPETICIONES")
+    parser.add_argument('--exercise', default="Bicep Curl", choices=EXERCISE_RULES.names)
+    parser.add_argument('--synthetic', type=int, default=0, metavar='N',
+                        help="Usar N sesiones sintéticas en lugar de grabaciones")
+    parser.add_argument('--steps', type=int, default=100,
+                        help="Valores por umbral (candidatos = steps²)")
+    parser.add_argument('--span', type=float, default=25.0,
+                        help="Grados explorados a cada lado de los umbrales actuales")
+    parser.add_argument('--workers', type=int, default=None, help="Número de procesos")
+    parser.add_argument('--output', default='thresholds.json', help="JSON de umbrales")
+    args = parser.parse_args(argv)
+
+    if args.recordings:
+        sessions, truths = [list(column) for column in zip(*args.recordings)]
+    elif args.synthetic:
+        sessions, truths = synthetic_sessions(args.exercise, args.synthetic)
+    else:
+        parser.error("Indica grabaciones etiquetadas o --synthetic N")
+
+    grid = default_grid(EXERCISE_RULES.specs[args.exercise], args.steps, args.span)
+    entry = tune_thresholds(sessions, truths, args.exercise, grid, workers=args.workers)
+    write_thresholds(args.output, args.exercise, entry)
+
+    previous = entry['previous']
+    print(f"{args.exercise}: {entry['candidates']} candidatos × {entry['sessions']} sesiones "
+          f"en {entry['seconds']:.1f} s")
+    print(f"  actuales {previous['thresholds']}: exactas {previous['accuracy']:.1%}, "
+          f"error medio {previous['mean_abs_error']:.2f}")
+    print(f"  elegidos {entry['thresholds']}: exactas {entry['accuracy']:.1%}, "
+          f"error medio {entry['mean_abs_error']:.2f}, robustez {entry['robustness']:.1%}")
+    print(f"Guardado en {args.output} (cargar con exercise_tracker.py --thresholds {args.output})")
+
+
+if __name__ == "__main__":
+    main()